@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Heuristic matching benchmark: batch scoring versus the per-opportunity path.
+
+Matches synthetic opportunities against a synthetic company profile with AI
+analysis off, once through OpportunityMatcher.match_opportunities (one bulk
+transform for the batch) and one opportunity at a time for a sample, and checks
+that both give the same results.
+
+    python benchmarks/batch_matching.py --count 50000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from loguru import logger
+
+from scrapers import BidOpportunity
+from ai.opportunity_matcher import OpportunityMatcher
+
+KEYWORDS = ["cybersecurity", "information security", "IT services", "software development",
+            "network security", "cloud computing", "data protection", "risk assessment",
+            "compliance", "penetration testing", "vulnerability assessment", "incident response",
+            "SOC", "SIEM", "firewall", "encryption", "access control", "monitoring", "ISO", "CISSP"]
+PHRASES = [
+    "Supply and installation of network security equipment for regional offices",
+    "Provision of cloud computing and data protection services",
+    "Consultancy for risk assessment and compliance audit",
+    "Construction of a district health centre including civil works",
+    "Procurement of office furniture and stationery",
+    "Penetration testing and vulnerability assessment of core banking systems",
+    "Managed SOC and SIEM monitoring with incident response retainer",
+    "Supply of motor vehicles and spare parts",
+    "Training of staff in information security awareness",
+]
+
+
+def make_profile() -> dict:
+    content = " ".join(PHRASES[i] for i in (0, 1, 2, 5, 6, 8)) + " " + " ".join(KEYWORDS)
+    return {'company_name': 'Benchmark Ltd', 'technical_keywords': KEYWORDS, 'all_content': content}
+
+
+def make_opportunities(count: int, words: int, seed: int = 11):
+    rng = random.Random(seed)
+    due = datetime.now() + timedelta(days=30)
+    opportunities = []
+    for i in range(count):
+        description = " ".join(rng.choice(PHRASES) for _ in range(max(1, words // 9)))
+        opportunities.append(BidOpportunity(
+            title=rng.choice(PHRASES), description=description, agency="Ministry of ICT",
+            opportunity_id=f"BENCH-{i}", due_date=due, source="Benchmark"))
+    return opportunities
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--words", type=int, default=30, help="approximate words per description")
+    parser.add_argument("--sample", type=int, default=2000, help="opportunities matched one at a time")
+    args = parser.parse_args()
+
+    logger.remove()
+    matcher = OpportunityMatcher("")
+    matcher.set_company_profile(make_profile())
+    opportunities = make_opportunities(args.count, args.words)
+    chars = sum(len(o.title) + len(o.description) for o in opportunities) / len(opportunities)
+    print(f"{args.count:,} opportunities, ~{chars:.0f} characters of text each")
+
+    start = time.perf_counter()
+    batch = matcher.match_opportunities(opportunities, analyze_ai=False)
+    batch_secs = time.perf_counter() - start
+
+    sample = opportunities[:args.sample]
+    start = time.perf_counter()
+    single = [matcher.match_single_opportunity(o, analyze_ai=False) for o in sample]
+    single_secs = time.perf_counter() - start
+
+    by_id = {r.opportunity.opportunity_id: r for r in single}
+    mismatches = 0
+    for result in batch:
+        expected = by_id.get(result.opportunity.opportunity_id)
+        if expected is None:
+            continue
+        if (abs(expected.match_score - result.match_score) > 1e-12 or expected.should_apply != result.should_apply
+                or expected.confidence != result.confidence
+                or sorted(expected.matching_keywords) != sorted(result.matching_keywords)):
+            mismatches += 1
+
+    print(f"{'':<16} {'seconds':>9} {'per second':>12}")
+    print(f"{'batch':<16} {batch_secs:>9.3f} {args.count / batch_secs:>12,.0f}")
+    print(f"{'one at a time':<16} {single_secs:>9.3f} {len(sample) / single_secs:>12,.0f}  ({len(sample):,} sampled)")
+    speedup = (args.count / batch_secs) / (len(sample) / single_secs)
+    print(f"Speedup {speedup:.1f}x; sampled results that differ: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Batched AI analysis benchmark: requests and prompt tokens per match run by batch size.
+
+Runs OpportunityMatcher.match_opportunities with AI analysis for every opportunity
+at several batch sizes. Requests go to an LLMClient over MockLLMBackend (no API
+key needed) whose responder answers the single-opportunity format or the JSON
+batch format; --drop makes it omit that fraction of batch entries, so partial-batch
+retries are exercised, and --latency adds a delay per request.
+
+    python benchmarks/batched_analysis.py --count 200 --drop 0.1
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from loguru import logger
+
+from scrapers import BidOpportunity
+from ai import OpportunityMatcher, LLMClient, MockLLMBackend
+
+KEYWORDS = ["cybersecurity", "network security", "cloud computing", "data protection", "risk assessment",
+            "penetration testing", "vulnerability assessment", "incident response", "SOC", "SIEM"]
+PHRASES = [
+    "Supply and installation of network security equipment for regional offices",
+    "Provision of cloud computing and data protection services",
+    "Penetration testing and vulnerability assessment of core banking systems",
+    "Managed SOC and SIEM monitoring with incident response retainer",
+    "Construction of a district health centre including civil works",
+    "Procurement of office furniture and stationery",
+]
+LEVELS = ('Low', 'Medium', 'High')
+
+
+def make_opportunities(count: int, seed: int = 3) -> List[BidOpportunity]:
+    rng = random.Random(seed)
+    due = datetime.now() + timedelta(days=30)
+    return [BidOpportunity(title=f"{rng.choice(PHRASES)} (lot {i})",
+                           description=" ".join(rng.choice(PHRASES) for _ in range(12)),
+                           agency="Ministry of ICT", opportunity_id=f"BATCH-{i}", due_date=due, source="Benchmark")
+            for i in range(count)]
+
+
+def level_for(title: str) -> str:
+    return LEVELS[zlib.crc32(title.strip().encode()) % 3]
+
+
+def make_responder(drop: float):
+    """Mock model responses; the assessment depends only on the opportunity title."""
+    rng = random.Random(7)
+    lock = threading.Lock()
+
+    def respond(messages, max_tokens):
+        prompt = messages[-1]['content']
+        titles = re.findall(r"Title: (.*)", prompt)
+        if not re.search(r"^\[\d+\]", prompt, re.MULTILINE):
+            return (f"MISSING_REQUIREMENTS: none\nRECOMMENDATIONS: review {titles[0]}\n"
+                    f"REQUIRED_DOCUMENTS: technical proposal\nREQUIRED_ATTACHMENTS: pricing sheet\n"
+                    f"ASSESSMENT: {level_for(titles[0])}")
+        results = []
+        for number, title in enumerate(titles, 1):
+            with lock:
+                dropped = rng.random() < drop
+            if not dropped:
+                results.append({'id': number, 'missing_requirements': ['none'], 'recommendations': [f"review {title}"],
+                                'required_documents': ['technical proposal'],
+                                'required_attachments': ['pricing sheet'], 'assessment': level_for(title)})
+        return "```json\n" + json.dumps({'results': results}, indent=1) + "\n```"
+    return respond
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--drop", type=float, default=0.0, help="fraction of batch entries the fake omits")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per request")
+    args = parser.parse_args()
+
+    logger.remove()
+    opportunities = make_opportunities(args.count)
+
+    print(f"{args.count:,} opportunities, all AI-analysed; batch entries dropped: {args.drop:.0%}")
+    print(f"{'batch size':>10} {'requests':>9} {'prompt tokens':>14} {'completion':>11} {'seconds':>8} {'wrong':>6}")
+    for size in args.sizes:
+        backend = MockLLMBackend(latency_secs=args.latency, responder=make_responder(args.drop))
+        matcher = OpportunityMatcher("", max_concurrency=4, batch_size=size, llm_client=LLMClient(backend))
+        matcher.set_company_profile({'company_name': 'Benchmark Ltd', 'technical_keywords': KEYWORDS,
+                                     'all_content': " ".join(PHRASES[:4] * 10)})
+        start = time.perf_counter()
+        results = matcher.match_opportunities(opportunities, max_ai_duration_secs=3600)
+        secs = time.perf_counter() - start
+        stats = matcher.last_match_stats
+        # Results attached to the wrong opportunity (or left heuristic) show another recommendation
+        wrong = sum(1 for r in results if r.recommendations != (f"review {r.opportunity.title}",))
+        print(f"{size:>10} {stats['ai_requests']:>9,} {stats['prompt_tokens']:>14,} {stats['completion_tokens']:>11,} "
+              f"{secs:>8.2f} {wrong:>6}")
+    print("Tokens are counted with ai.tokens.count_tokens (estimates without tiktoken).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Cascade matching benchmark: AI calls saved versus ranking agreement.
+
+Runs OpportunityMatcher.match_opportunities with every opportunity sent to AI
+analysis (the baseline), then with several cascade shortlists, and compares the
+rankings. AI analysis is replaced by a deterministic simulated reviewer, so no
+API key is needed; --latency adds a per-call delay.
+
+    python benchmarks/cascade_ranking.py --count 500
+"""
+import argparse
+import random
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from loguru import logger
+from scipy.stats import kendalltau
+
+from scrapers import BidOpportunity
+from ai import OpportunityMatcher, CascadeConfig
+
+KEYWORDS = ["cybersecurity", "network security", "cloud computing", "data protection", "risk assessment",
+            "penetration testing", "vulnerability assessment", "incident response", "SOC", "SIEM",
+            "firewall", "encryption", "monitoring"]
+RELEVANT = [
+    "Supply and installation of network security equipment and firewall monitoring",
+    "Provision of cloud computing and data protection services",
+    "Penetration testing and vulnerability assessment of core banking systems",
+    "Managed SOC and SIEM monitoring with incident response retainer",
+]
+OTHER = [
+    "Construction of a district health centre including civil works",
+    "Procurement of office furniture and stationery",
+    "Supply of motor vehicles and spare parts",
+    "Catering services for the annual staff retreat",
+    "Consultancy for a national agricultural census",
+]
+CASCADES = {
+    "top 10": CascadeConfig(top_k=10),
+    "top 25": CascadeConfig(top_k=25),
+    "top 50": CascadeConfig(top_k=50),
+    "top quartile": CascadeConfig(top_k=0, quantile=0.75),
+}
+
+
+def make_opportunities(count: int, seed: int = 5) -> List[BidOpportunity]:
+    rng = random.Random(seed)
+    due = datetime.now() + timedelta(days=30)
+    opportunities = []
+    for i in range(count):
+        relevant = rng.choice([0, 0, 0, 1, 1, 2])
+        phrases = rng.sample(RELEVANT, relevant) + rng.sample(OTHER, 3 - relevant)
+        rng.shuffle(phrases)
+        opportunities.append(BidOpportunity(
+            title=phrases[0], description=". ".join(phrases), agency="Ministry of ICT",
+            opportunity_id=f"CASCADE-{i}", due_date=due, source="Benchmark"))
+    return opportunities
+
+
+def simulated_analysis(latency: float):
+    """Stand-in for the LLM: assessment follows the relevant content, with 10% disagreement."""
+    def analyze(opportunity: BidOpportunity, request_timeout=None, state=None, usage=None) -> Dict[str, Any]:
+        if latency:
+            time.sleep(latency)
+        hits = sum(phrase in opportunity.description for phrase in RELEVANT)
+        level = min(hits, 2)
+        if zlib.crc32(opportunity.opportunity_id.encode()) % 10 == 0:
+            level = 2 - level
+        return {'missing_requirements': [], 'recommendations': ['simulated review'],
+                'required_documents': [], 'required_attachments': [],
+                'assessment': ('Low', 'Medium', 'High')[level]}
+    return analyze
+
+
+def compare(baseline, results, top: int) -> Dict[str, float]:
+    base_scores = {r.opportunity.opportunity_id: r.match_score for r in baseline}
+    scores = {r.opportunity.opportunity_id: r.match_score for r in results}
+    ids = sorted(base_scores)
+    tau = kendalltau([base_scores[i] for i in ids], [scores[i] for i in ids]).statistic
+    base_top = {r.opportunity.opportunity_id for r in baseline[:top]}
+    new_top = {r.opportunity.opportunity_id for r in results[:top]}
+    base_apply = {r.opportunity.opportunity_id for r in baseline if r.should_apply}
+    new_apply = {r.opportunity.opportunity_id for r in results if r.should_apply}
+    return {
+        'tau': tau,
+        'top_overlap': len(base_top & new_top) / max(1, len(base_top)),
+        'apply_recall': len(base_apply & new_apply) / max(1, len(base_apply)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--top", type=int, default=10, help="size of the top-N list compared")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per AI call")
+    args = parser.parse_args()
+
+    logger.remove()
+    matcher = OpportunityMatcher("", max_concurrency=8)
+    matcher.set_company_profile({'company_name': 'Benchmark Ltd', 'technical_keywords': KEYWORDS,
+                                 'all_content': " ".join(RELEVANT + KEYWORDS)})
+    matcher._ai_analyze_opportunity = simulated_analysis(args.latency)
+    opportunities = make_opportunities(args.count)
+
+    start = time.perf_counter()
+    baseline = matcher.match_opportunities(opportunities, max_ai_duration_secs=3600)
+    base_secs = time.perf_counter() - start
+    base_calls = matcher.last_match_stats['ai_calls']
+
+    print(f"{args.count:,} opportunities; agreement measured against AI analysis of all of them")
+    print(f"{'mode':<14} {'AI calls':>9} {'saved':>7} {'seconds':>8} {'kendall tau':>12} "
+          f"{'top-' + str(args.top):>7} {'apply recall':>13}")
+    print(f"{'all AI':<14} {base_calls:>9,} {0:>7,} {base_secs:>8.2f} {1.0:>12.3f} {1.0:>7.2f} {1.0:>13.2f}")
+    for name, cascade in CASCADES.items():
+        start = time.perf_counter()
+        results = matcher.match_opportunities(opportunities, max_ai_duration_secs=3600, cascade=cascade)
+        secs = time.perf_counter() - start
+        stats = matcher.last_match_stats
+        agreement = compare(baseline, results, args.top)
+        print(f"{name:<14} {stats['ai_calls']:>9,} {stats['ai_calls_saved']:>7,} {secs:>8.2f} "
+              f"{agreement['tau']:>12.3f} {agreement['top_overlap']:>7.2f} {agreement['apply_recall']:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+LLM client load test against the mock backend: throughput, retries and concurrency.
+
+Sends --requests completions through LLMClient over MockLLMBackend from a thread
+pool (complete), from asyncio tasks (acomplete) and as streams, with the given
+per-request latency and transient failure rate. No API key or network is needed.
+
+    python benchmarks/llm_client_load.py --requests 200 --latency 0.05 --failure-rate 0.1
+"""
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from loguru import logger
+
+from ai import LLMClient, MockLLMBackend
+
+
+def messages_for(i: int):
+    return [{"role": "system", "content": "You are a proposal writer."},
+            {"role": "user", "content": f"Write the technical approach for network security lot {i}."}]
+
+
+def run_threads(client: LLMClient, count: int, workers: int) -> None:
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda i: client.complete(messages_for(i), "mock", 200, 0.7), range(count)))
+
+
+def run_async(client: LLMClient, count: int) -> None:
+    async def main():
+        await asyncio.gather(*(client.acomplete(messages_for(i), "mock", 200, 0.7) for i in range(count)))
+    asyncio.run(main())
+
+
+def run_streams(client: LLMClient, count: int, workers: int) -> None:
+    def consume(i: int) -> int:
+        return sum(1 for _ in client.stream(messages_for(i), "mock", 200, 0.7))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(consume, range(count)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock seconds per request")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="fraction of requests that fail transiently")
+    parser.add_argument("--concurrency", type=int, default=8, help="LLMClient max_concurrency")
+    parser.add_argument("--workers", type=int, default=32, help="caller threads")
+    args = parser.parse_args()
+
+    logger.remove()
+    print(f"{args.requests:,} requests, {args.latency * 1000:.0f} ms mock latency, "
+          f"{args.failure_rate:.0%} transient failures, concurrency limit {args.concurrency}")
+    print(f"{'mode':<8} {'seconds':>8} {'req/s':>8} {'attempts':>9} {'retries':>8}")
+    modes = {
+        'threads': lambda client: run_threads(client, args.requests, args.workers),
+        'async': lambda client: run_async(client, args.requests),
+        'stream': lambda client: run_streams(client, args.requests, args.workers),
+    }
+    for name, run in modes.items():
+        backend = MockLLMBackend(latency_secs=args.latency, failure_rate=args.failure_rate, seed=1)
+        client = LLMClient(backend, max_concurrency=args.concurrency, max_retries=5, backoff_base_secs=0.01)
+        start = time.perf_counter()
+        run(client)
+        secs = time.perf_counter() - start
+        stats = client.stats()
+        print(f"{name:<8} {secs:>8.2f} {args.requests / secs:>8.1f} {stats['requests']:>9,} {stats['retries']:>8,}")
+    ideal = args.requests * args.latency / args.concurrency
+    print(f"Lower bound at this concurrency (no failures): {ideal:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for a warm store of BidOpportunity and MatchResult objects.
+
+Compares the slotted/interned dataclasses against an equivalent plain dataclass
+built from the same synthetic scraper output.
+
+    python benchmarks/memory_footprint.py --count 100000
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from scrapers import BidOpportunity
+from ai import MatchResult
+
+SOURCES = ["EGP Uganda", "Remotive", "RemoteOK", "United Nations", "New Vision Tenders", "SAMGov"]
+AGENCIES = ["Ministry of ICT", "Uganda Revenue Authority", "UNDP", "Kampala Capital City Authority",
+            "Bank of Uganda", "Remote Employer", "Ministry of Health", "UNICEF"]
+NAICS = ["541511", "541512", "541519", "541690"]
+CONFIDENCE = ["High", "Medium", "Low"]
+RECOMMENDATION = "Heuristic assessment used (quick match mode) - consider running full AI analysis for top results"
+
+
+@dataclass
+class PlainOpportunity:
+    title: str
+    description: str
+    agency: str
+    opportunity_id: str
+    due_date: datetime
+    estimated_value: Optional[float] = None
+    naics_codes: List[str] = None
+    keywords: List[str] = None
+    url: str = ""
+    source: str = ""
+
+    def __post_init__(self):
+        if self.naics_codes is None:
+            self.naics_codes = []
+        if self.keywords is None:
+            self.keywords = []
+
+
+@dataclass
+class PlainMatchResult:
+    opportunity: PlainOpportunity
+    match_score: float
+    confidence: str
+    matching_keywords: List[str]
+    missing_requirements: List[str]
+    recommendations: List[str]
+    required_documents: List[str] = field(default_factory=list)
+    required_attachments: List[str] = field(default_factory=list)
+    should_apply: bool = False
+
+
+def _fresh(s: str) -> str:
+    """Return a new string object equal to s, as a JSON/HTML parser would."""
+    return "".join(list(s))
+
+
+def build(count: int, opp_cls, match_cls) -> list:
+    now = datetime.now()
+    store = []
+    for i in range(count):
+        opp = opp_cls(
+            title=f"Supply of ICT equipment lot {i}",
+            description=f"Procurement notice {i} for network, software and support services.",
+            agency=_fresh(AGENCIES[i % len(AGENCIES)]),
+            opportunity_id=f"OPP-{i:07d}",
+            due_date=now + timedelta(days=i % 60),
+            naics_codes=[_fresh(NAICS[i % len(NAICS)])] if i % 3 == 0 else None,
+            url=f"https://example.org/notice/{i}",
+            source=_fresh(SOURCES[i % len(SOURCES)]),
+        )
+        store.append(match_cls(
+            opportunity=opp,
+            match_score=(i % 100) / 100.0,
+            confidence=_fresh(CONFIDENCE[i % len(CONFIDENCE)]),
+            matching_keywords=[],
+            missing_requirements=[],
+            recommendations=[_fresh(RECOMMENDATION)],
+        ))
+    return store
+
+
+def measure(label: str, count: int, opp_cls, match_cls) -> int:
+    gc.collect()
+    tracemalloc.start()
+    store = build(count, opp_cls, match_cls)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} {current / 1024 / 1024:8.1f} MiB  ({current / count:6.0f} bytes/result)")
+    del store
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory used by a warm opportunity/match store")
+    parser.add_argument("--count", type=int, default=100_000, help="Number of opportunities (default: 100000)")
+    args = parser.parse_args()
+
+    print(f"Building {args.count} opportunities with one MatchResult each")
+    plain = measure("plain", args.count, PlainOpportunity, PlainMatchResult)
+    compact = measure("compact", args.count, BidOpportunity, MatchResult)
+    print(f"Saved {(plain - compact) / 1024 / 1024:.1f} MiB ({100.0 * (plain - compact) / plain:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
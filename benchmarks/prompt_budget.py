@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Prompt size benchmark: tokens per LLM request for match analysis and application sections.
+
+Matches synthetic opportunities (descriptions from a few sentences to several pages)
+with AI analysis, one per request and in batches, and generates application sections
+for some of them. Requests go to an LLMClient over MockLLMBackend, which records
+the prompt size of each; the median, 90th percentile and maximum are reported.
+
+    python benchmarks/prompt_budget.py --count 200
+"""
+import argparse
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import numpy as np
+from loguru import logger
+
+from scrapers import BidOpportunity
+from processors import ProcessedDocument
+from ai import OpportunityMatcher, LLMClient, MockLLMBackend
+from ai.llm_client import mock_response
+from ai.tokens import count_tokens
+from applicators import ApplicationGenerator
+
+SENTENCES = [
+    "The contractor shall supply and install network security equipment at regional offices.",
+    "Bidders must provide evidence of ISO 27001 certification and three similar contracts.",
+    "The scope includes vulnerability assessment, penetration testing and incident response.",
+    "Delivery is required within ninety days of contract signature.",
+    "Managed SOC and SIEM monitoring services will run for an initial period of two years.",
+    "Evaluation will follow the quality and cost based selection method.",
+]
+KEYWORDS = ["cybersecurity", "network security", "penetration testing", "incident response", "SOC", "SIEM"]
+
+
+def make_opportunities(count: int, seed: int = 9) -> List[BidOpportunity]:
+    rng = random.Random(seed)
+    due = datetime.now() + timedelta(days=30)
+    opportunities = []
+    for i in range(count):
+        sentences = max(2, int(rng.lognormvariate(3, 1.2)))  # median ~20, long tail to hundreds
+        description = " ".join(rng.choice(SENTENCES) for _ in range(sentences))
+        opportunities.append(BidOpportunity(
+            title=f"Network security services lot {i}", description=description, agency="Ministry of ICT",
+            opportunity_id=f"PROMPT-{i}", due_date=due, source="Benchmark", naics_codes=["541512"]))
+    return opportunities
+
+
+def make_docs() -> List[ProcessedDocument]:
+    rng = random.Random(1)
+    paragraphs = {section: "\n".join(f"{section.title()} item {i}: " + " ".join(rng.sample(SENTENCES, 3))
+                                     for i in range(40))
+                  for section in ('experience', 'team', 'certifications', 'capabilities')}
+    content = "\n\n".join(paragraphs.values())
+    return [ProcessedDocument("profile.docx", ".docx", content, {}, KEYWORDS, paragraphs)]
+
+
+def recording_backend(sizes: Dict[str, List[int]], kind: List[str]) -> MockLLMBackend:
+    def respond(messages, max_tokens):
+        sizes.setdefault(kind[0], []).append(sum(count_tokens(m['content']) for m in messages))
+        return mock_response(messages, max_tokens)
+    return MockLLMBackend(responder=respond)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--generate", type=int, default=10, help="opportunities to generate applications for")
+    args = parser.parse_args()
+
+    logger.remove()
+    sizes: Dict[str, List[int]] = {}
+    kind = ['']
+    client = LLMClient(recording_backend(sizes, kind))
+    docs = make_docs()
+    profile = {'company_name': 'Benchmark Ltd', 'technical_keywords': KEYWORDS, 'all_content': docs[0].content,
+               'version': 'prompt-benchmark'}
+    opportunities = make_opportunities(args.count)
+    lengths = np.array([count_tokens(o.description) for o in opportunities])
+    print(f"{args.count:,} opportunities; description tokens median {np.median(lengths):.0f}, "
+          f"max {lengths.max():,}")
+
+    results = []
+    for name, batch_size in (("analysis", 1), ("analysis x5", 5)):
+        kind[0] = name
+        matcher = OpportunityMatcher("", batch_size=batch_size, llm_client=client)
+        matcher.set_company_profile(profile, docs)
+        results = matcher.match_opportunities(opportunities, max_ai_duration_secs=3600)
+
+    kind[0] = "sections"
+    with tempfile.TemporaryDirectory() as templates:
+        generator = ApplicationGenerator("", templates, llm_client=client)
+        for result in results[:args.generate]:
+            generator.generate_application(result, profile, docs, fast_mode=False)
+
+    print(f"{'requests':<12} {'count':>6} {'median':>7} {'p90':>6} {'max':>6}  (prompt tokens incl. system)")
+    for name, values in sizes.items():
+        values = np.array(values)
+        print(f"{name:<12} {len(values):>6} {np.median(values):>7.0f} {np.percentile(values, 90):>6.0f} "
+              f"{values.max():>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Section segmentation benchmark on large synthetic documents.
+
+Compares the single-pass segmenter (processors.sections) with the previous
+per-line loop over seven uncompiled patterns, and reports how many lines each one
+treats as section headings.
+
+    python benchmarks/section_segmentation.py --lines 200000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from processors.sections import segment_sections, header_section
+
+HEADINGS = ["Executive Summary", "Company Overview", "Technical Capabilities", "Past Performance",
+            "Certifications", "Key Personnel", "Methodology", "Cybersecurity Services:", "2. Project History"]
+BODY = [
+    "We deliver managed security services to government agencies across the region.",
+    "Our team has implemented SIEM monitoring for three ministries since 2019.",
+    "- Penetration testing and vulnerability assessment",
+    "- Incident response process aligned with NIST 800-61",
+    "The organization maintains ISO 27001 certification and trained staff.",
+    "Quarterly reporting summarises findings, remediation progress and risk trends.",
+    "Pricing assumptions are listed in Annex B.",
+]
+
+LEGACY_PATTERNS = {
+    'executive_summary': r'(?i)(executive\s+summary|summary)',
+    'company_overview': r'(?i)(company\s+overview|about\s+us|organization)',
+    'technical_capabilities': r'(?i)(technical\s+capabilities|capabilities|services)',
+    'experience': r'(?i)(experience|past\s+performance|project\s+history)',
+    'certifications': r'(?i)(certifications|certificates|credentials)',
+    'team': r'(?i)(team|personnel|staff|key\s+personnel)',
+    'methodology': r'(?i)(methodology|approach|process)'
+}
+
+
+def legacy_extract_sections(content: str) -> Dict[str, str]:
+    """The segmentation DocumentProcessor used before processors.sections."""
+    sections = {}
+    current_section = None
+    current_content = []
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        section_found = False
+        for section_name, pattern in LEGACY_PATTERNS.items():
+            if re.search(pattern, line):
+                if current_section and current_content:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = section_name
+                current_content = [line]
+                section_found = True
+                break
+        if not section_found and current_section:
+            current_content.append(line)
+    if current_section and current_content:
+        sections[current_section] = '\n'.join(current_content)
+    return sections
+
+
+def make_document(lines: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        if i % 40 == 0:
+            out.append("")
+            out.append(rng.choice(HEADINGS))
+        else:
+            out.append(rng.choice(BODY))
+    return "\n".join(out)
+
+
+def timed(fn, content: str, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(content)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = make_document(args.lines)
+    print(f"Document: {args.lines:,} lines, {len(content) / 2**20:.1f} MiB")
+
+    legacy_secs, legacy = timed(legacy_extract_sections, content, args.repeat)
+    new_secs, new = timed(segment_sections, content, args.repeat)
+
+    stripped = [line.strip() for line in content.splitlines() if line.strip()]
+    legacy_headers = sum(1 for line in stripped if any(re.search(p, line) for p in LEGACY_PATTERNS.values()))
+    new_headers = sum(1 for line in stripped if header_section(line))
+    true_headers = (args.lines + 39) // 40
+
+    print(f"{'':<10} {'seconds':>9} {'lines/s':>12} {'headers':>9} {'sections':>9}")
+    print(f"{'legacy':<10} {legacy_secs:>9.3f} {args.lines / legacy_secs:>12,.0f} {legacy_headers:>9,} {len(legacy):>9}")
+    print(f"{'single':<10} {new_secs:>9.3f} {args.lines / new_secs:>12,.0f} {new_headers:>9,} {len(new):>9}")
+    print(f"Actual headings in document: {true_headers:,}; speedup {legacy_secs / new_secs:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,8 @@ import sys
 import json
 import re
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable
+from datetime import datetime, timedelta
 import uvicorn
 from fastapi import FastAPI, Request, Form, File, UploadFile, HTTPException
 from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
@@ -16,6 +16,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 import asyncio
+import threading
 from loguru import logger
 from uuid import uuid4
 from typing import Tuple
@@ -43,9 +44,10 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from config import settings
 from scrapers import SAMGovScraper, FBOScraper, SampleScraper, RemotiveScraper, RemoteOKScraper, UgandaSampleScraper, EGPUgandaScraper, UpworkScraper, NewVisionTendersScraper, UnitedNationsScraper
-from processors import DocumentProcessor
-from ai import OpportunityMatcher, MatchResult
-from applicators import ApplicationGenerator, ApplicationSubmitter, EmailSender
+from processors import DocumentProcessor, DocumentStore, DocumentWatcher
+from ai import OpportunityMatcher, MatchResult, CascadeConfig, LLMResponseCache, LLMClient, CorpusTfidfModel
+from applicators import ApplicationGenerator, ApplicationSubmitter, EmailSender, SubmissionLog
+from storage import ColumnarExporter, OpportunityPool, FacetCounter, ProfileSnapshotStore, MatchCache, is_expired
 
 # Initialize FastAPI app
 app = FastAPI(title="AI Bid Application System", version="1.0.0")
@@ -74,14 +76,50 @@ class BidSystem:
     """Web-enabled bid application system."""
     
     def __init__(self):
-        self.document_processor = DocumentProcessor(settings.documents_folder)
-        self.opportunity_matcher = OpportunityMatcher(settings.openai_api_key)
+        self.document_processor = DocumentProcessor(
+            settings.documents_folder,
+            cache_file=settings.document_cache_file,
+            workers=settings.document_workers,
+            timeout_secs=settings.document_timeout_secs,
+            memory_limit_mb=settings.document_memory_limit_mb,
+            max_pages=settings.document_max_pages,
+            max_chars=settings.document_max_chars,
+            pdf_page_cache_folder=settings.pdf_page_cache_folder,
+            max_sheet_rows=settings.spreadsheet_max_rows,
+            max_sheet_cols=settings.spreadsheet_max_cols,
+        )
+        # One response cache for every LLM call site
+        self.llm_cache = LLMResponseCache(
+            settings.llm_cache_file,
+            ttl_secs=settings.llm_cache_ttl_hours * 3600,
+            max_entries=settings.llm_cache_max_entries
+        ) if settings.llm_cache_enabled else None
+        # Pooled connections, retries and a concurrency limit for every LLM request
+        self.llm_client = LLMClient.from_settings(settings)
+        # TF-IDF vectorizer fitted on the opportunities seen so far plus company documents
+        self.tfidf_model = CorpusTfidfModel.from_settings(settings) if settings.tfidf_corpus_enabled else None
+        self.opportunity_matcher = OpportunityMatcher(
+            settings.openai_api_key,
+            max_concurrency=settings.ai_max_concurrency,
+            batch_size=settings.ai_batch_size,
+            match_cache=MatchCache(settings.match_cache_file, settings.match_cache_max_entries),
+            llm_cache=self.llm_cache,
+            llm_client=self.llm_client,
+            tfidf_model=self.tfidf_model,
+            section_aggregation=settings.section_similarity_aggregation,
+            section_top_k=settings.section_similarity_top_k,
+            context_tokens=settings.prompt_context_tokens
+        )
         self.application_generator = ApplicationGenerator(
             settings.openai_api_key, 
-            settings.templates_folder
+            settings.templates_folder,
+            llm_cache=self.llm_cache,
+            llm_client=self.llm_client
         )
         self.application_submitter = ApplicationSubmitter(headless=True)
         self.email_sender = EmailSender()
+        self.submission_log = SubmissionLog(settings.submission_log_file)
+        self.exporter = ColumnarExporter(settings.columnar_export_folder) if settings.columnar_export_enabled else None
         
         # Initialize scrapers
         self.scrapers = [
@@ -99,6 +137,32 @@ class BidSystem:
         
         self.company_profile = None
         self.processed_docs = []
+        
+        # Content-addressed index of uploaded documents (one stored file per unique content)
+        self.document_store = DocumentStore(settings.documents_folder)
+        try:
+            self.document_store.reconcile()
+        except Exception as e:
+            logger.warning(f"Document store reconcile failed: {e}")
+        
+        # Saved profile + fitted matcher, keyed by the document-set fingerprint
+        self.profile_snapshots = ProfileSnapshotStore(settings.profile_snapshot_file)
+        self.profile_fingerprint: Optional[str] = None
+        self.profile_rebuild_task: Optional[asyncio.Task] = None
+        self.tfidf_refresh_task: Optional[asyncio.Task] = None
+        self._profile_lock = threading.Lock()
+        self.document_watcher: Optional[DocumentWatcher] = None
+        
+        # Due-date indexed pool of every live opportunity seen by searches
+        self.opportunity_pool = OpportunityPool(
+            archive_path=settings.expired_archive_file,
+            grace_secs=settings.expiry_grace_hours * 3600,
+            max_size=settings.opportunity_pool_max_size,
+            max_age_secs=settings.opportunity_pool_max_age_days * 86400
+        )
+        # Mirror of current_opportunities (the listing), so facet counts match what pages show
+        self.listed_pool = OpportunityPool()
+        self.facets = FacetCounter(self.listed_pool, self._classify_opportunity)
         self.current_opportunities = []
         self.match_results = []
         
@@ -117,27 +181,46 @@ class BidSystem:
         logger.info("Web Bid Application System initialized")
 
     async def process_documents(self) -> Dict[str, Any]:
-        """Process company documents."""
+        """Process company documents (in a worker thread; the build takes the profile lock)."""
+        return await asyncio.to_thread(self._build_profile)
+    
+    def _build_profile(self, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """Process documents, refit the matcher and save a fresh profile snapshot.
+        Builds are serialized; unchanged files come from the document cache, so only new or
+        changed files are extracted.
+        """
+        with self._profile_lock:
+            return self._build_profile_locked(progress)
+    
+    def _build_profile_locked(self, progress: Optional[Callable[[int, int], None]]) -> Dict[str, Any]:
         try:
-            self.processed_docs = self.document_processor.process_all_documents()
+            fingerprint = self.document_processor.document_fingerprint()
+            processed_docs = self.document_processor.process_all_documents(progress=progress)
             
-            if not self.processed_docs:
+            if not processed_docs:
+                self.processed_docs = processed_docs
                 return {
                     'status': 'warning',
                     'message': 'No documents found. Please upload company documents.',
                     'documents_processed': 0
                 }
             
-            # Create company profile
-            self.company_profile = self.document_processor.get_company_profile(self.processed_docs)
-            self.opportunity_matcher.set_company_profile(self.company_profile)
+            # Build the new profile off to the side, then publish it; matches already
+            # running keep the profile version they started with
+            company_profile = self.document_processor.get_company_profile(processed_docs)
+            self.opportunity_matcher.set_company_profile(company_profile, processed_docs)
+            self.processed_docs = processed_docs
+            self.company_profile = company_profile
+            self.profile_fingerprint = fingerprint
+            self.profile_snapshots.save(fingerprint, company_profile, processed_docs,
+                                        self.opportunity_matcher.export_state())
             
             return {
                 'status': 'success',
-                'message': f'Processed {len(self.processed_docs)} documents successfully',
-                'documents_processed': len(self.processed_docs),
-                'company_name': self.company_profile.get('company_name', 'Unknown'),
-                'technical_keywords': len(self.company_profile.get('technical_keywords', []))
+                'message': f'Processed {len(processed_docs)} documents successfully',
+                'documents_processed': len(processed_docs),
+                'company_name': company_profile.get('company_name', 'Unknown'),
+                'technical_keywords': len(company_profile.get('technical_keywords', []))
             }
             
         except Exception as e:
@@ -148,6 +231,93 @@ class BidSystem:
                 'documents_processed': 0
             }
 
+    def load_profile_snapshot(self) -> bool:
+        """Install the last saved profile; return True when it still matches the documents on disk."""
+        snapshot = self.profile_snapshots.load()
+        if not snapshot or not snapshot.get('company_profile'):
+            return False
+        try:
+            self.processed_docs = snapshot['processed_docs']
+            self.company_profile = snapshot['company_profile']
+            if snapshot.get('matcher_state'):
+                self.opportunity_matcher.restore_state(self.company_profile, snapshot['matcher_state'],
+                                                       self.processed_docs)
+            else:
+                self.opportunity_matcher.set_company_profile(self.company_profile, self.processed_docs)
+            self.profile_fingerprint = snapshot['fingerprint']
+        except Exception as e:
+            logger.warning(f"Could not apply profile snapshot: {e}")
+            return False
+        return self.profile_fingerprint == self.document_processor.document_fingerprint()
+    
+    def start_profile_rebuild(self) -> None:
+        """Rebuild the profile in a worker thread; the current profile keeps serving meanwhile."""
+        if self.profile_rebuild_task and not self.profile_rebuild_task.done():
+            return
+        
+        async def rebuild():
+            result = await asyncio.to_thread(self._build_profile)
+            logger.info(f"Background profile rebuild finished: {result.get('message')}")
+        
+        self.profile_rebuild_task = asyncio.create_task(rebuild())
+
+    def start_document_watcher(self) -> None:
+        """Reprocess the documents folder whenever files are copied in, changed or removed."""
+        if self.document_watcher is not None:
+            return
+        self.document_watcher = DocumentWatcher(
+            settings.documents_folder,
+            on_change=self._on_documents_changed,
+            interval_secs=settings.document_watch_interval_secs,
+            debounce_secs=settings.document_watch_debounce_secs,
+            is_supported=self.document_processor._is_supported_file
+        )
+        self.document_watcher.start()
+    
+    def stop_document_watcher(self) -> None:
+        if self.document_watcher is not None:
+            self.document_watcher.stop()
+            self.document_watcher = None
+    
+    def start_tfidf_refresher(self) -> None:
+        """Refit the corpus TF-IDF model in a worker thread whenever it is due, and otherwise
+        save newly recorded corpus text so a crash between refits does not lose it."""
+        if self.tfidf_model is None or (self.tfidf_refresh_task and not self.tfidf_refresh_task.done()):
+            return
+        
+        async def refresh():
+            while True:
+                try:
+                    if self.tfidf_model.refit_due():
+                        await asyncio.to_thread(self.opportunity_matcher.refit_vectorizer)
+                    else:
+                        await asyncio.to_thread(self.tfidf_model.save_if_changed)
+                except Exception as e:
+                    logger.warning(f"TF-IDF model refit failed: {e}")
+                await asyncio.sleep(settings.tfidf_check_interval_secs)
+        
+        self.tfidf_refresh_task = asyncio.create_task(refresh())
+    
+    def stop_tfidf_refresher(self) -> None:
+        if self.tfidf_refresh_task is not None:
+            self.tfidf_refresh_task.cancel()
+            self.tfidf_refresh_task = None
+        if self.tfidf_model is not None:
+            self.tfidf_model.save_if_changed()
+    
+    def _on_documents_changed(self, paths: List[str]) -> None:
+        """Watcher callback (runs on the watcher thread)."""
+        try:
+            self.document_store.reconcile()
+        except Exception as e:
+            logger.warning(f"Document store reconcile failed: {e}")
+        with self._profile_lock:
+            # An upload job or manual processing may already have picked the change up
+            if self.profile_fingerprint == self.document_processor.document_fingerprint():
+                return
+            result = self._build_profile_locked(None)
+        logger.info(f"Profile refreshed after {len(paths)} document change(s): {result.get('message')}")
+
     def _get_it_ict_keywords(self) -> List[str]:
         """Return a normalized list of IT/ICT-related keywords for global filtering."""
         base = (settings.it_keywords or []) + (settings.cybersecurity_keywords or [])
@@ -283,6 +453,27 @@ class BidSystem:
         else:
             return 'Uganda'
 
+    @property
+    def current_opportunities(self) -> List:
+        return self._current_opportunities
+    
+    @current_opportunities.setter
+    def current_opportunities(self, opportunities) -> None:
+        """Set the listing; facet counts are updated for the entries that changed."""
+        self._current_opportunities = list(opportunities)
+        self.listed_pool.replace_all(self._current_opportunities)
+    
+    def _classify_opportunity(self, opportunity) -> Dict[str, Any]:
+        """Facet values for one opportunity (used by the incremental facet counts)."""
+        location = self._get_opportunity_location(opportunity)
+        return {
+            'source': getattr(opportunity, 'source', ''),
+            'type': 'government' if self._is_government_bid(opportunity) else 'job',
+            'agency': getattr(opportunity, 'agency', ''),
+            'location': location,
+            'remote': 'remote' in location.lower(),
+        }
+
     def _is_uganda_location(self, opportunity) -> bool:
         """Heuristically decide if the opportunity is Uganda-based (or pertains to Uganda).
         This checks text, known sources, and URL TLD.
@@ -345,7 +536,7 @@ class BidSystem:
                 search_cache_key = self._get_search_cache_key(days_back, max_opportunities, quick_search, run_parallel, search_keywords)
                 cached_entry = self._search_cache_get(search_cache_key)
                 if cached_entry and cached_entry.get('opps'):
-                    self.current_opportunities = cached_entry['opps'][:max_opportunities]
+                    self.current_opportunities = self._drop_expired(cached_entry['opps'])[:max_opportunities]
                     elapsed_ms = (time.perf_counter() - start_time) * 1000
                     logger.info(f"Search cache hit: returned {len(self.current_opportunities)} opportunities in {elapsed_ms:.1f} ms")
                     return {
@@ -404,6 +595,8 @@ class BidSystem:
             
             # Remove duplicates
             unique_opportunities = self._remove_duplicate_opportunities(all_opportunities)
+            # Corpus for the TF-IDF model; the refresher refits it once enough are new
+            self.opportunity_matcher.observe_opportunities(unique_opportunities)
             
             # Global IT/ICT relevance filter (enforce only IT/ICT-related opportunities)
             # But make an exception for United Nations opportunities
@@ -420,6 +613,14 @@ class BidSystem:
             if len(uganda_only) < ug_before:
                 logger.info(f"Filtered non-Uganda opportunities: {ug_before - len(uganda_only)} excluded, {len(uganda_only)} remain")
             
+            # Track in the due-date pool and drop notices that can no longer be won
+            self.opportunity_pool.add_many(uganda_only)
+            self.opportunity_pool.evict_expired()
+            open_count = len(uganda_only)
+            uganda_only = self._drop_expired(uganda_only)
+            if len(uganda_only) < open_count:
+                logger.info(f"Filtered expired opportunities: {open_count - len(uganda_only)} excluded, {len(uganda_only)} remain")
+            
             # Build index and rank by relevance + urgency
             try:
                 self._index_opportunities(uganda_only)
@@ -453,8 +654,12 @@ class BidSystem:
                 'opportunities_found': 0
             }
 
-    async def match_opportunities(self, analyze_ai: bool = True, max_ai_duration_secs: int = 180) -> Dict[str, Any]:
-        """Match opportunities with company capabilities."""
+    async def match_opportunities(self, analyze_ai: bool = True, max_ai_duration_secs: int = 180,
+                                  cascade: Optional[bool] = None) -> Dict[str, Any]:
+        """Match opportunities with company capabilities.
+        cascade: AI-analyse only the heuristic shortlist (MATCH_CASCADE_* settings);
+        None uses MATCH_CASCADE, which is off by default.
+        """
         try:
             if not self.current_opportunities:
                 return {
@@ -470,8 +675,29 @@ class BidSystem:
                     'opportunities_matched': 0
                 }
             
+            # Skip notices whose deadline has passed since the search ran
+            self.opportunity_pool.evict_expired()
+            self.current_opportunities = self._drop_expired(self.current_opportunities)
+            if not self.current_opportunities:
+                return {
+                    'status': 'warning',
+                    'message': 'All current opportunities have passed their due date. Please search again.',
+                    'opportunities_matched': 0
+                }
+            
             # Match opportunities
-            self.match_results = self.opportunity_matcher.match_opportunities(self.current_opportunities, analyze_ai=analyze_ai, max_ai_duration_secs=max_ai_duration_secs)
+            use_cascade = settings.match_cascade if cascade is None else cascade
+            self.match_results = self.opportunity_matcher.match_opportunities(
+                self.current_opportunities, analyze_ai=analyze_ai, max_ai_duration_secs=max_ai_duration_secs,
+                cascade=CascadeConfig.from_settings(settings) if use_cascade else None
+            )
+            
+            # Append to the columnar export for reporting
+            if self.exporter is not None:
+                try:
+                    await asyncio.to_thread(self._export_match_results, self.match_results)
+                except Exception as e:
+                    logger.warning(f"Columnar export of match results failed: {e}")
             
             # Filter for applicable opportunities
             applicable_opportunities = [result for result in self.match_results if result.should_apply]
@@ -487,6 +713,7 @@ class BidSystem:
                     'match_score': r.match_score,
                     'confidence': r.confidence,
                     'should_apply': r.should_apply,
+                    'contributing_sections': list(r.contributing_sections),
                     'missing_requirements': r.missing_requirements,
                     'recommendations': r.recommendations,
                     'required_documents': getattr(r, 'required_documents', []),
@@ -498,6 +725,7 @@ class BidSystem:
                 'message': f'Matched {len(self.match_results)} opportunities, {len(applicable_opportunities)} are applicable',
                 'opportunities_matched': len(self.match_results),
                 'applicable_opportunities': len(applicable_opportunities),
+                'ai_stats': dict(self.opportunity_matcher.last_match_stats),
                 'results': simplified
             }
             
@@ -509,15 +737,18 @@ class BidSystem:
                 'opportunities_matched': 0
             }
     
-    async def generate_application(self, opportunity_id: str, fast_mode: Optional[bool] = None) -> Dict[str, Any]:
-        """Generate application for a specific opportunity (blocking call)."""
+    async def generate_application(self, opportunity_id: str, fast_mode: Optional[bool] = None,
+                                   regenerate: bool = False) -> Dict[str, Any]:
+        """Generate application for a specific opportunity (blocking call).
+        regenerate: ask the AI for new text rather than reusing cached responses.
+        """
         try:
             # Ensure documents and company profile are available
             if not self.processed_docs:
                 self.processed_docs = self.document_processor.process_all_documents()
             if not self.company_profile:
                 self.company_profile = self.document_processor.get_company_profile(self.processed_docs)
-                self.opportunity_matcher.set_company_profile(self.company_profile)
+                self.opportunity_matcher.set_company_profile(self.company_profile, self.processed_docs)
 
             # Find the opportunity via prior match results first
             match_result = None
@@ -562,7 +793,8 @@ class BidSystem:
 
             # Generate application
             application_package = self.application_generator.generate_application(
-                match_result, self.company_profile or {}, self.processed_docs or [], fast_mode=fast_mode
+                match_result, self.company_profile or {}, self.processed_docs or [], fast_mode=fast_mode,
+                regenerate=regenerate
             )
 
             # Save application package
@@ -587,15 +819,26 @@ class BidSystem:
             }
 
     # Background job helpers
-    def start_generation_job(self, opportunity_id: str, fast_mode: Optional[bool] = None, enhance_after: bool = False) -> str:
-        if len(self.jobs) >= settings.background_jobs_max:
+    def _admit_job(self) -> None:
+        """Forget finished jobs past their TTL; refuse (429) once too many are pending or running."""
+        cutoff = datetime.now() - timedelta(seconds=settings.background_jobs_ttl_secs)
+        for job_id in [j for j, job in self.jobs.items()
+                       if job.get('finished_at') and datetime.fromisoformat(job['finished_at']) < cutoff]:
+            del self.jobs[job_id]
+        active = sum(1 for job in self.jobs.values() if job.get('status') in ('pending', 'running'))
+        if active >= settings.background_jobs_max:
             raise HTTPException(status_code=429, detail="Too many background jobs. Please try again later.")
+
+    def start_generation_job(self, opportunity_id: str, fast_mode: Optional[bool] = None, enhance_after: bool = False,
+                             regenerate: bool = False) -> str:
+        self._admit_job()
         job_id = str(uuid4())
         self.jobs[job_id] = {
             'status': 'pending',
             'opportunity_id': opportunity_id,
             'fast_mode': fast_mode,
             'enhance_after': enhance_after,
+            'regenerate': regenerate,
             'started_at': datetime.now().isoformat(),
             'finished_at': None,
             'output_folder': None,
@@ -613,21 +856,22 @@ class BidSystem:
         opp_id = job['opportunity_id']
         fast_mode = job.get('fast_mode', None)
         enhance_after = bool(job.get('enhance_after'))
+        regenerate = bool(job.get('regenerate'))
         try:
             # Ensure preconditions
             if not self.processed_docs:
                 self.processed_docs = self.document_processor.process_all_documents()
             if not self.company_profile:
                 self.company_profile = self.document_processor.get_company_profile(self.processed_docs)
-                self.opportunity_matcher.set_company_profile(self.company_profile)
+                self.opportunity_matcher.set_company_profile(self.company_profile, self.processed_docs)
             # Blocking call to reuse existing logic
-            result = await self.generate_application(opp_id, fast_mode=fast_mode)
+            result = await self.generate_application(opp_id, fast_mode=fast_mode, regenerate=regenerate)
             if result.get('application_generated'):
                 job['output_folder'] = result.get('output_folder')
                 # Optional enhancement: run full AI generation and save separately
                 if enhance_after and (fast_mode is True or fast_mode is None and settings.fast_mode_default):
                     try:
-                        full_result = await self.generate_application(opp_id, fast_mode=False)
+                        full_result = await self.generate_application(opp_id, fast_mode=False, regenerate=regenerate)
                         if full_result.get('application_generated'):
                             job['enhanced_output_folder'] = full_result.get('output_folder')
                     except Exception as e:
@@ -639,6 +883,46 @@ class BidSystem:
             job['error'] = str(e)
             job['finished_at'] = datetime.now().isoformat()
 
+    def start_document_job(self) -> str:
+        """Rebuild the profile in the background after an upload; poll via /api/jobs/{job_id}.
+        The whole folder is rebuilt; the document cache means only new or changed files are extracted.
+        """
+        self._admit_job()
+        job_id = str(uuid4())
+        self.jobs[job_id] = {
+            'status': 'pending',
+            'type': 'document_processing',
+            'progress': {'done': 0, 'total': 0},
+            'started_at': datetime.now().isoformat(),
+            'finished_at': None,
+            'result': None,
+            'error': None,
+        }
+        asyncio.create_task(self._run_document_job(job_id))
+        return job_id
+
+    async def _run_document_job(self, job_id: str):
+        job = self.jobs.get(job_id)
+        if not job:
+            return
+        job['status'] = 'running'
+        
+        def progress(done: int, total: int):
+            job['progress'] = {'done': done, 'total': total}
+        
+        try:
+            result = await asyncio.to_thread(self._build_profile, progress)
+            job['result'] = result
+            if result.get('status') == 'error':
+                job['status'] = 'failed'
+                job['error'] = result.get('message')
+            else:
+                job['status'] = 'completed'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        job['finished_at'] = datetime.now().isoformat()
+
     def get_job_status(self, job_id: str) -> Dict[str, Any]:
         job = self.jobs.get(job_id)
         if not job:
@@ -654,11 +938,13 @@ class BidSystem:
         # Find opportunity details and match_result if available
         title = None
         agency = None
+        source = None
         matched: Optional[MatchResult] = None
         for result in self.match_results:
             if result.opportunity.opportunity_id == opportunity_id:
                 title = result.opportunity.title
                 agency = result.opportunity.agency
+                source = result.opportunity.source
                 matched = result
                 break
         if title is None:
@@ -666,6 +952,7 @@ class BidSystem:
                 if getattr(opp, 'opportunity_id', None) == opportunity_id:
                     title = getattr(opp, 'title', None)
                     agency = getattr(opp, 'agency', None)
+                    source = getattr(opp, 'source', None)
                     break
         if title is None:
             title = opportunity_id
@@ -711,7 +998,7 @@ class BidSystem:
 
         required_keywords: List[str] = []
         if matched is not None:
-            required_keywords = _expand_keywords(getattr(matched, 'required_documents', []) + getattr(matched, 'required_attachments', []))
+            required_keywords = _expand_keywords(list(getattr(matched, 'required_documents', [])) + list(getattr(matched, 'required_attachments', [])))
 
         # Merge requested extra keywords with defaults and required
         default_keywords = ["wic", "company profile", "technical capabilities"]
@@ -729,7 +1016,6 @@ class BidSystem:
             to=to,
             selected_only=selected_only
         )
-        return result
 
         # If missing application folder, try generating on-the-fly then retry sending
         if result.get('status') != 'success' and 'Application folder not found' in (result.get('message') or ''):
@@ -749,14 +1035,12 @@ class BidSystem:
                 logger.error(f"Auto-generate before email failed: {_e}")
 
         # Append to submission history log
-        logs_dir = Path("logs")
-        logs_dir.mkdir(exist_ok=True)
-        log_path = logs_dir / "submissions.json"
         entry = {
             'timestamp': datetime.now().isoformat(),
             'method': 'email',
             'opportunity_id': opportunity_id,
             'opportunity_title': title,
+            'source': source,
             'status': result.get('status'),
             'message': result.get('message'),
             'to': to or ([settings.smtp_to] if settings.smtp_to else [settings.smtp_from or settings.smtp_username]),
@@ -764,10 +1048,14 @@ class BidSystem:
             'extra_doc_keywords': merged_keywords,
         }
         try:
-            with open(log_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry) + "\n")
+            self.submission_log.append(entry)
         except Exception as e:
             logger.error(f"Failed to write submission log: {e}")
+        if self.exporter is not None:
+            try:
+                await asyncio.to_thread(self.exporter.append_outcomes, [entry])
+            except Exception as e:
+                logger.warning(f"Columnar export of submission outcome failed: {e}")
 
         # Map to API response
         if result.get('status') == 'success':
@@ -783,6 +1071,17 @@ class BidSystem:
                 'opportunity_id': opportunity_id
             }
     
+    def _export_match_results(self, match_results: List[MatchResult]) -> None:
+        """Append match results, with each opportunity's latest submission status, to the columnar export."""
+        outcomes = self.submission_log.latest_statuses(r.opportunity.opportunity_id for r in match_results)
+        self.exporter.append_match_results(match_results, outcomes)
+    
+    def _drop_expired(self, opportunities: List) -> List:
+        """Keep only opportunities whose due date (plus grace) has not passed."""
+        grace = self.opportunity_pool.grace_secs
+        now = time.time()
+        return [o for o in opportunities if not is_expired(o, now=now, grace_secs=grace)]
+    
     def _remove_duplicate_opportunities(self, opportunities: List) -> List:
         """Remove duplicate opportunities based on opportunity_id."""
         seen_ids = set()
@@ -802,10 +1101,27 @@ async def on_startup():
     bid_system = BidSystem()
     if settings.prewarm_on_startup:
         try:
-            await bid_system.process_documents()
-            logger.info("Prewarm completed: company profile cached")
+            if bid_system.load_profile_snapshot():
+                logger.info("Prewarm completed: company profile restored from snapshot")
+            elif bid_system.company_profile:
+                # Serve the stale snapshot while the changed documents are reprocessed
+                logger.info("Documents changed since the last snapshot; rebuilding profile in background")
+                bid_system.start_profile_rebuild()
+            else:
+                await bid_system.process_documents()
+                logger.info("Prewarm completed: company profile cached")
         except Exception as e:
             logger.warning(f"Prewarm failed: {e}")
+    if settings.document_watch_enabled:
+        bid_system.start_document_watcher()
+    bid_system.start_tfidf_refresher()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if bid_system:
+        bid_system.stop_document_watcher()
+        bid_system.stop_tfidf_refresher()
+        bid_system.llm_client.close()
 
 class SearchRequest(BaseModel):
     days_back: int = 7
@@ -822,6 +1138,7 @@ class GenerationRequest(BaseModel):
     fast_mode: Optional[bool] = None
     background: bool = True
     enhance_after: bool = False
+    regenerate: bool = False  # bypass the LLM response cache
 
 class EmailApplicationRequest(BaseModel):
     opportunity_id: str
@@ -1032,12 +1349,48 @@ async def get_government_opportunities(days_back: Optional[int] = None,
         'total': len(gov_opportunities)
     })
 
+@app.get("/api/opportunities/facets")
+async def get_opportunity_facets(top: Optional[int] = None):
+    """Counts of the listed opportunities (as /api/opportunities returns them) per source, type,
+    agency, location, remote flag and due-date bucket.
+    Served from aggregates updated as opportunities enter or leave the listing, so cost does not grow with its size.
+    """
+    return JSONResponse(content=bid_system.facets.snapshot(top=top))
+
+@app.get("/api/opportunities/closing_soon")
+async def get_closing_soon(days: float = 7, limit: Optional[int] = None):
+    """Open opportunities due within the next N days, soonest first (served from the due-date index)."""
+    bid_system.opportunity_pool.evict_expired()
+    closing = bid_system.opportunity_pool.closing_within(days)
+    if limit is not None:
+        closing = closing[:max(0, int(limit))]
+    now = datetime.now().timestamp()
+    opportunities = []
+    for opp in closing:
+        opportunities.append({
+            'opportunity_id': opp.opportunity_id,
+            'title': opp.title,
+            'agency': opp.agency,
+            'due_date': opp.due_date.isoformat() if opp.due_date else None,
+            'days_left': round((opp.due_date.timestamp() - now) / 86400, 1),
+            'url': opp.url,
+            'source': getattr(opp, 'source', ''),
+            'type': 'government' if bid_system._is_government_bid(opp) else 'job'
+        })
+    return JSONResponse(content={
+        'opportunities': opportunities,
+        'total': len(opportunities),
+        'pool_size': len(bid_system.opportunity_pool)
+    })
+
 @app.post("/api/opportunities/match")
-async def match_opportunities_route(analyze_ai: bool = True, max_ai_duration_secs: int = 180):
+async def match_opportunities_route(analyze_ai: bool = True, max_ai_duration_secs: int = 180,
+                                    cascade: Optional[bool] = None):
     """Match current opportunities against company profile."""
     result = await bid_system.match_opportunities(
         analyze_ai=analyze_ai,
-        max_ai_duration_secs=max_ai_duration_secs
+        max_ai_duration_secs=max_ai_duration_secs,
+        cascade=cascade
     )
     return JSONResponse(content=result)
 
@@ -1078,35 +1431,33 @@ async def get_application_history():
     return JSONResponse(content={'applications': history, 'total': len(history)})
 
 @app.get("/api/history/submissions")
-async def get_submission_history():
-    """Return submission attempts history from logs/submissions.json (newline-delimited JSON)."""
-    log_file = Path("logs/submissions.json")
-    entries: List[Dict[str, Any]] = []
-    if log_file.exists():
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entries.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        logger.warning("Skipping malformed submission log line")
-        except Exception as e:
-            logger.error(f"Failed to read submission history: {e}")
-    # Sort by timestamp desc
-    def sort_key2(entry: Dict[str, Any]):
-        try:
-            return datetime.fromisoformat(entry.get('timestamp'))
-        except Exception:
-            return datetime.min
-    entries.sort(key=sort_key2, reverse=True)
+async def get_submission_history(limit: int = 50,
+                                 cursor: Optional[str] = None,
+                                 opportunity_id: Optional[str] = None,
+                                 status: Optional[str] = None):
+    """Return a page of submission attempts, newest first.
+    Pass the returned 'next_cursor' back as 'cursor' to fetch the next page; filter by opportunity_id and/or status.
+    """
+    try:
+        page = bid_system.submission_log.page(
+            limit=max(1, min(int(limit), 500)),
+            cursor=cursor,
+            opportunity_id=opportunity_id,
+            status=status
+        )
+    except Exception as e:
+        logger.error(f"Failed to read submission history: {e}")
+        page = {'entries': [], 'next_cursor': None, 'total': 0}
+    entries = page['entries']
     # Ensure view_url key exists for UI
     for e in entries:
         if 'view_url' not in e and 'opportunity_url' in e:
             e['view_url'] = e.get('opportunity_url')
-    return JSONResponse(content={'submissions': entries, 'total': len(entries)})
+    return JSONResponse(content={
+        'submissions': entries,
+        'total': page['total'],
+        'next_cursor': page['next_cursor']
+    })
 
 # Delete a generated application by its folder path (relative to applications/)
 @app.delete("/api/applications/{folder_path:path}")
@@ -1134,12 +1485,26 @@ async def delete_application(folder_path: str):
 async def generate_application(request: GenerationRequest):
     """Generate application for an opportunity. Defaults to background job with optional fast_mode."""
     if request.background:
-        job_id = bid_system.start_generation_job(request.opportunity_id, fast_mode=request.fast_mode, enhance_after=request.enhance_after)
+        job_id = bid_system.start_generation_job(request.opportunity_id, fast_mode=request.fast_mode,
+                                                 enhance_after=request.enhance_after, regenerate=request.regenerate)
         return JSONResponse(content={'status': 'accepted', 'job_id': job_id})
     else:
-        result = await bid_system.generate_application(request.opportunity_id, fast_mode=request.fast_mode)
+        result = await bid_system.generate_application(request.opportunity_id, fast_mode=request.fast_mode,
+                                                       regenerate=request.regenerate)
         return JSONResponse(content=result)
 
+@app.get("/api/llm-cache/stats")
+async def llm_cache_stats():
+    """Hit/miss counters for the LLM response cache."""
+    if bid_system.llm_cache is None:
+        return JSONResponse(content={'enabled': False})
+    return JSONResponse(content=dict(bid_system.llm_cache.stats(), enabled=True))
+
+@app.get("/api/llm-client/stats")
+async def llm_client_stats():
+    """Request and retry counters for the LLM client."""
+    return JSONResponse(content=bid_system.llm_client.stats())
+
 @app.get("/api/jobs/{job_id}")
 async def get_job(job_id: str):
     status = bid_system.get_job_status(job_id)
@@ -1161,6 +1526,16 @@ async def email_application(request: EmailApplicationRequest):
         logger.error(f"/api/applications/email failed: {e}")
         return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+async def _upload_chunks(upload: UploadFile):
+    """Read an UploadFile in fixed-size chunks."""
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
 @app.post("/api/documents/upload")
 async def upload_document(file: List[UploadFile] = File(...)):
     """Upload one or more company documents (supports multiple files)."""
@@ -1172,6 +1547,7 @@ async def upload_document(file: List[UploadFile] = File(...)):
 
         uploaded = []
         failed = []
+        duplicates = 0
 
         allowed_extensions = {'.pdf', '.docx', '.doc', '.txt', '.xlsx', '.xls'}
 
@@ -1191,21 +1567,21 @@ async def upload_document(file: List[UploadFile] = File(...)):
                     })
                     continue
 
-                # Unique filename to avoid conflicts
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                safe_filename = f"{timestamp}_{f.filename}"
-                file_path = documents_folder / safe_filename
-
-                content = await f.read()
-                with open(file_path, "wb") as buffer:
-                    buffer.write(content)
-
-                logger.info(f"File saved to: {file_path}")
+                # Hash while streaming to disk; identical content is stored only once
+                stored = await bid_system.document_store.add_stream(
+                    _upload_chunks(f), Path(f.filename).name, max_bytes=settings.max_upload_mb * 1024 * 1024
+                )
+                if stored['duplicate']:
+                    duplicates += 1
+                else:
+                    logger.info(f"File saved to: {documents_folder / stored['stored_as']}")
 
                 uploaded.append({
                     'filename': f.filename,
-                    'saved_as': safe_filename,
-                    'file_size': len(content)
+                    'saved_as': stored['stored_as'],
+                    'file_size': stored['size'],
+                    'sha256': stored['sha256'],
+                    'duplicate': stored['duplicate']
                 })
             except Exception as inner_e:
                 logger.error(f"Failed to save {f.filename}: {inner_e}")
@@ -1215,41 +1591,32 @@ async def upload_document(file: List[UploadFile] = File(...)):
         message = (
             f"Uploaded {len(uploaded)} file(s)." if uploaded else "No files uploaded."
         )
+        if duplicates:
+            message += f" {duplicates} already stored (same content)."
         if failed:
             message += f" Failed: {len(failed)} file(s)."
 
-        # Auto-process documents immediately after successful upload(s)
-        auto_processed = False
-        processing_result = None
-        if uploaded:
+        # Reprocess in the background when the upload added new content; the response
+        # returns right away and the job can be polled at /api/jobs/{job_id}
+        processing_job_id = None
+        if any(not u['duplicate'] for u in uploaded):
             try:
-                processing_result = await bid_system.process_documents()
-                auto_processed = True
-
-                # Blend processing outcome into overall status/message while preserving details
-                proc_status = (processing_result or {}).get('status')
-                proc_message = (processing_result or {}).get('message')
-                if proc_message:
-                    message += f" {proc_message}"
-                if proc_status == 'error':
-                    # Downgrade overall to warning if upload itself was success
-                    status = 'warning' if status == 'success' else status
-                elif proc_status == 'warning':
-                    if status == 'success':
-                        status = 'warning'
-            except Exception as proc_e:
-                logger.error(f"Auto-processing after upload failed: {proc_e}")
+                processing_job_id = bid_system.start_document_job()
+                message += " Processing started in the background."
+            except HTTPException as e:
+                # Never extract inside the request; the next processing run picks the files up
+                logger.warning(f"Could not schedule document processing: {e.detail}")
                 if status == 'success':
                     status = 'warning'
-                message += " Auto-processing failed."
+                message += " Processing deferred (too many background jobs); run it from /api/documents/process."
 
         return JSONResponse(content={
             'status': status,
             'message': message,
             'uploaded': uploaded,
             'failed': failed,
-            'auto_processed': auto_processed,
-            'processing': processing_result
+            'auto_processed': processing_job_id is not None,
+            'processing_job_id': processing_job_id
         })
 
     except Exception as e:
@@ -1260,12 +1627,19 @@ async def upload_document(file: List[UploadFile] = File(...)):
 async def get_documents():
     """List documents in the documents folder."""
     docs_dir = Path(settings.documents_folder)
+    names_by_file = {d['stored_as']: d for d in bid_system.document_store.documents()} if bid_system else {}
     docs = []
     if docs_dir.exists():
-        for p in docs_dir.iterdir():
-            if p.is_file():
-                docs.append({'name': p.name, 'path': str(p)})
-    return JSONResponse(content={'documents': docs, 'total': len(docs)})
+        for p in sorted(docs_dir.rglob('*')):
+            rel = p.relative_to(docs_dir)
+            if p.is_file() and not any(part.startswith('.') for part in rel.parts):
+                doc = {'name': rel.as_posix(), 'path': str(p)}
+                stored = names_by_file.get(rel.as_posix())
+                if stored:
+                    doc['sha256'] = stored['sha256']
+                    doc['uploaded_as'] = stored['names']
+                docs.append(doc)
+    return JSONResponse(content={'documents': docs, 'total': len(docs), 'unique': len(names_by_file)})
 
 @app.get("/applications/{path:path}")
 async def serve_application_files(path: str):
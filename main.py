@@ -16,21 +16,58 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 from config import settings
 from scrapers import SAMGovScraper, FBOScraper, SampleScraper, RemotiveScraper, RemoteOKScraper, UgandaSampleScraper, EGPUgandaScraper, UpworkScraper, NewVisionTendersScraper
 from processors import DocumentProcessor
-from ai import OpportunityMatcher
+from ai import OpportunityMatcher, CascadeConfig, LLMResponseCache, LLMClient, CorpusTfidfModel
 from applicators import ApplicationGenerator, ApplicationSubmitter
+from storage import ColumnarExporter, OpportunityPool, ProfileSnapshotStore, MatchCache
 
 class BidApplicationSystem:
     """Main system for automated bid applications."""
     
     def __init__(self):
         self.setup_logging()
-        self.document_processor = DocumentProcessor(settings.documents_folder)
-        self.opportunity_matcher = OpportunityMatcher(settings.openai_api_key)
+        self.document_processor = DocumentProcessor(
+            settings.documents_folder,
+            cache_file=settings.document_cache_file,
+            workers=settings.document_workers,
+            timeout_secs=settings.document_timeout_secs,
+            memory_limit_mb=settings.document_memory_limit_mb,
+            max_pages=settings.document_max_pages,
+            max_chars=settings.document_max_chars,
+            pdf_page_cache_folder=settings.pdf_page_cache_folder,
+            max_sheet_rows=settings.spreadsheet_max_rows,
+            max_sheet_cols=settings.spreadsheet_max_cols,
+        )
+        # One response cache for every LLM call site
+        self.llm_cache = LLMResponseCache(
+            settings.llm_cache_file,
+            ttl_secs=settings.llm_cache_ttl_hours * 3600,
+            max_entries=settings.llm_cache_max_entries
+        ) if settings.llm_cache_enabled else None
+        # Pooled connections, retries and a concurrency limit for every LLM request
+        self.llm_client = LLMClient.from_settings(settings)
+        # TF-IDF vectorizer fitted on the opportunities seen so far plus company documents
+        self.tfidf_model = CorpusTfidfModel.from_settings(settings) if settings.tfidf_corpus_enabled else None
+        self.opportunity_matcher = OpportunityMatcher(
+            settings.openai_api_key,
+            max_concurrency=settings.ai_max_concurrency,
+            batch_size=settings.ai_batch_size,
+            match_cache=MatchCache(settings.match_cache_file, settings.match_cache_max_entries),
+            llm_cache=self.llm_cache,
+            llm_client=self.llm_client,
+            tfidf_model=self.tfidf_model,
+            section_aggregation=settings.section_similarity_aggregation,
+            section_top_k=settings.section_similarity_top_k,
+            context_tokens=settings.prompt_context_tokens
+        )
         self.application_generator = ApplicationGenerator(
             settings.openai_api_key, 
-            settings.templates_folder
+            settings.templates_folder,
+            llm_cache=self.llm_cache,
+            llm_client=self.llm_client
         )
         self.application_submitter = ApplicationSubmitter(headless=True)
+        self.exporter = ColumnarExporter(settings.columnar_export_folder) if settings.columnar_export_enabled else None
+        self.profile_snapshots = ProfileSnapshotStore(settings.profile_snapshot_file)
         
         # Initialize scrapers
         self.scrapers = [
@@ -85,15 +122,25 @@ class BidApplicationSystem:
         try:
             # Step 1: Process company documents
             logger.info("Step 1: Processing company documents...")
-            processed_docs = self.document_processor.process_all_documents()
-            
-            if not processed_docs:
-                logger.warning("No documents found. Please add company documents to the documents folder.")
-                return {'status': 'warning', 'message': 'No documents found'}
-            
-            # Create company profile
-            company_profile = self.document_processor.get_company_profile(processed_docs)
-            self.opportunity_matcher.set_company_profile(company_profile)
+            fingerprint = self.document_processor.document_fingerprint()
+            snapshot = self.profile_snapshots.load()
+            if snapshot and snapshot['fingerprint'] == fingerprint and snapshot.get('matcher_state'):
+                # Documents unchanged since the last run: reuse the saved profile and fitted matcher
+                processed_docs = snapshot['processed_docs']
+                company_profile = snapshot['company_profile']
+                self.opportunity_matcher.restore_state(company_profile, snapshot['matcher_state'], processed_docs)
+            else:
+                processed_docs = self.document_processor.process_all_documents()
+                
+                if not processed_docs:
+                    logger.warning("No documents found. Please add company documents to the documents folder.")
+                    return {'status': 'warning', 'message': 'No documents found'}
+                
+                # Create company profile
+                company_profile = self.document_processor.get_company_profile(processed_docs)
+                self.opportunity_matcher.set_company_profile(company_profile, processed_docs)
+                self.profile_snapshots.save(fingerprint, company_profile, processed_docs,
+                                            self.opportunity_matcher.export_state())
             
             logger.info(f"Processed {len(processed_docs)} documents")
             logger.info(f"Company: {company_profile.get('company_name', 'Unknown')}")
@@ -118,18 +165,48 @@ class BidApplicationSystem:
                 logger.warning("No opportunities found")
                 return {'status': 'warning', 'message': 'No opportunities found'}
             
-            # Remove duplicates and limit
+            # Remove duplicates, drop expired notices and limit
             unique_opportunities = self._remove_duplicate_opportunities(all_opportunities)
+            pool = OpportunityPool(
+                archive_path=settings.expired_archive_file,
+                grace_secs=settings.expiry_grace_hours * 3600
+            )
+            pool.add_many(unique_opportunities)
+            pool.evict_expired()
+            unique_opportunities = [o for o in unique_opportunities if o.opportunity_id in pool]
             unique_opportunities = unique_opportunities[:max_opportunities]
             
             logger.info(f"Found {len(unique_opportunities)} unique opportunities")
             
+            # Grow the TF-IDF corpus; refits (and switches the matcher) only when due
+            if self.tfidf_model is not None:
+                self.opportunity_matcher.observe_opportunities(unique_opportunities)
+                self.opportunity_matcher.refit_vectorizer()
+                self.tfidf_model.save_if_changed()
+            
             # Step 3: Match opportunities
             logger.info("Step 3: Matching opportunities with company capabilities...")
-            match_results = self.opportunity_matcher.match_opportunities(unique_opportunities)
+            match_results = self.opportunity_matcher.match_opportunities(
+                unique_opportunities, cascade=CascadeConfig.from_settings(settings) if settings.match_cascade else None
+            )
+            stats = self.opportunity_matcher.last_match_stats
+            logger.info(f"AI calls: {stats.get('ai_calls', 0)} made, {stats.get('cache_hits', 0)} answered from cache, "
+                        f"{stats.get('ai_calls_saved', 0)} saved; {stats.get('ai_requests', 0)} requests, "
+                        f"~{stats.get('prompt_tokens', 0)} prompt tokens")
             
-            # Filter for opportunities we should apply to
-            applicable_opportunities = [result for result in match_results if result.should_apply]
+            # Append to the columnar export for reporting
+            if self.exporter is not None:
+                try:
+                    outcomes = self.application_submitter.submission_history.latest_statuses(
+                        r.opportunity.opportunity_id for r in match_results)
+                    self.exporter.append_match_results(match_results, outcomes)
+                except Exception as e:
+                    logger.warning(f"Columnar export of match results failed: {e}")
+            
+            # Filter for opportunities we should apply to, soonest deadline first (pool index order)
+            applicable = {r.opportunity.opportunity_id: r for r in match_results if r.should_apply}
+            applicable_opportunities = [applicable[opp.opportunity_id] for opp in pool.iter_by_deadline()
+                                        if opp.opportunity_id in applicable]
             
             logger.info(f"Found {len(applicable_opportunities)} applicable opportunities")
             
@@ -157,6 +234,16 @@ class BidApplicationSystem:
                             match_result, application_package, auto_submit=True
                         )
                         
+                        if self.exporter is not None:
+                            try:
+                                self.exporter.append_outcomes([{
+                                    'opportunity_id': match_result.opportunity.opportunity_id,
+                                    'status': submission_result.get('status'),
+                                    'source': match_result.opportunity.source,
+                                }])
+                            except Exception as e:
+                                logger.warning(f"Columnar export of submission outcome failed: {e}")
+                        
                         if submission_result.get('status') == 'submitted':
                             applications_submitted += 1
                             logger.info(f"Successfully submitted application for: {match_result.opportunity.title}")
@@ -1,7 +1,13 @@
 """
 AI package for opportunity matching and analysis.
 """
-from .opportunity_matcher import OpportunityMatcher, MatchResult
-
-__all__ = ["OpportunityMatcher", "MatchResult"]
+from .opportunity_matcher import OpportunityMatcher, MatchResult, CascadeConfig
+from .retrieval import RetrievalIndex, index_for_profile
+from .tokens import estimate_tokens
+from .llm_cache import LLMResponseCache, chat_completion
+from .corpus_tfidf import CorpusTfidfModel
+from .llm_client import LLMClient, MockLLMBackend, OpenAIBackend, TransientLLMError, LLMCancelled
 
+__all__ = ["OpportunityMatcher", "MatchResult", "CascadeConfig", "RetrievalIndex", "index_for_profile", "estimate_tokens",
+           "LLMResponseCache", "chat_completion", "LLMClient", "MockLLMBackend", "OpenAIBackend", "TransientLLMError",
+           "LLMCancelled", "CorpusTfidfModel"]
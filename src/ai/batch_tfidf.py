@@ -0,0 +1,140 @@
+"""
+Bulk TF-IDF transform for a fitted TfidfVectorizer.
+"""
+from itertools import repeat
+from typing import Dict, List, Sequence
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+# Word ids with special meaning; real words are >= 0
+UNKNOWN = -1  # token not used by any vocabulary term
+DROPPED = -2  # stop word or one-character token: removed before n-grams, like the sklearn analyzer
+SEPARATOR = -3  # boundary between two texts
+
+_SEPARATOR = b'\x00'
+# Lowercase ASCII word characters, everything else becomes a space (the separator byte is kept)
+_TABLE = bytes(
+    c if c == 0 else (ord(chr(c).lower()) if chr(c).isalnum() or chr(c) == '_' else 32)
+    for c in range(128)
+) + bytes(range(128, 256))
+
+
+class BatchTfidfTransformer:
+    """Same result as vectorizer.transform(texts), computed for the whole batch at once.
+
+    The sklearn analyzer runs a regex and builds n-gram strings per text in Python.
+    Here all ASCII texts are joined, lowercased and split in one pass, tokens are
+    mapped to integer word ids, and unigram / bigram features are looked up with
+    NumPy. Only the default word analyzer with n-grams up to 2 is handled this way;
+    other configurations and non-ASCII texts go through vectorizer.transform.
+    """
+
+    def __init__(self, vectorizer: TfidfVectorizer):
+        self.vectorizer = vectorizer
+        self.supported = self.supports(vectorizer)
+        if not self.supported:
+            return
+        word_ids: Dict[bytes, int] = {}
+        unigrams: Dict[int, int] = {}
+        bigrams: Dict[tuple, int] = {}
+        for term, feature in vectorizer.vocabulary_.items():
+            ids = tuple(word_ids.setdefault(word.encode('utf-8'), len(word_ids)) for word in term.split(' '))
+            if len(ids) == 1:
+                unigrams[ids[0]] = feature
+            else:
+                bigrams[ids] = feature
+        self.n_words = len(word_ids)
+        self.unigram_features = np.full(self.n_words, -1, dtype=np.int64)
+        for word, feature in unigrams.items():
+            self.unigram_features[word] = feature
+        keys = np.array([a * self.n_words + b for a, b in bigrams], dtype=np.int64)
+        order = np.argsort(keys)
+        self.bigram_keys = keys[order]
+        self.bigram_features = np.array(list(bigrams.values()), dtype=np.int64)[order]
+
+        for word in vectorizer.get_stop_words() or ():
+            word_ids.setdefault(word.encode('utf-8'), DROPPED)
+        for c in range(128):
+            if _TABLE[c] not in (0, 32):
+                word_ids.setdefault(bytes([_TABLE[c]]), DROPPED)
+        word_ids[_SEPARATOR] = SEPARATOR
+        self.word_ids = word_ids
+
+    @staticmethod
+    def supports(vectorizer: TfidfVectorizer) -> bool:
+        """True when the fitted vectorizer uses the analyzer this class reproduces."""
+        return (
+            hasattr(vectorizer, 'vocabulary_')
+            and vectorizer.analyzer == 'word'
+            and vectorizer.tokenizer is None
+            and vectorizer.preprocessor is None
+            and vectorizer.lowercase
+            and vectorizer.strip_accents is None
+            and vectorizer.token_pattern == DEFAULT_TOKEN_PATTERN
+            and vectorizer.ngram_range[1] <= 2
+            and not vectorizer.binary
+        )
+
+    def transform(self, texts: Sequence[str]):
+        """TF-IDF matrix (CSR, one row per text) for texts."""
+        texts = list(texts)
+        if not self.supported:
+            return self.vectorizer.transform(texts)
+        fast_rows = [i for i, text in enumerate(texts) if text.isascii() and '\x00' not in text]
+        if len(fast_rows) == len(texts):
+            return self._weight(self._counts(texts))
+        slow_rows = [i for i, text in enumerate(texts) if not (text.isascii() and '\x00' not in text)]
+        fast = self._weight(self._counts([texts[i] for i in fast_rows]))
+        slow = self.vectorizer.transform([texts[i] for i in slow_rows])
+        stacked = sparse.vstack([fast, slow]).tocsr()
+        return stacked[np.argsort(np.array(fast_rows + slow_rows, dtype=np.int64), kind='stable')]
+
+    def _counts(self, texts: List[str]) -> sparse.csr_matrix:
+        """Raw n-gram counts for ASCII texts."""
+        n_features = len(self.vectorizer.vocabulary_)
+        if not texts:
+            return sparse.csr_matrix((0, n_features), dtype=np.float64)
+        tokens = b' \x00 '.join(text.encode('ascii') for text in texts).translate(_TABLE).split()
+        ids = np.fromiter(map(self.word_ids.get, tokens, repeat(UNKNOWN)), dtype=np.int64, count=len(tokens))
+        ids = ids[ids != DROPPED]
+        is_separator = ids == SEPARATOR
+        rows = np.cumsum(is_separator)[~is_separator]
+        ids = ids[~is_separator]
+
+        known = ids >= 0
+        unigram_cols = np.full(len(ids), -1, dtype=np.int64)
+        unigram_cols[known] = self.unigram_features[ids[known]]
+        hit = unigram_cols >= 0
+        row_parts, col_parts = [rows[hit]], [unigram_cols[hit]]
+
+        if len(self.bigram_keys) and len(ids) > 1:
+            pairs = (rows[:-1] == rows[1:]) & known[:-1] & known[1:]
+            keys = ids[:-1][pairs] * self.n_words + ids[1:][pairs]
+            pos = np.minimum(np.searchsorted(self.bigram_keys, keys), len(self.bigram_keys) - 1)
+            found = self.bigram_keys[pos] == keys
+            row_parts.append(rows[:-1][pairs][found])
+            col_parts.append(self.bigram_features[pos[found]])
+
+        row_index = np.concatenate(row_parts)
+        col_index = np.concatenate(col_parts)
+        counts = sparse.csr_matrix((np.ones(len(row_index)), (row_index, col_index)),
+                                   shape=(len(texts), n_features), dtype=np.float64)
+        counts.sum_duplicates()
+        counts.sort_indices()
+        return counts
+
+    def _weight(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Apply the vectorizer's tf / idf weighting and normalization."""
+        vectorizer = self.vectorizer
+        if vectorizer.sublinear_tf:
+            np.log(counts.data, counts.data)
+            counts.data += 1.0
+        if vectorizer.use_idf:
+            counts.data *= vectorizer.idf_[counts.indices]
+        if vectorizer.norm is not None:
+            counts = normalize(counts, norm=vectorizer.norm, copy=False)
+        return counts
@@ -0,0 +1,216 @@
+"""
+TF-IDF vectorizer fitted on the accumulated opportunity corpus plus company documents.
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from loguru import logger
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+MODEL_VERSION = 1
+MAX_TEXT_CHARS = 5000  # per corpus document; enough for document frequencies
+
+
+class CorpusTfidfModel:
+    """Corpus-fitted TF-IDF vectorizer, persisted to disk and refit on a schedule.
+
+    Fitting on the single concatenated profile text gives every term the same IDF.
+    Here opportunity texts seen by searches accumulate (deduplicated, the newest
+    max_documents kept) next to the company documents, and the vectorizer is fitted
+    on all of them. add_opportunities() and set_company_texts() only record text;
+    refit() runs when refit_due() says so: when no model exists yet, when the
+    company documents changed, when refit_min_new documents arrived, or when
+    refit_interval_secs passed with any new documents. Until the corpus has
+    min_documents texts no model is fitted and callers keep their own fallback.
+    Recorded text reaches disk on every refit and whenever save_if_changed() runs
+    (the web app calls it from its refresh loop), so a crash loses little of it.
+    The file is written by this application only; it is never loaded from untrusted input.
+    """
+
+    def __init__(self, model_file: str, max_documents: int = 20000, max_features: int = 20000,
+                 refit_interval_secs: float = 86400, refit_min_new: int = 200, min_documents: int = 50):
+        self.model_file = Path(model_file)
+        self.max_documents = max_documents
+        self.max_features = max_features
+        self.refit_interval_secs = refit_interval_secs
+        self.refit_min_new = refit_min_new
+        self.min_documents = min_documents
+        self.vectorizer: Optional[TfidfVectorizer] = None
+        self.version = ''
+        self.fitted_at = 0.0
+        self._texts: 'OrderedDict[str, str]' = OrderedDict()
+        self._company_texts: List[str] = []
+        self._company_digest = ''
+        self._fitted_company_digest = ''
+        self.new_since_fit = 0
+        self._changed = False  # texts recorded since the last save
+        self._lock = threading.Lock()
+        self._refit_lock = threading.Lock()
+        self.load()
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> 'CorpusTfidfModel':
+        return cls(settings.tfidf_model_file, max_documents=settings.tfidf_max_documents,
+                   max_features=settings.tfidf_max_features,
+                   refit_interval_secs=settings.tfidf_refit_interval_hours * 3600,
+                   refit_min_new=settings.tfidf_refit_min_new_documents, min_documents=settings.tfidf_min_documents)
+
+    @staticmethod
+    def new_vectorizer(max_features: int) -> TfidfVectorizer:
+        return TfidfVectorizer(
+            max_features=max_features,
+            stop_words='english',
+            ngram_range=(1, 2),
+            sublinear_tf=True
+        )
+
+    def add_texts(self, texts: Iterable[str]) -> int:
+        """Record corpus texts; returns how many were new."""
+        added = 0
+        with self._lock:
+            for text in texts:
+                text = (text or '').strip()[:MAX_TEXT_CHARS]
+                if not text:
+                    continue
+                digest = hashlib.sha1(text.encode('utf-8', 'ignore')).hexdigest()
+                if digest in self._texts:
+                    self._texts.move_to_end(digest)
+                    continue
+                self._texts[digest] = text
+                added += 1
+            while len(self._texts) > self.max_documents:
+                self._texts.popitem(last=False)
+            self.new_since_fit += added
+            self._changed = self._changed or added > 0
+        return added
+
+    def add_opportunities(self, opportunities: Iterable[Any]) -> int:
+        return self.add_texts(f"{opportunity.title} {opportunity.description}" for opportunity in opportunities)
+
+    def set_company_texts(self, texts: Iterable[str]) -> None:
+        """Company documents to fit on alongside the opportunities (one text per document)."""
+        texts = [text[:MAX_TEXT_CHARS * 4] for text in texts if text and text.strip()]
+        digest = hashlib.sha1('\x1e'.join(texts).encode('utf-8', 'ignore')).hexdigest()
+        with self._lock:
+            self._changed = self._changed or digest != self._company_digest
+            self._company_texts = texts
+            self._company_digest = digest
+
+    def current(self) -> Tuple[Optional[TfidfVectorizer], str]:
+        """The fitted vectorizer and its version (None, '' before the first fit)."""
+        with self._lock:
+            return self.vectorizer, self.version
+
+    def corpus_size(self) -> int:
+        with self._lock:
+            return len(self._texts) + len(self._company_texts)
+
+    def refit_due(self) -> bool:
+        with self._lock:
+            size = len(self._texts) + len(self._company_texts)
+            if size < self.min_documents:
+                return False
+            if self.vectorizer is None or self._company_digest != self._fitted_company_digest:
+                return True
+            if self.new_since_fit >= self.refit_min_new:
+                return True
+            return self.new_since_fit > 0 and time.time() - self.fitted_at >= self.refit_interval_secs
+
+    def refit(self, force: bool = False) -> bool:
+        """Fit a new vectorizer on the current corpus and save it; True when one was published."""
+        with self._refit_lock:
+            if not force and not self.refit_due():
+                return False
+            with self._lock:
+                corpus = list(self._texts.values()) + self._company_texts
+                company_digest = self._company_digest
+                counted = self.new_since_fit
+            if len(corpus) < (2 if force else self.min_documents):
+                return False
+            start = time.perf_counter()
+            vectorizer = self.new_vectorizer(self.max_features)
+            vectorizer.fit(corpus)
+            version = hashlib.sha1(f"{time.time()}:{len(corpus)}:{company_digest}".encode()).hexdigest()[:16]
+            with self._lock:
+                self.vectorizer = vectorizer
+                self.version = version
+                self.fitted_at = time.time()
+                self._fitted_company_digest = company_digest
+                self.new_since_fit = max(0, self.new_since_fit - counted)
+            logger.info(f"Fitted TF-IDF model {version[:8]} on {len(corpus)} documents "
+                        f"({len(vectorizer.vocabulary_)} terms) in {time.perf_counter() - start:.2f}s")
+            self.save()
+            return True
+
+    def load(self) -> bool:
+        if not self.model_file.exists():
+            return False
+        try:
+            with open(self.model_file, 'rb') as f:
+                state = pickle.load(f)
+            if not isinstance(state, dict) or state.get('model_version') != MODEL_VERSION:
+                logger.info("TF-IDF model format changed; ignoring the saved model")
+                return False
+            with self._lock:
+                self.vectorizer = state['vectorizer']
+                self.version = state['version']
+                self.fitted_at = state['fitted_at']
+                self._texts = OrderedDict(state['texts'])
+                self._company_texts = state['company_texts']
+                self._company_digest = state['company_digest']
+                self._fitted_company_digest = state['fitted_company_digest']
+                self.new_since_fit = state.get('new_since_fit', 0)
+            logger.info(f"Loaded TF-IDF model {self.version[:8]} ({len(self._texts)} corpus documents)")
+            return True
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable TF-IDF model {self.model_file}: {e}")
+            return False
+
+    def save_if_changed(self) -> bool:
+        """Save when texts were recorded since the last save; True when it wrote the file."""
+        with self._lock:
+            changed = self._changed
+        if changed:
+            self.save()
+        return changed
+
+    def save(self) -> None:
+        with self._lock:
+            self._changed = False
+            state = {
+                'model_version': MODEL_VERSION,
+                'vectorizer': self.vectorizer,
+                'version': self.version,
+                'fitted_at': self.fitted_at,
+                'texts': list(self._texts.items()),
+                'company_texts': self._company_texts,
+                'company_digest': self._company_digest,
+                'fitted_company_digest': self._fitted_company_digest,
+                'new_since_fit': self.new_since_fit,
+            }
+        try:
+            self.model_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.model_file.with_name(self.model_file.name + '.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.model_file)
+        except Exception as e:
+            with self._lock:
+                self._changed = True
+            logger.warning(f"Failed to save TF-IDF model {self.model_file}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'version': self.version,
+                'fitted_at': self.fitted_at,
+                'terms': len(self.vectorizer.vocabulary_) if self.vectorizer is not None else 0,
+                'opportunity_documents': len(self._texts),
+                'company_documents': len(self._company_texts),
+                'new_since_fit': self.new_since_fit,
+            }
@@ -0,0 +1,70 @@
+"""
+Lenient parsing of JSON returned by language models.
+"""
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+def parse_json_response(text: str) -> Optional[Any]:
+    """The JSON value in a model response, ignoring code fences and surrounding prose.
+    Returns None when no complete JSON value can be found.
+    """
+    if not text:
+        return None
+    candidates = [m.group(1) for m in _FENCE.finditer(text)] + [text]
+    for candidate in candidates:
+        candidate = candidate.strip()
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+        starts = [i for i in (candidate.find('{'), candidate.find('[')) if i >= 0]
+        if not starts:
+            continue
+        start = min(starts)
+        end = max(candidate.rfind('}'), candidate.rfind(']'))
+        if end > start:
+            try:
+                return json.loads(candidate[start:end + 1])
+            except ValueError:
+                pass
+    return None
+
+
+def iter_json_objects(text: str) -> Iterator[Dict[str, Any]]:
+    """Every parseable {...} object in text that contains no nested object, in order.
+
+    Salvages the complete entries of a truncated or otherwise malformed response,
+    e.g. '{"results": [{"id": 1, ...}, {"id": 2, "recomm' yields the first entry.
+    """
+    stack: List[int] = []
+    in_string = False
+    escaped = False
+    nested = set()
+    for i, ch in enumerate(text or ''):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            if stack:
+                nested.add(stack[-1])
+            stack.append(i)
+        elif ch == '}' and stack:
+            start = stack.pop()
+            if start in nested:
+                continue
+            try:
+                value = json.loads(text[start:i + 1])
+            except ValueError:
+                continue
+            if isinstance(value, dict):
+                yield value
@@ -0,0 +1,141 @@
+"""
+Disk-backed cache of chat completion responses, shared by the matcher and the generator.
+"""
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from pathlib import Path
+from loguru import logger
+
+from .llm_client import LLMClient, default_client
+
+PRUNE_EVERY_WRITES = 100
+
+
+class LLMResponseCache:
+    """SQLite store of completion text keyed by (model, messages, temperature, max_tokens).
+
+    Entries older than ttl_secs are treated as misses and deleted; beyond max_entries
+    the least recently used are pruned. hits / misses / expired counters are kept for
+    this process (see stats()).
+    """
+
+    def __init__(self, db_file: str, ttl_secs: float = 7 * 86400, max_entries: int = 5000):
+        self.db_file = Path(db_file)
+        self.ttl_secs = ttl_secs
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL,"
+            " created_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+        self._db.commit()
+        self.prune()
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        payload = json.dumps([model, messages, temperature, max_tokens], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response text, or None when missing or older than the TTL."""
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._db.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row and self.ttl_secs > 0 and now - row[1] > self.ttl_secs:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    self.expired += 1
+                    row = None
+                if row:
+                    self._db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache lookup failed: {e}")
+                row = None
+            if row:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            try:
+                self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                                 (key, model, response, now, now))
+                self._db.commit()
+                self.writes += 1
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache write failed: {e}")
+                return
+        if self.writes % PRUNE_EVERY_WRITES == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete expired entries and the least recently used beyond max_entries; return how many."""
+        with self._lock:
+            try:
+                removed = 0
+                if self.ttl_secs > 0:
+                    removed += self._db.execute("DELETE FROM responses WHERE created_at < ?",
+                                                (time.time() - self.ttl_secs,)).rowcount
+                if self.max_entries > 0:
+                    removed += self._db.execute(
+                        "DELETE FROM responses WHERE key IN"
+                        " (SELECT key FROM responses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,)
+                    ).rowcount
+                self._db.commit()
+                return removed
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache prune failed: {e}")
+                return 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            try:
+                entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            except sqlite3.Error:
+                entries = None
+            return {
+                'entries': entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'writes': self.writes,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def chat_completion(messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                    request_timeout: Optional[float] = None, cache: Optional[LLMResponseCache] = None,
+                    bypass_cache: bool = False, client: Optional[LLMClient] = None,
+                    cancel: Optional[threading.Event] = None) -> str:
+    """Completion text for messages, served from cache when an identical request was made before.
+    bypass_cache: always call the API (the fresh response still replaces the cached one).
+    client: LLMClient to send the request through (defaults to the process-wide one).
+    cancel: event that stops the request before its next attempt (see LLMClient.complete).
+    """
+    client = client or default_client()
+    return client.complete(messages, model=model, max_tokens=max_tokens, temperature=temperature,
+                           timeout=request_timeout, cache=cache, bypass_cache=bypass_cache, cancel=cancel)
@@ -0,0 +1,467 @@
+"""
+One client for every chat completion: pooled connections, timeouts, retries and concurrency limits.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+from loguru import logger
+import openai
+
+from .tokens import count_tokens
+
+# Floor for the default timeout (timeout_secs); an explicit per-call timeout is used as given
+MIN_REQUEST_TIMEOUT = 5.0
+RECENT_CALLS = 1000  # calls kept for the median prompt size / latency in stats()
+
+
+class TransientLLMError(Exception):
+    """A failure worth retrying (raised by MockLLMBackend; OpenAI errors are mapped in RETRYABLE_ERRORS)."""
+
+
+class LLMCancelled(Exception):
+    """The caller's cancel event was set before the request (or its next retry) was sent."""
+
+
+RETRYABLE_ERRORS = (TransientLLMError,) + tuple(
+    error for error in (getattr(openai, name, None) for name in
+                        ('APITimeoutError', 'APIConnectionError', 'RateLimitError', 'InternalServerError'))
+    if isinstance(error, type)
+)
+
+
+class OpenAIBackend:
+    """Chat completions through the openai>=1 SDK.
+
+    One OpenAI / AsyncOpenAI client is created on first use and kept, so requests
+    reuse its HTTP connection pool. SDK retries are off; LLMClient retries instead.
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key
+        self._client = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    def _key(self) -> Optional[str]:
+        return self.api_key or getattr(openai, 'api_key', None) or None
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = openai.OpenAI(api_key=self._key(), max_retries=0)
+            return self._client
+
+    def async_client(self):
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = openai.AsyncOpenAI(api_key=self._key(), max_retries=0)
+            return self._async_client
+
+    def complete(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                 timeout: Optional[float]) -> str:
+        response = self.client().chat.completions.create(
+            model=model, messages=messages, max_tokens=max_tokens, temperature=temperature, timeout=timeout)
+        return response.choices[0].message.content or ''
+
+    async def acomplete(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                        timeout: Optional[float]) -> str:
+        response = await self.async_client().chat.completions.create(
+            model=model, messages=messages, max_tokens=max_tokens, temperature=temperature, timeout=timeout)
+        return response.choices[0].message.content or ''
+
+    def stream(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+               timeout: Optional[float]) -> Iterator[str]:
+        chunks = self.client().chat.completions.create(
+            model=model, messages=messages, max_tokens=max_tokens, temperature=temperature, timeout=timeout,
+            stream=True)
+        for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def astream(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                      timeout: Optional[float]) -> AsyncIterator[str]:
+        chunks = await self.async_client().chat.completions.create(
+            model=model, messages=messages, max_tokens=max_tokens, temperature=temperature, timeout=timeout,
+            stream=True)
+        async for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+class MockLLMBackend:
+    """Deterministic offline backend for load tests and benchmarks.
+
+    The same messages always give the same response. latency_secs (plus up to
+    jitter_secs) is slept per request, and failure_rate of requests raise
+    TransientLLMError so retries can be exercised. responder(messages, max_tokens)
+    replaces the built-in responses, which answer the matcher's batch (JSON) and
+    single-opportunity prompts in their expected formats and anything else with
+    filler text.
+    """
+
+    def __init__(self, latency_secs: float = 0.0, jitter_secs: float = 0.0, failure_rate: float = 0.0,
+                 seed: int = 0, responder: Optional[Callable[[List[Dict[str, str]], int], str]] = None):
+        self.latency_secs = latency_secs
+        self.jitter_secs = jitter_secs
+        self.failure_rate = failure_rate
+        self.responder = responder or mock_response
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _next_request(self) -> float:
+        """Count the request; its delay, or TransientLLMError for a simulated failure."""
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.failure_rate
+            delay = self.latency_secs + self._rng.uniform(0, self.jitter_secs)
+        if fail:
+            raise TransientLLMError("simulated transient failure")
+        return delay
+
+    def complete(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                 timeout: Optional[float]) -> str:
+        delay = self._next_request()
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TransientLLMError("simulated timeout")
+        time.sleep(delay)
+        return self.responder(messages, max_tokens)
+
+    async def acomplete(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                        timeout: Optional[float]) -> str:
+        delay = self._next_request()
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise TransientLLMError("simulated timeout")
+        await asyncio.sleep(delay)
+        return self.responder(messages, max_tokens)
+
+    def stream(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+               timeout: Optional[float]) -> Iterator[str]:
+        yield from _words(self.complete(messages, model, max_tokens, temperature, timeout))
+
+    async def astream(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                      timeout: Optional[float]) -> AsyncIterator[str]:
+        for word in _words(await self.acomplete(messages, model, max_tokens, temperature, timeout)):
+            yield word
+
+    def close(self) -> None:
+        pass
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"\S+\s*", text)
+
+
+def mock_response(messages: List[Dict[str, str]], max_tokens: int) -> str:
+    """Deterministic stand-in for a model response to messages."""
+    prompt = '\n'.join(message['content'] for message in messages)
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode('utf-8', 'ignore')).digest()
+    levels = ('Low', 'Medium', 'High')
+    if '"results"' in prompt:
+        numbers = re.findall(r"^\s*\[(\d+)\]", prompt, re.MULTILINE)
+        return json.dumps({'results': [
+            {'id': int(number), 'missing_requirements': [], 'recommendations': ['Mock recommendation'],
+             'required_documents': ['Technical proposal'], 'required_attachments': ['Pricing sheet'],
+             'assessment': levels[digest[i % len(digest)] % 3]}
+            for i, number in enumerate(numbers)
+        ]})
+    if 'ASSESSMENT:' in prompt:
+        return ("MISSING_REQUIREMENTS: none\nRECOMMENDATIONS: Mock recommendation\n"
+                "REQUIRED_DOCUMENTS: Technical proposal\nREQUIRED_ATTACHMENTS: Pricing sheet\n"
+                f"ASSESSMENT: {levels[digest[0] % 3]}")
+    vocabulary = re.findall(r"[A-Za-z]{4,}", prompt) or ['mock']
+    rng = random.Random(digest)
+    count = max(1, min(max_tokens, 400) * 3 // 4)  # ~0.75 words per token
+    return ' '.join(rng.choice(vocabulary) for _ in range(count)) + '.'
+
+
+class LLMClient:
+    """Chat completions with consistent timeouts, retries and a concurrency limit.
+
+    timeout_secs bounds each call including its retries; retryable failures (timeouts,
+    connection errors, rate limits, server errors) are retried up to max_retries times
+    with full-jitter exponential backoff. At most max_concurrency requests run at once
+    across threads, and as many again across async callers. Responses are served from
+    and stored in an optional LLMResponseCache (streamed ones too, once complete).
+    Prompt and completion token counts and latency are logged (debug) per backend call.
+    """
+
+    def __init__(self, backend: Optional[Any] = None, timeout_secs: float = 60.0, max_retries: int = 3,
+                 backoff_base_secs: float = 0.5, backoff_max_secs: float = 8.0, max_concurrency: int = 8,
+                 cache: Optional[Any] = None):
+        self.backend = backend if backend is not None else OpenAIBackend()
+        self.timeout_secs = timeout_secs
+        self.max_retries = max(0, max_retries)
+        self.backoff_base_secs = backoff_base_secs
+        self.backoff_max_secs = backoff_max_secs
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = cache
+        self.requests = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._recent: deque = deque(maxlen=RECENT_CALLS)  # (prompt tokens, seconds) per successful call
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._async_semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._counter_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Any, cache: Optional[Any] = None) -> 'LLMClient':
+        if settings.llm_backend == 'mock':
+            backend = MockLLMBackend(latency_secs=settings.llm_mock_latency_secs)
+        else:
+            backend = OpenAIBackend(settings.openai_api_key)
+        return cls(backend, timeout_secs=settings.llm_timeout_secs, max_retries=settings.llm_max_retries,
+                   max_concurrency=settings.llm_max_concurrency, cache=cache)
+
+    def complete(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                 timeout: Optional[float] = None, cache: Optional[Any] = None, bypass_cache: bool = False,
+                 cancel: Optional[threading.Event] = None) -> str:
+        """Completion text for messages.
+        timeout: seconds for the whole call including retries (defaults to timeout_secs). Attempts
+        never run past it; TimeoutError is raised once no time is left.
+        cache: overrides the client's cache; bypass_cache: always call the backend.
+        cancel: once set, no further attempt is sent and LLMCancelled is raised instead.
+        """
+        cache, key = self._cache_key(cache, messages, model, max_tokens, temperature)
+        if key is not None and not bypass_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        deadline = self._deadline(timeout)
+        attempt = 0
+        while True:
+            try:
+                with self._semaphore:
+                    self._check_cancelled(cancel)
+                    remaining = self._remaining(deadline)
+                    self._count_request()
+                    started = time.monotonic()
+                    text = self.backend.complete(messages, model, max_tokens, temperature, remaining)
+                self._record_call(model, messages, text, started)
+                break
+            except RETRYABLE_ERRORS as e:
+                delay = self._retry_delay(attempt, deadline, e)
+                if delay is None:
+                    raise
+                if cancel is not None:
+                    cancel.wait(delay)
+                else:
+                    time.sleep(delay)
+                attempt += 1
+        if key is not None and text:
+            cache.put(key, model, text)
+        return text
+
+    async def acomplete(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                        timeout: Optional[float] = None, cache: Optional[Any] = None,
+                        bypass_cache: bool = False, cancel: Optional[threading.Event] = None) -> str:
+        """Async complete(). The cache is SQLite and is read and written inline."""
+        cache, key = self._cache_key(cache, messages, model, max_tokens, temperature)
+        if key is not None and not bypass_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        deadline = self._deadline(timeout)
+        attempt = 0
+        while True:
+            try:
+                async with self._async_semaphore():
+                    self._check_cancelled(cancel)
+                    remaining = self._remaining(deadline)
+                    self._count_request()
+                    started = time.monotonic()
+                    text = await self.backend.acomplete(messages, model, max_tokens, temperature, remaining)
+                self._record_call(model, messages, text, started)
+                break
+            except RETRYABLE_ERRORS as e:
+                delay = self._retry_delay(attempt, deadline, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+        if key is not None and text:
+            cache.put(key, model, text)
+        return text
+
+    def stream(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+               timeout: Optional[float] = None, cache: Optional[Any] = None,
+               bypass_cache: bool = False) -> Iterator[str]:
+        """Completion text in pieces as it is generated.
+        Failures before the first piece are retried; later ones propagate.
+        """
+        cache, key = self._cache_key(cache, messages, model, max_tokens, temperature)
+        if key is not None and not bypass_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        deadline = self._deadline(timeout)
+        attempt = 0
+        parts: List[str] = []
+        while True:
+            try:
+                with self._semaphore:
+                    remaining = self._remaining(deadline)
+                    self._count_request()
+                    started = time.monotonic()
+                    for piece in self.backend.stream(messages, model, max_tokens, temperature, remaining):
+                        parts.append(piece)
+                        yield piece
+                self._record_call(model, messages, ''.join(parts), started)
+                break
+            except RETRYABLE_ERRORS as e:
+                delay = None if parts else self._retry_delay(attempt, deadline, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+        if key is not None and parts:
+            cache.put(key, model, ''.join(parts))
+
+    async def astream(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                      timeout: Optional[float] = None, cache: Optional[Any] = None,
+                      bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async stream()."""
+        cache, key = self._cache_key(cache, messages, model, max_tokens, temperature)
+        if key is not None and not bypass_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        deadline = self._deadline(timeout)
+        attempt = 0
+        parts: List[str] = []
+        while True:
+            try:
+                async with self._async_semaphore():
+                    remaining = self._remaining(deadline)
+                    self._count_request()
+                    started = time.monotonic()
+                    async for piece in self.backend.astream(messages, model, max_tokens, temperature, remaining):
+                        parts.append(piece)
+                        yield piece
+                self._record_call(model, messages, ''.join(parts), started)
+                break
+            except RETRYABLE_ERRORS as e:
+                delay = None if parts else self._retry_delay(attempt, deadline, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+        if key is not None and parts:
+            cache.put(key, model, ''.join(parts))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            recent = list(self._recent)
+            stats = {'requests': self.requests, 'retries': self.retries, 'max_concurrency': self.max_concurrency,
+                     'prompt_tokens': self.prompt_tokens, 'completion_tokens': self.completion_tokens}
+        if recent:
+            stats['median_prompt_tokens'] = _median([tokens for tokens, _ in recent])
+            stats['median_latency_secs'] = _median([secs for _, secs in recent])
+        return stats
+
+    def close(self) -> None:
+        self.backend.close()
+
+    def _cache_key(self, cache: Optional[Any], messages: List[Dict[str, str]], model: str, max_tokens: int,
+                   temperature: float):
+        cache = cache if cache is not None else self.cache
+        if cache is None:
+            return None, None
+        return cache, cache.key(model, messages, temperature, max_tokens)
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        # asyncio semaphores belong to one event loop, so keep one per loop
+        loop_id = id(asyncio.get_running_loop())
+        with self._counter_lock:
+            semaphore = self._async_semaphores.get(loop_id)
+            if semaphore is None:
+                semaphore = self._async_semaphores[loop_id] = asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+
+    def _record_call(self, model: str, messages: List[Dict[str, str]], text: str, started: float) -> None:
+        secs = time.monotonic() - started
+        prompt_tokens = sum(count_tokens(message.get('content') or '') for message in messages)
+        completion_tokens = count_tokens(text or '')
+        with self._counter_lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self._recent.append((prompt_tokens, secs))
+        logger.debug(f"LLM {model}: {prompt_tokens} prompt + {completion_tokens} completion tokens in {secs:.2f}s")
+
+    @staticmethod
+    def _check_cancelled(cancel: Optional[threading.Event]) -> None:
+        if cancel is not None and cancel.is_set():
+            raise LLMCancelled("LLM request cancelled by the caller")
+
+    def _count_request(self) -> None:
+        with self._counter_lock:
+            self.requests += 1
+
+    def _deadline(self, timeout: Optional[float]) -> float:
+        if timeout is None:
+            return time.monotonic() + max(MIN_REQUEST_TIMEOUT, float(self.timeout_secs))
+        # The caller's own budget (e.g. what is left of a match run) is a hard limit
+        return time.monotonic() + float(timeout)
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        """Time left for the next attempt; TimeoutError once the deadline has passed."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("LLM request deadline passed")
+        return remaining
+
+    def _retry_delay(self, attempt: int, deadline: float, error: Exception) -> Optional[float]:
+        """Backoff before the next attempt, or None when out of retries or time."""
+        if attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, min(self.backoff_max_secs, self.backoff_base_secs * 2 ** attempt))
+        if time.monotonic() + delay >= deadline:
+            return None
+        with self._counter_lock:
+            self.retries += 1
+        logger.warning(f"LLM request failed ({error}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+
+def _median(values: List[float]) -> float:
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+_default_client: Optional[LLMClient] = None
+_default_lock = threading.Lock()
+
+
+def default_client() -> LLMClient:
+    """The process-wide client used when a call site is not given one (OpenAI backend)."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = LLMClient()
+        return _default_client
+
+
+def set_default_client(client: Optional[LLMClient]) -> None:
+    """Replace the process-wide client (None: create a fresh OpenAI-backed one on next use)."""
+    global _default_client
+    with _default_lock:
+        _default_client = client
@@ -2,8 +2,10 @@
 AI-powered opportunity matching system.
 """
 import re
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, field
+import sys
+import threading
+from typing import List, Dict, Any, Optional, Set, Tuple, Sequence
+from dataclasses import dataclass, replace
 from datetime import datetime
 from loguru import logger
 import openai
@@ -11,108 +13,653 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from scrapers import BidOpportunity
+from scrapers.base_scraper import SLOTS, EMPTY, intern_strings
 from processors import ProcessedDocument
+from .batch_tfidf import BatchTfidfTransformer
+from .corpus_tfidf import CorpusTfidfModel
+from .json_output import parse_json_response, iter_json_objects
+from .llm_cache import LLMResponseCache, chat_completion
+from .llm_client import LLMClient, LLMCancelled
+from .prompt_builder import PromptBuilder, PRIORITY_CONTEXT, PRIORITY_EXTRA
+from .tokens import count_tokens, truncate_to_tokens
+from .retrieval import RetrievalIndex, index_for_profile, opportunity_query, profile_version, CONTEXT_TOKENS
 
-@dataclass
+# Model and sampling for match analysis; part of the match cache key
+ANALYSIS_MODEL = 'gpt-3.5-turbo'
+ANALYSIS_MAX_TOKENS = 1000
+ANALYSIS_TEMPERATURE = 0.3
+ANALYSIS_PROMPT_VERSION = 2  # bump when _create_analysis_prompt or _parse_ai_analysis changes
+ANALYSIS_PROMPT_TOKENS = 700  # user message budget at the default context_tokens (see PromptBuilder)
+ANALYSIS_DESCRIPTION_TOKENS = 300
+
+# Instructions shared by every analysis request, sent once as the system message
+_ANALYSIS_ROLE = ("You are an expert in government contracting and IT/cybersecurity services. "
+                  "For the opportunity(ies) given, judge our company's fit from the capabilities given. Report: "
+                  "missing requirements we don't currently have; specific recommendations; required documents "
+                  "(mandatory narrative or compliance documents, e.g. technical proposal, past performance, CVs, "
+                  "registrations, tax clearance, insurance, certifications); required attachments (files uploaded "
+                  "with the submission, e.g. completed forms, pricing sheets, signed attachments, as filename "
+                  "keywords); and an overall assessment of fit: High, Medium or Low.")
+ANALYSIS_SYSTEM_MESSAGE = _ANALYSIS_ROLE + (
+    "\nAnswer in exactly this format:\nMISSING_REQUIREMENTS: [list]\nRECOMMENDATIONS: [list]\n"
+    "REQUIRED_DOCUMENTS: [list]\nREQUIRED_ATTACHMENTS: [list]\nASSESSMENT: [High/Medium/Low]")
+
+# Batched analysis: several opportunities per request against one copy of the company context
+BATCH_PROMPT_VERSION = 2  # bump when _create_batch_prompt or _parse_batch_analysis changes
+BATCH_MAX_TOKENS_PER_OPPORTUNITY = 350
+BATCH_CONTEXT_FACTOR = 2  # one context, this many times context_tokens, serves the whole batch
+BATCH_OPPORTUNITY_TOKENS = 260  # prompt budget per opportunity in a batch
+BATCH_DESCRIPTION_TOKENS = 200
+BATCH_SYSTEM_MESSAGE = _ANALYSIS_ROLE + (
+    '\nAnswer with JSON only, one entry per opportunity number: {"results": [{"id": 1, '
+    '"missing_requirements": [], "recommendations": [], "required_documents": [], '
+    '"required_attachments": [], "assessment": "Medium"}]}')
+_ANALYSIS_LIST_FIELDS = ('missing_requirements', 'recommendations', 'required_documents', 'required_attachments')
+
+HEURISTIC_RECOMMENDATIONS: Sequence[str] = (
+    'Heuristic assessment used (quick match mode) - consider running full AI analysis for top results',
+)
+
+# Overall score = weighted similarity, keyword and assessment scores (see combine_scores)
+SIMILARITY_WEIGHT = 0.3
+KEYWORD_WEIGHT = 0.4
+AI_WEIGHT = 0.3
+ASSESSMENT_LEVELS: Sequence[str] = ('Low', 'Medium', 'High')
+ASSESSMENT_CODES = {level: code for code, level in enumerate(ASSESSMENT_LEVELS)}
+ASSESSMENT_SCORES = np.array([0.3, 0.6, 0.9])
+CONFIDENCE_LEVELS: Sequence[str] = ASSESSMENT_LEVELS
+HIGH_CONFIDENCE_SCORE = 0.8
+MEDIUM_CONFIDENCE_SCORE = 0.6
+APPLY_SCORE = 0.7
+APPLY_IF_HIGH_SCORE = 0.5  # apply from this score when the assessment is High
+
+# Text similarity aggregates opportunity x (document and section) similarities
+SECTION_AGGREGATIONS: Sequence[str] = ('max', 'topk')
+SECTION_TOP_K = 3  # sections averaged by 'topk', and reported as contributing_sections
+
+
+def unique_keywords(company_profile: Dict[str, Any]) -> List[str]:
+    """Profile technical keywords without duplicates, in profile order."""
+    return list(dict.fromkeys(company_profile.get('technical_keywords', [])))
+
+
+def heuristic_assessment_codes(similarity: np.ndarray, keyword_scores: np.ndarray) -> np.ndarray:
+    """Assessment code per opportunity when no AI analysis is available."""
+    pre = 0.5 * similarity + 0.5 * keyword_scores
+    return np.select([pre >= 0.7, pre >= 0.5], [ASSESSMENT_CODES['High'], ASSESSMENT_CODES['Medium']],
+                     ASSESSMENT_CODES['Low'])
+
+
+def combine_scores(similarity: np.ndarray, keyword_scores: np.ndarray,
+                   assessment_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Overall scores, confidence codes (index into CONFIDENCE_LEVELS) and apply decisions."""
+    scores = np.clip(similarity * SIMILARITY_WEIGHT + keyword_scores * KEYWORD_WEIGHT +
+                     ASSESSMENT_SCORES[assessment_codes] * AI_WEIGHT, 0.0, 1.0)
+    confidence = np.select([scores >= HIGH_CONFIDENCE_SCORE, scores >= MEDIUM_CONFIDENCE_SCORE], [2, 1], 0)
+    apply = (scores >= APPLY_SCORE) | ((scores >= APPLY_IF_HIGH_SCORE) &
+                                       (assessment_codes == ASSESSMENT_CODES['High']))
+    return scores, confidence, apply
+
+
+def section_units(processed_docs: Optional[Sequence[ProcessedDocument]]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Labels and texts to vectorize for similarity: each document ("file") and each of
+    its sections ("file#section")."""
+    labels, texts = [], []
+    for doc in processed_docs or ():
+        if doc.content and doc.content.strip():
+            labels.append(sys.intern(doc.filename))
+            texts.append(doc.content)
+        for name, text in (doc.sections or {}).items():
+            if text and text.strip():
+                labels.append(sys.intern(f"{doc.filename}#{name}"))
+                texts.append(text)
+    return tuple(labels), tuple(texts)
+
+
+def aggregate_section_similarity(similarity: np.ndarray, method: str = 'topk',
+                                 top_k: int = SECTION_TOP_K) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score per row of an opportunities x sections similarity matrix.
+
+    method 'max' takes the best section, 'topk' the mean of the top_k best. Also returns
+    the top_k section indices per row, best first, and their similarities.
+    """
+    rows, count = similarity.shape
+    if count == 0:
+        return np.zeros(rows), np.zeros((rows, 0), dtype=np.intp), np.zeros((rows, 0))
+    k = max(1, min(top_k, count))
+    if k < count:
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(count), (rows, count))
+    values = np.take_along_axis(similarity, top, axis=1)
+    order = np.argsort(-values, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+    scores = values[:, 0] if method == 'max' else values.mean(axis=1)
+    return scores, top, values
+
+
+def select_shortlist(scores: np.ndarray, top_k: int = 0, quantile: float = 0.0,
+                     min_score: float = 0.0) -> np.ndarray:
+    """Indices of the opportunities worth an AI analysis, best heuristic score first.
+
+    Keeps scores >= max(min_score, the given quantile of this batch's scores), then at
+    most top_k of them (0 = no cap). The quantile makes the cut adapt to the batch:
+    0.75 keeps roughly the top quarter however scores are distributed.
+    """
+    order = np.argsort(-scores, kind='stable')
+    threshold = min_score
+    if quantile > 0 and len(scores):
+        threshold = max(threshold, float(np.quantile(scores, quantile)))
+    order = order[scores[order] >= threshold]
+    return order[:top_k] if top_k > 0 else order
+
+
+@dataclass(**SLOTS)
+class CascadeConfig:
+    """Which opportunities get AI analysis after the heuristic pass (see select_shortlist)."""
+    top_k: int = 25
+    quantile: float = 0.0
+    min_score: float = 0.0
+    
+    @classmethod
+    def from_settings(cls, settings: Any) -> 'CascadeConfig':
+        return cls(settings.match_cascade_top_k, settings.match_cascade_quantile, settings.match_cascade_min_score)
+
+
+@dataclass(**SLOTS)
 class MatchResult:
-    """Result of opportunity matching."""
+    """Result of opportunity matching.
+    List fields are stored as interned tuples; empty ones share a single instance.
+    """
     opportunity: BidOpportunity
     match_score: float
     confidence: str
-    matching_keywords: List[str]
-    missing_requirements: List[str]
-    recommendations: List[str]
-    required_documents: List[str] = field(default_factory=list)
-    required_attachments: List[str] = field(default_factory=list)
+    matching_keywords: Sequence[str]
+    missing_requirements: Sequence[str]
+    recommendations: Sequence[str]
+    required_documents: Sequence[str] = EMPTY
+    required_attachments: Sequence[str] = EMPTY
     should_apply: bool = False
+    contributing_sections: Sequence[str] = EMPTY  # best-matching "file" / "file#section" labels
+    
+    def __post_init__(self):
+        if isinstance(self.confidence, str):
+            self.confidence = sys.intern(self.confidence)
+        self.matching_keywords = intern_strings(self.matching_keywords)
+        self.missing_requirements = intern_strings(self.missing_requirements)
+        self.recommendations = intern_strings(self.recommendations)
+        self.required_documents = intern_strings(self.required_documents)
+        self.required_attachments = intern_strings(self.required_attachments)
+        self.contributing_sections = intern_strings(self.contributing_sections)
+
+
+@dataclass(frozen=True)
+class ProfileState:
+    """Everything matching reads about the company, published as one object.
+
+    set_company_profile() builds a new state and swaps it in with a single assignment,
+    so a match that captured the previous state finishes against a consistent profile.
+    vectorizer_version is the CorpusTfidfModel version the vectorizer came from
+    ('' for one fitted on the profile text alone). section_vectors holds one row per
+    section_labels entry (see section_units); None without processed documents.
+    """
+    company_profile: Dict[str, Any]
+    vectorizer: Optional[TfidfVectorizer]
+    company_vectors: Any
+    retrieval: Optional[RetrievalIndex]
+    version: str
+    transformer: Optional[BatchTfidfTransformer] = None
+    vectorizer_version: str = ''
+    section_labels: Tuple[str, ...] = ()
+    section_texts: Tuple[str, ...] = ()
+    section_vectors: Any = None
 
 class OpportunityMatcher:
     """AI-powered system to match opportunities with company capabilities."""
     
-    def __init__(self, openai_api_key: str):
+    def __init__(self, openai_api_key: str, max_concurrency: int = 4, match_cache: Optional[Any] = None,
+                 llm_cache: Optional[LLMResponseCache] = None, batch_size: int = 1,
+                 llm_client: Optional[LLMClient] = None, tfidf_model: Optional[CorpusTfidfModel] = None,
+                 section_aggregation: str = 'topk', section_top_k: int = SECTION_TOP_K,
+                 context_tokens: int = CONTEXT_TOKENS):
         self.openai_api_key = openai_api_key
         openai.api_key = openai_api_key
+        # Upper bound on AI analysis requests in flight at once
+        self.max_concurrency = max(1, max_concurrency)
+        # Opportunities analysed per AI request (1 = one prompt per opportunity)
+        self.batch_size = max(1, batch_size)
+        # Counts from the most recent match_opportunities call
+        self.last_match_stats: Dict[str, Any] = {}
+        # Optional storage.MatchCache: AI analyses reused across runs
+        self.match_cache = match_cache
+        self.llm_cache = llm_cache
+        # Transport for analysis requests (None = the process-wide default client)
+        self.llm_client = llm_client
+        # Retrieved company text per prompt (settings.prompt_context_tokens); the prompt budgets
+        # grow or shrink with it and it is part of the cache key, so a change re-runs analyses
+        self.context_tokens = max(0, context_tokens)
+        self.batch_context_tokens = BATCH_CONTEXT_FACTOR * self.context_tokens
+        self.analysis_prompt_tokens = ANALYSIS_PROMPT_TOKENS - CONTEXT_TOKENS + self.context_tokens
+        self.analysis_config = (f"{ANALYSIS_MODEL};max_tokens={ANALYSIS_MAX_TOKENS};temperature={ANALYSIS_TEMPERATURE};"
+                                f"prompt={ANALYSIS_PROMPT_VERSION};context={self.context_tokens}")
+        if self.batch_size > 1:
+            self.analysis_config += f";batch_prompt={BATCH_PROMPT_VERSION};batch_context={self.batch_context_tokens}"
+        
+        # How section similarities become one text similarity (see aggregate_section_similarity)
+        self.section_aggregation = section_aggregation if section_aggregation in SECTION_AGGREGATIONS else 'topk'
+        self.section_top_k = max(1, section_top_k)
+        
+        # Corpus-fitted vectorizer shared by every profile version; without one (or
+        # before it has enough documents) each profile fits its own on its text
+        self.tfidf_model = tfidf_model
         
-        # Initialize TF-IDF vectorizer for text similarity
-        self.vectorizer = TfidfVectorizer(
+        # Company profile will be set after document processing
+        self._state: Optional[ProfileState] = None
+        self._publish_lock = threading.Lock()
+    
+    @staticmethod
+    def _new_vectorizer() -> TfidfVectorizer:
+        """TF-IDF vectorizer fitted on the profile text alone, when there is no corpus model."""
+        return TfidfVectorizer(
             max_features=1000,
             stop_words='english',
             ngram_range=(1, 2)
         )
-        
-        # Company profile will be set after document processing
-        self.company_profile = None
-        self.company_vectors = None
     
-    def set_company_profile(self, company_profile: Dict[str, Any]):
-        """Set the company profile for matching."""
-        self.company_profile = company_profile
-        
+    @property
+    def state(self) -> Optional[ProfileState]:
+        """The currently published profile state (None until a profile is set)."""
+        return self._state
+    
+    @property
+    def company_profile(self) -> Optional[Dict[str, Any]]:
+        return self._state.company_profile if self._state else None
+    
+    @property
+    def vectorizer(self) -> Optional[TfidfVectorizer]:
+        return self._state.vectorizer if self._state else None
+    
+    @property
+    def company_vectors(self):
+        return self._state.company_vectors if self._state else None
+    
+    @property
+    def retrieval(self) -> Optional[RetrievalIndex]:
+        return self._state.retrieval if self._state else None
+    
+    def set_company_profile(self, company_profile: Dict[str, Any],
+                            processed_docs: Optional[List[ProcessedDocument]] = None):
+        """Set the company profile for matching.
+        processed_docs: enables chunk retrieval so prompts carry the most relevant company text.
+        """
+        if self.tfidf_model is not None and processed_docs:
+            # Takes effect at the model's next refit, not here
+            self.tfidf_model.set_company_texts(doc.content for doc in processed_docs)
+        vectorizer, company_vectors, vectorizer_version = None, None, ''
         # Create TF-IDF vectors for company capabilities
         if company_profile.get('all_content'):
-            self.company_vectors = self.vectorizer.fit_transform([company_profile['all_content']])
-        
-        logger.info("Company profile set for opportunity matching")
+            if self.tfidf_model is not None:
+                vectorizer, vectorizer_version = self.tfidf_model.current()
+            if vectorizer is not None:
+                company_vectors = vectorizer.transform([company_profile['all_content']])
+            else:
+                vectorizer = self._new_vectorizer()
+                company_vectors = vectorizer.fit_transform([company_profile['all_content']])
+        self._publish(company_profile, vectorizer, company_vectors, processed_docs, vectorizer_version)
+        logger.info(f"Company profile {self._state.version[:8]} set for opportunity matching")
+    
+    def export_state(self) -> Dict[str, Any]:
+        """Fitted state needed to match without refitting (see restore_state)."""
+        return {
+            'vectorizer': self.vectorizer,
+            'company_vectors': self.company_vectors,
+            'vectorizer_version': self._state.vectorizer_version if self._state else '',
+        }
     
-    def match_opportunities(self, opportunities: List[BidOpportunity], analyze_ai: bool = True, max_ai_duration_secs: int = 180) -> List[MatchResult]:
+    def restore_state(self, company_profile: Dict[str, Any], state: Dict[str, Any],
+                      processed_docs: Optional[List[ProcessedDocument]] = None):
+        """Install a company profile together with a previously fitted vectorizer.
+        A newer corpus model vectorizer replaces the saved one (one transform, no fit).
+        """
+        vectorizer, company_vectors = state['vectorizer'], state['company_vectors']
+        vectorizer_version = state.get('vectorizer_version', '')
+        if self.tfidf_model is not None:
+            current, current_version = self.tfidf_model.current()
+            if current is not None and current_version != vectorizer_version:
+                content = company_profile.get('all_content')
+                vectorizer, vectorizer_version = current, current_version
+                company_vectors = current.transform([content]) if content else None
+        self._publish(company_profile, vectorizer, company_vectors, processed_docs, vectorizer_version)
+        logger.info("Company profile restored for opportunity matching")
+    
+    def _publish(self, company_profile: Dict[str, Any], vectorizer: Optional[TfidfVectorizer], company_vectors,
+                 processed_docs: Optional[List[ProcessedDocument]], vectorizer_version: str = '') -> None:
+        retrieval = index_for_profile(company_profile, processed_docs) if processed_docs else None
+        transformer = BatchTfidfTransformer(vectorizer) if vectorizer is not None else None
+        section_labels, section_texts = section_units(processed_docs)
+        section_vectors = self._section_vectors(vectorizer, section_texts)
+        with self._publish_lock:
+            self._state = ProfileState(company_profile, vectorizer, company_vectors, retrieval,
+                                       profile_version(company_profile), transformer, vectorizer_version,
+                                       section_labels, section_texts, section_vectors)
+    
+    @staticmethod
+    def _section_vectors(vectorizer: Optional[TfidfVectorizer], section_texts: Sequence[str]):
+        if vectorizer is None or not section_texts:
+            return None
+        return vectorizer.transform(section_texts)
+    
+    def observe_opportunities(self, opportunities: Sequence[BidOpportunity]) -> int:
+        """Add opportunity texts to the TF-IDF corpus; returns how many were new."""
+        if self.tfidf_model is None:
+            return 0
+        return self.tfidf_model.add_opportunities(opportunities)
+    
+    def refit_vectorizer(self, force: bool = False) -> bool:
+        """Refit the corpus model if due (or force) and switch to it; True when the vectorizer changed.
+        Slow for a large corpus: call from a background task or between runs, not per request.
+        """
+        if self.tfidf_model is None:
+            return False
+        self.tfidf_model.refit(force=force)
+        return self.refresh_vectorizer()
+    
+    def refresh_vectorizer(self) -> bool:
+        """Re-vectorize the published profile with the corpus model's current vectorizer, if newer."""
+        if self.tfidf_model is None:
+            return False
+        vectorizer, vectorizer_version = self.tfidf_model.current()
+        if vectorizer is None:
+            return False
+        transformer = BatchTfidfTransformer(vectorizer)
+        with self._publish_lock:
+            state = self._state
+            if state is None or state.vectorizer_version == vectorizer_version:
+                return False
+            content = state.company_profile.get('all_content')
+            company_vectors = vectorizer.transform([content]) if content else None
+            section_vectors = self._section_vectors(vectorizer, state.section_texts)
+            self._state = replace(state, vectorizer=vectorizer, company_vectors=company_vectors,
+                                  transformer=transformer, vectorizer_version=vectorizer_version,
+                                  section_vectors=section_vectors)
+        logger.info(f"Opportunity matching switched to TF-IDF model {vectorizer_version[:8]}")
+        return True
+    
+    def match_opportunities(self, opportunities: List[BidOpportunity], analyze_ai: bool = True, max_ai_duration_secs: int = 180,
+                            cascade: Optional[CascadeConfig] = None) -> List[MatchResult]:
         """Match opportunities against company capabilities.
         analyze_ai: when False, skip slow AI analysis and use heuristic for assessment.
         max_ai_duration_secs: hard time budget for AI analysis across ALL opportunities (defaults to 3 minutes).
+        AI requests run concurrently (up to max_concurrency), highest heuristic score first,
+        each covering up to batch_size opportunities.
+        cascade: only send the heuristic shortlist to AI analysis; the rest keep heuristic
+        assessments. Call counts are left in last_match_stats.
         """
-        if not self.company_profile:
+        # Every opportunity in this call is matched against the same profile version,
+        # even if a new one is published meanwhile
+        state = self._state
+        if state is None or not state.company_profile:
             logger.error("Company profile not set. Call set_company_profile() first.")
             return []
         
-        match_results = []
-        start_ts = time.time()
-        ai_enabled_global = analyze_ai
-        ai_used_count = 0
-        
-        for opportunity in opportunities:
-            try:
-                # Check remaining time budget before each analysis
-                remaining = max_ai_duration_secs - (time.time() - start_ts)
-                use_ai_now = ai_enabled_global and (remaining > 0)
-                if ai_enabled_global and not use_ai_now:
-                    logger.info("AI match time budget exceeded; falling back to heuristic for remaining opportunities.")
-                    ai_enabled_global = False
-                
-                match_result = self._match_single_opportunity(
-                    opportunity,
-                    analyze_ai=use_ai_now,
-                    ai_timeout_secs=remaining if use_ai_now else None
-                )
-                if use_ai_now:
-                    ai_used_count += 1
-                match_results.append(match_result)
-            except Exception as e:
-                logger.error(f"Failed to match opportunity {opportunity.opportunity_id}: {e}")
-                continue
+        opportunities = list(opportunities)
+        if not opportunities:
+            return []
+        
+        # Heuristic scores for the whole batch: one sparse transform and product
+        similarity, keyword_scores, matching_keywords, contributing = self._batch_heuristic_scores(opportunities, state)
+        assessment_codes = heuristic_assessment_codes(similarity, keyword_scores)
+        
+        analyses: List[Optional[Dict[str, Any]]] = [None] * len(opportunities)
+        shortlisted = 0
+        cached: Dict[int, Dict[str, Any]] = {}
+        fresh: Dict[int, Dict[str, Any]] = {}
+        usage: List[Tuple[int, int]] = []  # (prompt, completion) token estimates per AI request
+        if analyze_ai:
+            # Spend the budget on the most promising opportunities first
+            heuristic_scores = combine_scores(similarity, keyword_scores, assessment_codes)[0]
+            if cascade is not None:
+                order = select_shortlist(heuristic_scores, cascade.top_k, cascade.quantile, cascade.min_score)
+            else:
+                order = np.argsort(-heuristic_scores, kind='stable')
+            shortlisted = len(order)
+            # Unchanged opportunities analysed against this profile before need no new call
+            keys = self._cache_keys(opportunities, order, state)
+            cached = self._cached_analyses(keys)
+            order = [i for i in order if i not in cached]
+            deadline = time.monotonic() + max_ai_duration_secs
+            fresh = self._analyze_concurrently(opportunities, order, deadline, state, usage)
+            self._store_analyses(opportunities, keys, fresh)
+            for i, analysis in list(cached.items()) + list(fresh.items()):
+                analyses[i] = analysis
+                assessment_codes[i] = ASSESSMENT_CODES.get(analysis.get('assessment', 'Medium'), ASSESSMENT_CODES['Medium'])
+        ai_used_count = sum(1 for analysis in analyses if analysis is not None)
+        self.last_match_stats = {
+            'opportunities': len(opportunities),
+            'ai_requested': analyze_ai,
+            'cascade': cascade is not None,
+            'shortlisted': shortlisted,
+            'ai_analyses': ai_used_count,
+            'ai_calls': len(fresh),
+            'cache_hits': len(cached),
+            # Calls the cascade and the match cache avoided compared with analysing every opportunity
+            'ai_calls_saved': len(opportunities) - len(fresh) if analyze_ai else 0,
+            # Round-trips and estimated tokens actually sent; below ai_calls when batching
+            'ai_requests': len(usage),
+            'prompt_tokens': sum(prompt for prompt, _ in usage),
+            'completion_tokens': sum(completion for _, completion in usage),
+        }
+        if self.match_cache is not None:
+            self.last_match_stats['cache'] = self.match_cache.stats()
+        
+        scores, confidence_codes, apply = combine_scores(similarity, keyword_scores, assessment_codes)
         
-        # Sort by match score
-        match_results.sort(key=lambda x: x.match_score, reverse=True)
+        match_results = []
+        for i in np.argsort(-scores, kind='stable'):  # best first; ties keep input order
+            analysis = analyses[i]
+            if analysis is None:
+                analysis = self._heuristic_analysis_for(assessment_codes[i])
+            match_results.append(MatchResult(
+                opportunity=opportunities[i],
+                match_score=float(scores[i]),
+                confidence=CONFIDENCE_LEVELS[confidence_codes[i]],
+                matching_keywords=matching_keywords[i],
+                missing_requirements=analysis.get('missing_requirements', []),
+                recommendations=analysis.get('recommendations', []),
+                required_documents=analysis.get('required_documents', []),
+                required_attachments=analysis.get('required_attachments', []),
+                should_apply=bool(apply[i]),
+                contributing_sections=contributing[i]
+            ))
         
         logger.info(f"Matched {len(match_results)} opportunities (AI used on {ai_used_count}, budget {max_ai_duration_secs}s)")
         return match_results
     
+    def _cache_keys(self, opportunities: Sequence[BidOpportunity], indices: Sequence[int],
+                    state: ProfileState) -> Dict[int, str]:
+        """Match cache key by opportunity index (empty without a cache)."""
+        if self.match_cache is None:
+            return {}
+        return {int(i): self.match_cache.key(opportunities[i], state.version, self.analysis_config) for i in indices}
+    
+    def _cached_analyses(self, keys: Dict[int, str]) -> Dict[int, Dict[str, Any]]:
+        """Stored AI analyses by opportunity index."""
+        if self.match_cache is None or not keys:
+            return {}
+        found = self.match_cache.get_many(keys.values())
+        return {i: found[key] for i, key in keys.items() if key in found}
+    
+    def _store_analyses(self, opportunities: Sequence[BidOpportunity], keys: Dict[int, str],
+                        analyses: Dict[int, Dict[str, Any]]) -> None:
+        if self.match_cache is None or not keys:
+            return
+        self.match_cache.put_many((keys[i], opportunities[i].opportunity_id, analysis)
+                                  for i, analysis in analyses.items() if not analysis.get('failed'))
+    
+    def _analyze_concurrently(self, opportunities: Sequence[BidOpportunity], order: Sequence[int],
+                              deadline: float, state: ProfileState,
+                              usage: Optional[List[Tuple[int, int]]] = None) -> Dict[int, Dict[str, Any]]:
+        """AI analyses keyed by opportunity index, submitted in the given order.
+
+        Opportunities are sent batch_size per request. At most max_concurrency requests
+        are in flight; each gets the time left until deadline (time.monotonic()) as its
+        request timeout. Opportunities a batch response leaves out are retried in
+        halves; a lone opportunity uses the single-opportunity prompt. A batch whose
+        request fails outright is retried once as it is, then keeps its heuristic
+        assessment. Anything not finished by the deadline is cancelled and keeps its
+        heuristic assessment: requests still running are told to send no further
+        attempt, and their token usage is not counted.
+        """
+        results: Dict[int, Dict[str, Any]] = {}
+        order = [int(i) for i in order]
+        queue = deque(order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size))
+        pending: Dict[Any, List[int]] = {}
+        retried: Set[Tuple[int, ...]] = set()  # batches already resent after their request failed
+        failed: Set[int] = set()
+        call_usage: Dict[Any, List[Tuple[int, int]]] = {}  # per request, merged into usage once it finishes
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="ai-match")
+        
+        def submit_next() -> bool:
+            remaining = deadline - time.monotonic()
+            if not queue or remaining <= 0:
+                return False
+            batch = queue.popleft()
+            request_usage: List[Tuple[int, int]] = []
+            if len(batch) == 1:
+                future = executor.submit(self._ai_analyze_opportunity, opportunities[batch[0]],
+                                         request_timeout=remaining, state=state, usage=request_usage,
+                                         cancel=cancelled)
+            else:
+                future = executor.submit(self._ai_analyze_batch, [opportunities[i] for i in batch],
+                                         request_timeout=remaining, state=state, usage=request_usage,
+                                         cancel=cancelled)
+            pending[future] = batch
+            call_usage[future] = request_usage
+            return True
+        
+        def fill() -> None:
+            while len(pending) < self.max_concurrency and submit_next():
+                pass
+        
+        try:
+            fill()
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = pending.pop(future)
+                    if usage is not None:
+                        usage.extend(call_usage.pop(future))
+                    if len(batch) == 1:
+                        try:
+                            results[batch[0]] = future.result()
+                        except Exception as e:
+                            logger.error(f"Failed to analyze opportunity {opportunities[batch[0]].opportunity_id}: {e}")
+                            failed.add(batch[0])
+                        continue
+                    try:
+                        analyses = future.result()
+                    except Exception as e:
+                        # Halving would multiply the requests sent to a failing backend
+                        if tuple(batch) in retried:
+                            logger.warning(f"Batched AI analysis of {len(batch)} opportunities failed again: {e}")
+                            failed.update(batch)
+                        else:
+                            logger.warning(f"Batched AI analysis of {len(batch)} opportunities failed: {e}; retrying once")
+                            retried.add(tuple(batch))
+                            queue.appendleft(batch)
+                        continue
+                    for position, analysis in analyses.items():
+                        results[batch[position]] = analysis
+                    missing = [i for position, i in enumerate(batch) if position not in analyses]
+                    if missing:
+                        # Retry in halves, ahead of batches not yet sent
+                        half = (len(missing) + 1) // 2
+                        queue.extendleft(part for part in (missing[half:], missing[:half]) if part)
+                fill()
+        finally:
+            # Requests already running make no further attempt; their results and usage are discarded
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        if failed:
+            logger.warning(f"AI analysis failed for {len(failed)} opportunities; they keep their heuristic assessment")
+        skipped = len(order) - len(results) - len(failed)
+        if skipped:
+            logger.info(f"AI match time budget exhausted; {skipped} opportunities keep their heuristic assessment")
+        return results
+    
+    def _batch_heuristic_scores(self, opportunities: Sequence[BidOpportunity],
+                                state: ProfileState) -> Tuple[np.ndarray, np.ndarray, List[List[str]], List[Sequence[str]]]:
+        """Text similarity, keyword score, matching keywords and contributing sections for
+        every opportunity. Same values as _calculate_text_similarity / _calculate_keyword_match,
+        computed in bulk.
+        """
+        texts = [f"{opportunity.title} {opportunity.description}" for opportunity in opportunities]
+        similarity, contributing = self._text_similarity(texts, state)
+        
+        keywords = unique_keywords(state.company_profile)
+        lowered = [(keyword, keyword.lower()) for keyword in keywords]
+        matching = [[keyword for keyword, low in lowered if low in text]
+                    for text in map(str.lower, texts)]
+        counts = np.fromiter(map(len, matching), dtype=np.float64, count=len(matching))
+        keyword_scores = counts / len(keywords) if keywords else np.zeros(len(texts))
+        return similarity, keyword_scores, matching, contributing
+    
+    def _text_similarity(self, texts: Sequence[str],
+                         state: Optional[ProfileState]) -> Tuple[np.ndarray, List[Sequence[str]]]:
+        """Similarity of each text to the company documents, and the sections behind it.
+        With section vectors this is one texts x sections product aggregated per
+        section_aggregation; without, cosine similarity to the whole-profile vector.
+        """
+        similarity = np.zeros(len(texts))
+        contributing: List[Sequence[str]] = [EMPTY] * len(texts)
+        if state is None or (state.section_vectors is None and state.company_vectors is None):
+            return similarity, contributing
+        try:
+            matrix = state.transformer.transform(texts)
+            if state.section_vectors is None:
+                return cosine_similarity(matrix, state.company_vectors).ravel(), contributing
+            similarity, top, values = aggregate_section_similarity(
+                cosine_similarity(matrix, state.section_vectors), self.section_aggregation, self.section_top_k)
+            labels = state.section_labels
+            contributing = [tuple(labels[j] for j, value in zip(row, row_values) if value > 0)
+                            for row, row_values in zip(top.tolist(), values.tolist())]
+        except Exception as e:
+            logger.warning(f"Failed to calculate text similarity: {e}")
+        return similarity, contributing
+    
     def match_single_opportunity(self, opportunity: BidOpportunity, analyze_ai: bool = True, ai_timeout_secs: Optional[float] = None) -> MatchResult:
         """Public wrapper to match a single opportunity with optional AI analysis."""
         return self._match_single_opportunity(opportunity, analyze_ai=analyze_ai, ai_timeout_secs=ai_timeout_secs)
     
-    def _match_single_opportunity(self, opportunity: BidOpportunity, analyze_ai: bool = True, ai_timeout_secs: Optional[float] = None) -> MatchResult:
-        """Match a single opportunity against company capabilities."""
+    def _match_single_opportunity(self, opportunity: BidOpportunity, analyze_ai: bool = True, ai_timeout_secs: Optional[float] = None,
+                                  state: Optional[ProfileState] = None) -> MatchResult:
+        """Match a single opportunity against company capabilities.
+        state: profile state to match against (defaults to the currently published one).
+        """
+        state = state or self._state
         
         # Calculate text similarity score
-        similarity_score = self._calculate_text_similarity(opportunity)
+        similarities, contributing = self._text_similarity([f"{opportunity.title} {opportunity.description}"], state)
+        similarity_score = float(similarities[0])
         
         # Calculate keyword matching score
-        keyword_score, matching_keywords = self._calculate_keyword_match(opportunity)
+        keyword_score, matching_keywords = self._calculate_keyword_match(opportunity, state)
         
         # Use AI to analyze requirements and generate recommendations (optional)
         if analyze_ai:
-            ai_analysis = self._ai_analyze_opportunity(opportunity, request_timeout=ai_timeout_secs)
+            ai_analysis = self._ai_analyze_opportunity(opportunity, request_timeout=ai_timeout_secs, state=state)
         else:
             ai_analysis = self._heuristic_ai_analysis(similarity_score, keyword_score)
         
@@ -136,35 +683,23 @@ class OpportunityMatcher:
             recommendations=ai_analysis.get('recommendations', []),
             required_documents=ai_analysis.get('required_documents', []),
             required_attachments=ai_analysis.get('required_attachments', []),
-            should_apply=should_apply
+            should_apply=should_apply,
+            contributing_sections=contributing[0]
         )
     
-    def _calculate_text_similarity(self, opportunity: BidOpportunity) -> float:
+    def _calculate_text_similarity(self, opportunity: BidOpportunity, state: Optional[ProfileState] = None) -> float:
         """Calculate text similarity between opportunity and company profile."""
-        if self.company_vectors is None:
-            return 0.0
-        
-        try:
-            # Combine opportunity text
-            opportunity_text = f"{opportunity.title} {opportunity.description}"
-            
-            # Transform opportunity text
-            opportunity_vector = self.vectorizer.transform([opportunity_text])
-            
-            # Calculate cosine similarity
-            similarity = cosine_similarity(self.company_vectors, opportunity_vector)[0][0]
-            
-            return float(similarity)
-        except Exception as e:
-            logger.warning(f"Failed to calculate text similarity: {e}")
-            return 0.0
+        similarities, _ = self._text_similarity([f"{opportunity.title} {opportunity.description}"],
+                                                state or self._state)
+        return float(similarities[0])
     
-    def _calculate_keyword_match(self, opportunity: BidOpportunity) -> Tuple[float, List[str]]:
+    def _calculate_keyword_match(self, opportunity: BidOpportunity, state: Optional[ProfileState] = None) -> Tuple[float, List[str]]:
         """Calculate keyword matching score."""
-        if not self.company_profile:
+        state = state or self._state
+        if state is None or not state.company_profile:
             return 0.0, []
         
-        company_keywords = set(self.company_profile.get('technical_keywords', []))
+        company_keywords = unique_keywords(state.company_profile)
         opportunity_text = f"{opportunity.title} {opportunity.description}".lower()
         
         matching_keywords = []
@@ -188,49 +723,51 @@ class OpportunityMatcher:
             assessment = 'Medium'
         else:
             assessment = 'Low'
+        return self._heuristic_analysis_for(ASSESSMENT_CODES[assessment])
+    
+    @staticmethod
+    def _heuristic_analysis_for(assessment_code: int) -> Dict[str, Any]:
+        assessment = ASSESSMENT_LEVELS[assessment_code]
         return {
-            'missing_requirements': [],
-            'recommendations': [
-                'Heuristic assessment used (quick match mode) - consider running full AI analysis for top results'
-            ],
-            'required_documents': [],
-            'required_attachments': [],
+            'missing_requirements': EMPTY,
+            'recommendations': HEURISTIC_RECOMMENDATIONS,
+            'required_documents': EMPTY,
+            'required_attachments': EMPTY,
             'assessment': assessment
         }
     
-    def _ai_analyze_opportunity(self, opportunity: BidOpportunity, request_timeout: Optional[float] = None) -> Dict[str, Any]:
+    def _ai_analyze_opportunity(self, opportunity: BidOpportunity, request_timeout: Optional[float] = None,
+                                state: Optional[ProfileState] = None,
+                                usage: Optional[List[Tuple[int, int]]] = None,
+                                cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
         """Use AI to analyze opportunity requirements and generate recommendations.
         request_timeout: optional per-request timeout in seconds for the AI call.
+        usage: receives a (prompt, completion) token estimate for the request.
+        cancel: once set, the request is not (re)tried and LLMCancelled propagates.
         """
         try:
-            prompt = self._create_analysis_prompt(opportunity)
+            prompt = self._create_analysis_prompt(opportunity, state)
             
-            # Prepare kwargs with optional timeout if provided and reasonable
-            kwargs: Dict[str, Any] = {
-                'model': 'gpt-3.5-turbo',
-                'messages': [
-                    {"role": "system", "content": "You are an expert in government contracting and IT/cybersecurity services. Analyze opportunities and provide detailed recommendations."},
+            analysis_text = chat_completion(
+                [
+                    {"role": "system", "content": ANALYSIS_SYSTEM_MESSAGE},
                     {"role": "user", "content": prompt}
                 ],
-                'max_tokens': 1000,
-                'temperature': 0.3
-            }
-            if request_timeout is not None and request_timeout > 0:
-                # Cap to a minimum of 5s to avoid too-small timeouts
-                kwargs['request_timeout'] = max(5, float(request_timeout))
-            
-            try:
-                response = openai.ChatCompletion.create(**kwargs)
-            except TypeError:
-                # Older openai library may not support request_timeout; retry without it
-                kwargs.pop('request_timeout', None)
-                response = openai.ChatCompletion.create(**kwargs)
-            
-            analysis_text = response.choices[0].message.content
+                model=ANALYSIS_MODEL,
+                max_tokens=ANALYSIS_MAX_TOKENS,
+                temperature=ANALYSIS_TEMPERATURE,
+                request_timeout=request_timeout,
+                cache=self.llm_cache,
+                client=self.llm_client,
+                cancel=cancel
+            )
+            self._record_usage(usage, ANALYSIS_SYSTEM_MESSAGE, prompt, analysis_text)
             
             # Parse the AI response
             return self._parse_ai_analysis(analysis_text)
             
+        except LLMCancelled:
+            raise
         except Exception as e:
             logger.error(f"AI analysis failed: {e}")
             return {
@@ -238,42 +775,79 @@ class OpportunityMatcher:
                 'recommendations': ['AI analysis unavailable - manual review recommended'],
                 'required_documents': [],
                 'required_attachments': [],
-                'assessment': 'Medium'
+                'assessment': 'Medium',
+                'failed': True  # never cached
             }
     
-    def _create_analysis_prompt(self, opportunity: BidOpportunity) -> str:
-        """Create prompt for AI analysis."""
-        company_capabilities = self.company_profile.get('all_content', '')[:2000]  # Limit length
-        
-        prompt = f"""
-        Analyze this government contracting opportunity and provide recommendations for our company.
-        
-        OPPORTUNITY DETAILS:
-        Title: {opportunity.title}
-        Agency: {opportunity.agency}
-        Description: {opportunity.description}
-        Due Date: {opportunity.due_date}
-        NAICS Codes: {', '.join(opportunity.naics_codes)}
-        
-        OUR COMPANY CAPABILITIES:
-        {company_capabilities}
-        
-        Please provide:
-        1. Missing requirements that we don't currently have
-        2. Specific recommendations for this opportunity
-        3. Overall assessment of fit (High/Medium/Low)
-        4. REQUIRED_DOCUMENTS: List the mandatory narrative or compliance documents to prepare/include (e.g., technical proposal, past performance, resumes/CVs, corporate capabilities, SAM registration, W-9, certificates, insurance, tax clearance, business registration, certifications).
-        5. REQUIRED_ATTACHMENTS: List the specific attachment files typically uploaded with the submission (e.g., completed forms, pricing sheets, resumes, certificates, insurance COI, signed attachments), focusing on filenames/keywords we can use to find files.
-        
-        Format your response as:
-        MISSING_REQUIREMENTS: [list of missing requirements]
-        RECOMMENDATIONS: [list of specific recommendations]
-        REQUIRED_DOCUMENTS: [list of required documents]
-        REQUIRED_ATTACHMENTS: [list of required attachments]
-        ASSESSMENT: [High/Medium/Low]
+    def _ai_analyze_batch(self, batch: Sequence[BidOpportunity], request_timeout: Optional[float] = None,
+                          state: Optional[ProfileState] = None,
+                          usage: Optional[List[Tuple[int, int]]] = None,
+                          cancel: Optional[threading.Event] = None) -> Dict[int, Dict[str, Any]]:
+        """AI analyses of several opportunities from one request, keyed by position in batch.
+        Positions the response omits or garbles are left out; request errors propagate.
         """
-        
-        return prompt
+        prompt = self._create_batch_prompt(batch, state)
+        analysis_text = chat_completion(
+            [
+                {"role": "system", "content": BATCH_SYSTEM_MESSAGE},
+                {"role": "user", "content": prompt}
+            ],
+            model=ANALYSIS_MODEL,
+            max_tokens=BATCH_MAX_TOKENS_PER_OPPORTUNITY * len(batch),
+            temperature=ANALYSIS_TEMPERATURE,
+            request_timeout=request_timeout,
+            cache=self.llm_cache,
+            client=self.llm_client,
+            cancel=cancel
+        )
+        self._record_usage(usage, BATCH_SYSTEM_MESSAGE, prompt, analysis_text)
+        return self._parse_batch_analysis(analysis_text, len(batch))
+    
+    @staticmethod
+    def _record_usage(usage: Optional[List[Tuple[int, int]]], system: str, prompt: str,
+                      response: Optional[str]) -> None:
+        if usage is not None:
+            usage.append((count_tokens(system) + count_tokens(prompt), count_tokens(response or '')))
+    
+    def _create_analysis_prompt(self, opportunity: BidOpportunity, state: Optional[ProfileState] = None) -> str:
+        """Create prompt for AI analysis: the opportunity, then as much relevant company text as fits."""
+        builder = PromptBuilder(self.analysis_prompt_tokens)
+        self._add_opportunity(builder, '', opportunity, ANALYSIS_DESCRIPTION_TOKENS)
+        self._add_company_context(builder, opportunity_query(opportunity), self.context_tokens, state)
+        return builder.build()
+    
+    def _create_batch_prompt(self, batch: Sequence[BidOpportunity], state: Optional[ProfileState] = None) -> str:
+        """Prompt analysing every opportunity in batch against one copy of the company context."""
+        builder = PromptBuilder(self.batch_context_tokens + BATCH_OPPORTUNITY_TOKENS * len(batch))
+        for number, opportunity in enumerate(batch, 1):
+            self._add_opportunity(builder, f"[{number}]", opportunity, BATCH_DESCRIPTION_TOKENS)
+        query = ' '.join(opportunity_query(opportunity) for opportunity in batch)
+        self._add_company_context(builder, query, self.batch_context_tokens, state)
+        return builder.build()
+    
+    @staticmethod
+    def _add_opportunity(builder: PromptBuilder, label: str, opportunity: BidOpportunity,
+                         description_tokens: int) -> None:
+        """Opportunity essentials as one part; the description is cut at a sentence boundary."""
+        description = truncate_to_tokens(opportunity.description or '', description_tokens, sentences=True)
+        lines = [f"Title: {opportunity.title}", f"Agency: {opportunity.agency}"]
+        if opportunity.due_date:
+            lines.append(f"Due Date: {opportunity.due_date}")
+        if opportunity.naics_codes:
+            lines.append(f"NAICS Codes: {', '.join(opportunity.naics_codes)}")
+        lines.append(f"Description: {description}")
+        builder.add(label or 'OPPORTUNITY', '\n'.join(lines), truncate=False)
+    
+    def _add_company_context(self, builder: PromptBuilder, query: str, token_budget: int,
+                             state: Optional[ProfileState] = None) -> None:
+        """Retrieved capability chunks, or the start of the profile text when there is no index."""
+        state = state or self._state
+        if state.retrieval is not None:
+            chunks = state.retrieval.search(query, token_budget=token_budget)
+            if chunks:
+                builder.add_chunks('OUR COMPANY CAPABILITIES', [chunk.text for chunk in chunks], PRIORITY_CONTEXT)
+                return
+        builder.add('OUR COMPANY CAPABILITIES', state.company_profile.get('all_content', ''), PRIORITY_EXTRA)
     
     def _parse_ai_analysis(self, analysis_text: str) -> Dict[str, Any]:
         """Parse AI analysis response."""
@@ -326,32 +900,71 @@ class OpportunityMatcher:
         
         return result
     
+    @classmethod
+    def _parse_batch_analysis(cls, analysis_text: str, count: int) -> Dict[int, Dict[str, Any]]:
+        """Analyses by batch position (0-based) from a JSON batch response.
+
+        Accepts {"results": [...]}, a bare list, or an object keyed by id, with or
+        without code fences or surrounding prose. When the whole response does not
+        parse (e.g. it was cut off), every complete entry is still recovered.
+        """
+        parsed = parse_json_response(analysis_text)
+        if isinstance(parsed, dict):
+            entries = parsed.get('results', parsed.get('opportunities'))
+            if entries is None:
+                entries = [dict(entry, id=key) for key, entry in parsed.items() if isinstance(entry, dict)]
+        elif isinstance(parsed, list):
+            entries = parsed
+        else:
+            entries = list(iter_json_objects(analysis_text))
+        
+        analyses: Dict[int, Dict[str, Any]] = {}
+        for entry in entries if isinstance(entries, list) else ():
+            if not isinstance(entry, dict):
+                continue
+            digits = re.search(r'\d+', str(entry.get('id', '')))
+            position = int(digits.group()) - 1 if digits else -1
+            if 0 <= position < count and position not in analyses:
+                analyses[position] = cls._normalize_analysis(entry)
+        return analyses
+    
+    @staticmethod
+    def _normalize_analysis(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Analysis dict in the shape _parse_ai_analysis returns, from one JSON entry."""
+        result: Dict[str, Any] = {}
+        for field in _ANALYSIS_LIST_FIELDS:
+            value = entry.get(field) or []
+            if isinstance(value, str):
+                value = re.split(r'\n|,', value)
+            elif not isinstance(value, list):
+                value = [value]
+            items = (str(item).strip('-• ').strip() for item in value if item is not None)
+            result[field] = [item for item in items if item]
+        assessment = str(entry.get('assessment', '')).strip().title()
+        result['assessment'] = assessment if assessment in ASSESSMENT_CODES else 'Medium'
+        return result
+    
     def _calculate_overall_score(self, similarity_score: float, keyword_score: float, 
                                ai_analysis: Dict[str, Any]) -> float:
         """Calculate overall match score."""
-        # Weight different components
-        similarity_weight = 0.3
-        keyword_weight = 0.4
-        ai_weight = 0.3
-        
         # Convert AI assessment to numeric score
-        assessment_scores = {'High': 0.9, 'Medium': 0.6, 'Low': 0.3}
-        ai_score = assessment_scores.get(ai_analysis.get('assessment', 'Medium'), 0.6)
+        code = ASSESSMENT_CODES.get(ai_analysis.get('assessment', 'Medium'), ASSESSMENT_CODES['Medium'])
+        ai_score = ASSESSMENT_SCORES[code]
         
         # Calculate weighted average
         overall_score = (
-            similarity_score * similarity_weight +
-            keyword_score * keyword_weight +
-            ai_score * ai_weight
+            similarity_score * SIMILARITY_WEIGHT +
+            keyword_score * KEYWORD_WEIGHT +
+            ai_score * AI_WEIGHT
         )
         
         return min(1.0, max(0.0, overall_score))  # Clamp between 0 and 1
     
     def _determine_confidence(self, score: float) -> str:
         """Determine confidence level based on score."""
-        if score >= 0.8:
+        if score >= HIGH_CONFIDENCE_SCORE:
             return "High"
-        elif score >= 0.6:
+        elif score >= MEDIUM_CONFIDENCE_SCORE:
             return "Medium"
         else:
             return "Low"
@@ -359,9 +972,9 @@ class OpportunityMatcher:
     def _should_apply(self, score: float, ai_analysis: Dict[str, Any]) -> bool:
         """Determine if we should apply for this opportunity."""
         # Base decision on score and AI assessment
-        if score >= 0.7:
+        if score >= APPLY_SCORE:
             return True
-        elif score >= 0.5 and ai_analysis.get('assessment') == 'High':
+        elif score >= APPLY_IF_HIGH_SCORE and ai_analysis.get('assessment') == 'High':
             return True
         else:
             return False
@@ -0,0 +1,110 @@
+"""
+Token-budgeted prompt assembly.
+"""
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+from scrapers.base_scraper import SLOTS
+from .tokens import count_tokens, truncate_to_tokens
+
+# Fill order: parts with a lower priority get the budget first
+PRIORITY_ESSENTIAL = 0  # opportunity essentials: title, agency, due date, description
+PRIORITY_CONTEXT = 1    # retrieved company capability chunks
+PRIORITY_EXTRA = 2      # nice to have: keyword lists, scores, fallback text
+
+MIN_TRUNCATED_TOKENS = 24  # a part cut shorter than this is dropped instead
+
+
+@dataclass(**SLOTS)
+class _Part:
+    label: str
+    pieces: Tuple[str, ...]
+    priority: int
+    truncate: bool
+    chunks: bool
+
+
+class PromptBuilder:
+    """Assembles a prompt from labelled parts within a token budget.
+
+    Parts are given the budget in priority order (insertion order within a priority)
+    and rendered in insertion order. A part that does not fit is cut at a sentence
+    boundary when truncate is set, otherwise dropped; chunk lists keep the chunks
+    that fit, in order. Tokens are counted with tiktoken when installed.
+    After build(), tokens holds the prompt size and dropped / truncated the labels
+    that lost content.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.tokens = 0
+        self.dropped: List[str] = []
+        self.truncated: List[str] = []
+        self._parts: List[_Part] = []
+
+    def add(self, label: str, text: str, priority: int = PRIORITY_ESSENTIAL, truncate: bool = True) -> 'PromptBuilder':
+        """Add "label: text" (label may be empty). Empty text is skipped."""
+        text = (text or '').strip()
+        if text:
+            self._parts.append(_Part(label, (text,), priority, truncate, False))
+        return self
+
+    def add_chunks(self, label: str, chunks: Sequence[str], priority: int = PRIORITY_CONTEXT) -> 'PromptBuilder':
+        """Add a block of independent chunks (best first) under label."""
+        pieces = tuple(chunk.strip() for chunk in chunks if chunk and chunk.strip())
+        if pieces:
+            self._parts.append(_Part(label, pieces, priority, False, True))
+        return self
+
+    def build(self) -> str:
+        remaining = self.budget
+        kept = {}
+        self.dropped, self.truncated = [], []
+        for index in sorted(range(len(self._parts)), key=lambda i: (self._parts[i].priority, i)):
+            part = self._parts[index]
+            overhead = count_tokens(self._heading(part)) + 1
+            if part.chunks:
+                pieces = []
+                for piece in part.pieces:
+                    cost = count_tokens(piece) + 1
+                    if overhead + cost <= remaining:
+                        pieces.append(piece)
+                        remaining -= cost
+                if pieces:
+                    remaining -= overhead
+                    kept[index] = pieces
+                if len(pieces) < len(part.pieces):
+                    (self.truncated if pieces else self.dropped).append(part.label)
+                continue
+            text = part.pieces[0]
+            cost = overhead + count_tokens(text)
+            if cost <= remaining:
+                kept[index] = [text]
+                remaining -= cost
+            elif part.truncate and remaining - overhead >= MIN_TRUNCATED_TOKENS:
+                text = truncate_to_tokens(text, remaining - overhead, sentences=True)
+                kept[index] = [text]
+                remaining -= overhead + count_tokens(text)
+                self.truncated.append(part.label)
+            else:
+                self.dropped.append(part.label)
+
+        lines = []
+        for index, part in enumerate(self._parts):
+            if index not in kept:
+                continue
+            body = '\n\n'.join(kept[index])
+            heading = self._heading(part)
+            if not heading:
+                lines.append(body)
+            elif part.chunks or '\n' in body:
+                lines.append(f"{heading}\n{body}")
+            else:
+                lines.append(f"{heading} {body}")
+        prompt = '\n'.join(lines)
+        self.tokens = count_tokens(prompt)
+        return prompt
+
+    @staticmethod
+    def _heading(part: _Part) -> str:
+        return f"{part.label}:" if part.label else ''
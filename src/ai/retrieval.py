@@ -0,0 +1,176 @@
+"""
+Chunk-level BM25 retrieval over company documents for prompt assembly.
+"""
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Iterable, Sequence
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from loguru import logger
+
+from processors import ProcessedDocument
+from processors.sections import header_section
+from scrapers.base_scraper import SLOTS
+from .tokens import estimate_tokens, truncate_to_tokens
+
+CHUNK_TOKENS = 160
+CONTEXT_TOKENS = 400  # default company-context budget per prompt (~1600 characters)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+@dataclass(**SLOTS)
+class Chunk:
+    """A paragraph-sized piece of a company document."""
+    text: str
+    source: str
+    section: str
+    tokens: int
+
+
+def chunk_document(doc: ProcessedDocument, max_tokens: int = CHUNK_TOKENS) -> List[Chunk]:
+    """Split a document into chunks of whole lines, breaking at headings and blank lines.
+
+    Each chunk is labelled with the section it falls under (same heading rules as
+    ProcessedDocument.sections), or 'general' before the first recognised heading.
+    """
+    chunks: List[Chunk] = []
+    section = 'general'
+    lines: List[str] = []
+    tokens = 0
+
+    def flush():
+        nonlocal lines, tokens
+        if lines:
+            chunks.append(Chunk('\n'.join(lines), doc.filename, section, tokens))
+        lines, tokens = [], 0
+
+    for raw in doc.content.splitlines():
+        line = raw.strip()
+        if not line:
+            # Paragraph break: close the chunk once it has some substance
+            if tokens >= max_tokens // 2:
+                flush()
+            continue
+        heading = header_section(line)
+        if heading is not None:
+            flush()
+            section = heading
+        line_tokens = estimate_tokens(line)
+        if line_tokens > max_tokens:
+            flush()
+            line = truncate_to_tokens(line, max_tokens)
+            line_tokens = estimate_tokens(line)
+        elif tokens + line_tokens > max_tokens:
+            flush()
+        lines.append(line)
+        tokens += line_tokens
+    flush()
+    return chunks
+
+
+class RetrievalIndex:
+    """BM25 over document chunks. Scoring a query is one sparse matrix-vector product."""
+
+    def __init__(self, chunks: List[Chunk]):
+        self.chunks = chunks
+        self.vectorizer = CountVectorizer(stop_words='english')
+        self.weights = None
+        if not chunks:
+            return
+        try:
+            counts = self.vectorizer.fit_transform([c.text for c in chunks]).tocsr().astype(np.float64)
+        except ValueError:
+            # Only stop words / empty text
+            return
+        n_docs = counts.shape[0]
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        lengths = np.asarray(counts.sum(axis=1)).ravel()
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+        # Saturate term frequencies in place: tf * (k1 + 1) / (tf + norm_row)
+        rows = np.repeat(np.arange(n_docs), np.diff(counts.indptr))
+        counts.data = counts.data * (BM25_K1 + 1) / (counts.data + norm[rows])
+        self.weights = (counts @ sparse.diags(idf)).T.tocsr()  # terms x chunks
+
+    @classmethod
+    def from_documents(cls, processed_docs: Iterable[ProcessedDocument]) -> 'RetrievalIndex':
+        chunks = [chunk for doc in processed_docs for chunk in chunk_document(doc)]
+        return cls(chunks)
+
+    def search(self, query: str, k: int = 8, token_budget: int = 600,
+               sections: Optional[Sequence[str]] = None) -> List[Chunk]:
+        """Top chunks for query, best first, until k chunks or the token budget is used.
+
+        sections: restrict to chunks from these sections. When nothing matches the query,
+        the first chunks (in document order) of the allowed sections are returned instead.
+        """
+        allowed = [i for i, c in enumerate(self.chunks) if not sections or c.section in sections]
+        if not allowed:
+            return []
+        order: List[int] = []
+        if self.weights is not None and query:
+            terms = self.vectorizer.transform([query]).indices
+            if len(terms):
+                scores = np.asarray(self.weights[terms].sum(axis=0)).ravel()
+                allowed_arr = np.asarray(allowed)
+                ranked = allowed_arr[np.argsort(-scores[allowed_arr], kind='stable')]
+                order = [int(i) for i in ranked if scores[i] > 0]
+        if not order:
+            order = allowed
+
+        picked: List[Chunk] = []
+        used = 0
+        for i in order:
+            chunk = self.chunks[i]
+            if used + chunk.tokens > token_budget:
+                continue
+            picked.append(chunk)
+            used += chunk.tokens
+            if len(picked) >= k:
+                break
+        return picked
+
+
+def format_chunks(chunks: Iterable[Chunk]) -> str:
+    """Render retrieved chunks for a prompt."""
+    return '\n\n'.join(chunk.text for chunk in chunks)
+
+
+def opportunity_query(opportunity: Any) -> str:
+    """Retrieval query text for an opportunity."""
+    keywords = ' '.join(getattr(opportunity, 'keywords', None) or ())
+    return f"{opportunity.title} {opportunity.description} {keywords}"
+
+
+def profile_version(company_profile: Dict[str, Any]) -> str:
+    """Profile version string (set by DocumentProcessor.get_company_profile; derived for older profiles)."""
+    version = company_profile.get('version')
+    if version:
+        return version
+    return hashlib.sha256(company_profile.get('all_content', '').encode('utf-8', 'ignore')).hexdigest()[:16]
+
+
+_index_lock = threading.Lock()
+_indexes: Dict[str, RetrievalIndex] = {}
+MAX_CACHED_INDEXES = 2
+
+
+def index_for_profile(company_profile: Dict[str, Any],
+                      processed_docs: Iterable[ProcessedDocument]) -> RetrievalIndex:
+    """Index for a profile version, built on first use and shared by the matcher and generator."""
+    processed_docs = list(processed_docs or [])
+    if not processed_docs:
+        return RetrievalIndex([])
+    version = profile_version(company_profile)
+    with _index_lock:
+        index = _indexes.get(version)
+        if index is None:
+            index = RetrievalIndex.from_documents(processed_docs)
+            if len(_indexes) >= MAX_CACHED_INDEXES:
+                _indexes.pop(next(iter(_indexes)))
+            _indexes[version] = index
+            logger.info(f"Built retrieval index for profile {version[:8]} ({len(index.chunks)} chunks)")
+        return index
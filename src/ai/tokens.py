@@ -0,0 +1,73 @@
+"""
+Cheap token estimates for sizing prompt context.
+"""
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # optional; prompts are sized with estimate_tokens instead
+    tiktoken = None
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"[.!?;:](?=\s)|\n")
+
+# Roughly 4 characters per token for English text with GPT-style tokenizers
+CHARS_PER_TOKEN = 4
+TOKENIZER_ENCODING = "cl100k_base"  # gpt-3.5-turbo / gpt-4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count: the larger of a character-based and a word/punctuation count."""
+    if not text:
+        return 0
+    by_chars = len(text) // CHARS_PER_TOKEN
+    by_words = len(_WORD_PATTERN.findall(text))
+    return max(1, by_chars, by_words)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception:  # e.g. the encoding file cannot be downloaded
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count with the model tokenizer when tiktoken is installed, else estimate_tokens."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, budget: int, sentences: bool = False) -> str:
+    """Cut text to about `budget` tokens, preferring a line or word boundary.
+    sentences: prefer ending on a sentence boundary, and count with count_tokens.
+    """
+    if budget <= 0 or not text:
+        return ""
+    count = count_tokens if sentences else estimate_tokens
+    if count(text) <= budget:
+        return text
+    encoding = _encoding() if sentences else None
+    if encoding is not None:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
+    else:
+        cut = text[:budget * CHARS_PER_TOKEN]
+        # Dense text (many short words or symbols) can still be over budget
+        while sentences and len(cut) > 1 and count(cut) > budget:
+            cut = cut[:len(cut) * budget // count(cut)]
+    if sentences:
+        ends = [m.end() for m in _SENTENCE_END.finditer(cut)]
+        if ends and ends[-1] > len(cut) // 2:
+            return cut[:ends[-1]].rstrip()
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary]
+    return cut.rstrip()
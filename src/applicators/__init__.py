@@ -4,5 +4,6 @@ Application system package for generating and submitting bid applications.
 from .application_generator import ApplicationGenerator
 from .application_submitter import ApplicationSubmitter
 from .email_sender import EmailSender
+from .submission_log import SubmissionLog
 
-__all__ = ["ApplicationGenerator", "ApplicationSubmitter", "EmailSender"]
+__all__ = ["ApplicationGenerator", "ApplicationSubmitter", "EmailSender", "SubmissionLog"]
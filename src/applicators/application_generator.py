@@ -15,14 +15,74 @@ from config import settings
 
 from scrapers import BidOpportunity
 from ai import MatchResult
+from ai.retrieval import index_for_profile, opportunity_query
+from ai.prompt_builder import PromptBuilder, PRIORITY_CONTEXT, PRIORITY_EXTRA
+from ai.tokens import truncate_to_tokens
+from ai.llm_cache import LLMResponseCache, chat_completion
+from ai.llm_client import LLMClient
 from processors import ProcessedDocument
 
+# Section instructions, sent as the system message so every request shares the same prefix
+_GOV_COVER_LETTER_INSTRUCTIONS = (
+    "You are an expert in government contracting and proposal writing. Draft a professional but persuasive "
+    "government bid cover letter (roughly 300-500 words) in short sections with these headings: header (our "
+    "company info and the recipient agency); subject line (as given); introduction (who we are and what we are "
+    "applying for); company profile summary (3-5 concise bullets of credentials, experience and technical "
+    "capacity from our capabilities); attention to client needs (the agency's pain points, from the "
+    "description); value proposition (savings, efficiency or innovation); flexibility (adaptability, custom "
+    "solutions, after-sales support); track record (brief, relevant successes and satisfied clients); "
+    "compliance (state explicitly that we tick all boxes: mandatory documents, certifications, technical "
+    "specs, delivery schedule, submission format and deadlines); closing (polite request for consideration, "
+    "willingness to discuss further). Use the company name exactly as given and end with the sign-off exactly "
+    "as given, one item per line."
+)
+_JOB_COVER_LETTER_INSTRUCTIONS = (
+    "You are an expert career writer for job applications. Draft a friendly but professional cover letter "
+    "tailored to the role (200-350 words, crisp and specific): subject line \"Application for <role title>\"; "
+    "introduction (who we are and what we are applying for); relevant experience and achievements aligned to "
+    "the role (2 short paragraphs or bullets); the value we bring (impact, reliability, culture fit, "
+    "availability, location/remote if relevant); a brief closing with a call to action. Use the company name "
+    "exactly as given and end with the sign-off exactly as given, one item per line."
+)
+_TECHNICAL_APPROACH_INSTRUCTIONS = (
+    "You are a technical expert in IT and cybersecurity services. Write the technical approach section of a "
+    "government contracting proposal that: demonstrates understanding of the technical requirements; outlines "
+    "our methodology and approach; highlights relevant technical capabilities; shows innovation and best "
+    "practices; addresses key technical challenges. Structure it with clear sections and bullet points."
+)
+_PAST_PERFORMANCE_INSTRUCTIONS = (
+    "You are an expert in government contracting and past performance documentation. Write the past "
+    "performance section of a proposal that: highlights relevant past projects and experience; shows "
+    "successful delivery of similar services; demonstrates client satisfaction and results; includes specific "
+    "metrics and outcomes; relates the experience to this opportunity's requirements. If specific experience "
+    "is limited, focus on transferable skills and capabilities."
+)
+_TEAM_QUALIFICATIONS_INSTRUCTIONS = (
+    "You are an expert in team qualifications and personnel documentation. Write the team qualifications "
+    "section of a proposal that: highlights key personnel and their qualifications; shows relevant "
+    "certifications and credentials; demonstrates expertise in the required areas; includes years of "
+    "experience and specializations; shows the team's ability to deliver. Focus on the qualifications most "
+    "relevant to the opportunity."
+)
+_EXECUTIVE_SUMMARY_INSTRUCTIONS = (
+    "You are an expert in executive summaries for government contracting. Write a concise, compelling "
+    "executive summary (1-2 paragraphs) that states our interest and qualifications, highlights our key value "
+    "proposition, shows understanding of the opportunity and demonstrates our competitive advantages."
+)
+DESCRIPTION_TOKENS = 300  # opportunity description per section prompt, cut at a sentence boundary
+
+
 class ApplicationGenerator:
     """Generates bid applications and proposals."""
     
-    def __init__(self, openai_api_key: str, templates_folder: str = "./templates"):
+    def __init__(self, openai_api_key: str, templates_folder: str = "./templates",
+                 llm_cache: Optional[LLMResponseCache] = None, llm_client: Optional[LLMClient] = None):
         self.openai_api_key = openai_api_key
         openai.api_key = openai_api_key
+        # Identical section prompts are answered from here instead of the API
+        self.llm_cache = llm_cache
+        # Transport for section requests (None = the process-wide default client)
+        self.llm_client = llm_client
         self.templates_folder = Path(templates_folder)
         self.templates_folder.mkdir(exist_ok=True)
         
@@ -47,8 +107,11 @@ class ApplicationGenerator:
     def generate_application(self, match_result: MatchResult, 
                            company_profile: Dict[str, Any],
                            processed_docs: List[ProcessedDocument],
-                           fast_mode: Optional[bool] = None) -> Dict[str, str]:
-        """Generate complete application package for an opportunity."""
+                           fast_mode: Optional[bool] = None,
+                           regenerate: bool = False) -> Dict[str, str]:
+        """Generate complete application package for an opportunity.
+        regenerate: request new AI text instead of reusing cached responses for the same prompts.
+        """
         
         opportunity = match_result.opportunity
         
@@ -68,11 +131,11 @@ class ApplicationGenerator:
             # Parallelize AI section generation using threads
             def _tasks():
                 return {
-                    'cover_letter': lambda: self._generate_cover_letter(match_result, company_profile),
-                    'technical_approach': lambda: self._generate_technical_approach(match_result, company_profile),
-                    'past_performance': lambda: self._generate_past_performance(match_result, processed_docs),
-                    'team_qualifications': lambda: self._generate_team_qualifications(match_result, processed_docs),
-                    'executive_summary': lambda: self._generate_executive_summary(match_result, company_profile),
+                    'cover_letter': lambda: self._generate_cover_letter(match_result, company_profile, regenerate),
+                    'technical_approach': lambda: self._generate_technical_approach(match_result, company_profile, processed_docs, regenerate),
+                    'past_performance': lambda: self._generate_past_performance(match_result, processed_docs, company_profile, regenerate),
+                    'team_qualifications': lambda: self._generate_team_qualifications(match_result, processed_docs, company_profile, regenerate),
+                    'executive_summary': lambda: self._generate_executive_summary(match_result, company_profile, regenerate),
                 }
         
             results: Dict[str, str] = {}
@@ -122,7 +185,7 @@ class ApplicationGenerator:
         return application_package
     
     def _generate_cover_letter(self, match_result: MatchResult, 
-                             company_profile: Dict[str, Any]) -> str:
+                             company_profile: Dict[str, Any], bypass_cache: bool = False) -> str:
         """Generate cover letter using AI.
         Differentiates between government bids (tenders/RFPs) and job applications with distinct structures.
         """
@@ -130,10 +193,7 @@ class ApplicationGenerator:
         
         company_name = company_profile.get('company_name', 'Our Company')
         signatory = company_profile.get('signatory_name') or os.environ.get('SIGNATORY_NAME')
-        signoff_instructions = (
-            f"End with a sign-off that includes exactly: 'Sincerely,' on one line, '{company_name}' on the next line"
-            + (f", and '{signatory}' on the following line" if signatory else "") + "."
-        )
+        signoff = '\n'.join(line for line in ('Sincerely,', company_name, signatory) if line)
         
         # Heuristic to determine if this is a government/public-sector bid as opposed to a job application
         source = (getattr(opportunity, 'source', '') or '').lower()
@@ -150,119 +210,83 @@ class ApplicationGenerator:
             any(ind in text for ind in gov_bid_indicators)
         )
         
+        builder = PromptBuilder(settings.generation_prompt_tokens)
+        builder.add('Company name', company_name, truncate=False)
         if is_gov:
-            system_role = "You are an expert in government contracting and proposal writing."
-            prompt = f"""
-            Draft a professional but persuasive government bid cover letter that strictly follows this structure:
-            
-            Cover letter header: Company info (name and available contact) + recipient’s info (agency: {opportunity.agency}).
-            Subject line: "Application for Tender No. {opportunity.opportunity_id} / Proposal for {opportunity.title}".
-            Introduction: who we are and what we’re applying for.
-            Company profile summary: credentials, experience, and technical capacity (use up to 3-5 concise bullets from: {', '.join(company_profile.get('technical_keywords', [])[:10])}).
-            Attention to client needs: show we understand {opportunity.agency}'s business pain points using context from the description: {opportunity.description[:1000]}.
-            Value proposition: explain how our solution saves money, improves efficiency, or adds innovation.
-            Flexibility: emphasize adaptability, custom solutions, and after-sales support.
-            Track record: highlight previous success stories and satisfied clients (brief and relevant).
-            Compliance: explicitly state we “tick all boxes” of compliance (mandatory documents, certifications, technical specs, delivery schedule, submission format and deadlines).
-            Closing: polite request for consideration and willingness for further discussion.
-            
-            Requirements:
-            - Professional but persuasive tone suitable for public procurement.
-            - Use short sections with clear headings (as listed above).
-            - Keep it concise (roughly 300–500 words).
-            - {signoff_instructions}
-            - Use the company name exactly as provided: {company_name}.
-            - MATCHING KEYWORDS: {', '.join(match_result.matching_keywords)}
-            """
+            system_role = _GOV_COVER_LETTER_INSTRUCTIONS
+            builder.add('Recipient agency', opportunity.agency, truncate=False)
+            builder.add('Subject line', f"Application for Tender No. {opportunity.opportunity_id} / "
+                                        f"Proposal for {opportunity.title}", truncate=False)
         else:
-            system_role = "You are an expert career writer for job applications."
-            prompt = f"""
-            Draft a professional job application cover letter tailored to this role.
-            
-            Role/Opportunity Title: {opportunity.title}
-            Organization: {opportunity.agency}
-            Description context: {opportunity.description[:1000]}
-            Candidate/company highlights: {', '.join(company_profile.get('technical_keywords', [])[:10])}
-            
-            Structure:
-            - Subject line: "Application for {opportunity.title}".
-            - Introduction: who we are and what we’re applying for.
-            - Relevant experience & achievements aligned to the role (2 short paragraphs or bullets).
-            - Value we bring (impact, reliability, culture fit, availability, location/remote if relevant).
-            - Brief closing with call to action for next steps.
-            
-            Requirements:
-            - Friendly but professional tone.
-            - Keep to 200–350 words, crisp and specific.
-            - {signoff_instructions}
-            - Use the company name exactly as provided: {company_name}.
-            """
+            system_role = _JOB_COVER_LETTER_INSTRUCTIONS
+            builder.add('Role/Opportunity Title', opportunity.title, truncate=False)
+            builder.add('Organization', opportunity.agency, truncate=False)
+        builder.add('Sign-off', signoff, truncate=False)
+        builder.add('Description', self._description(opportunity))
+        builder.add('Our capabilities', ', '.join(company_profile.get('technical_keywords', [])[:10]), PRIORITY_EXTRA)
+        if is_gov:
+            builder.add('Matching keywords', ', '.join(match_result.matching_keywords), PRIORITY_EXTRA)
+        prompt = builder.build()
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            text = chat_completion(
+                [
                     {"role": "system", "content": system_role},
                     {"role": "user", "content": prompt}
                 ],
+                model="gpt-3.5-turbo",
                 max_tokens=800,
                 temperature=0.7,
-                request_timeout=settings.openai_section_timeout_secs
+                request_timeout=settings.openai_section_timeout_secs,
+                cache=self.llm_cache,
+                bypass_cache=bypass_cache,
+                client=self.llm_client
             )
             
-            return response.choices[0].message.content.strip()
+            return text.strip()
             
         except Exception as e:
             logger.error(f"Failed to generate cover letter: {e}")
             return self._get_fallback_cover_letter(opportunity, company_profile)
     
     def _generate_technical_approach(self, match_result: MatchResult, 
-                                   company_profile: Dict[str, Any]) -> str:
+                                   company_profile: Dict[str, Any],
+                                   processed_docs: Optional[List[ProcessedDocument]] = None,
+                                   bypass_cache: bool = False) -> str:
         """Generate technical approach section."""
         opportunity = match_result.opportunity
-        
-        prompt = f"""
-        Write a technical approach section for this government contracting opportunity.
-        
-        OPPORTUNITY DETAILS:
-        Title: {opportunity.title}
-        Description: {opportunity.description[:1500]}
-        
-        OUR CAPABILITIES:
-        {company_profile.get('all_content', '')[:2000]}
-        
-        MATCHING KEYWORDS: {', '.join(match_result.matching_keywords)}
-        
-        Write a technical approach that:
-        1. Demonstrates understanding of the technical requirements
-        2. Outlines our methodology and approach
-        3. Highlights relevant technical capabilities
-        4. Shows innovation and best practices
-        5. Addresses key technical challenges
-        
-        Structure it with clear sections and bullet points.
-        """
+        builder = PromptBuilder(settings.generation_prompt_tokens)
+        self._add_opportunity(builder, opportunity)
+        self._add_context(builder, 'OUR CAPABILITIES', opportunity, company_profile, processed_docs,
+                          fallback=company_profile.get('all_content', ''))
+        builder.add('MATCHING KEYWORDS', ', '.join(match_result.matching_keywords), PRIORITY_EXTRA)
+        prompt = builder.build()
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a technical expert in IT and cybersecurity services."},
+            text = chat_completion(
+                [
+                    {"role": "system", "content": _TECHNICAL_APPROACH_INSTRUCTIONS},
                     {"role": "user", "content": prompt}
                 ],
+                model="gpt-3.5-turbo",
                 max_tokens=1200,
                 temperature=0.6,
-                request_timeout=settings.openai_section_timeout_secs
+                request_timeout=settings.openai_section_timeout_secs,
+                cache=self.llm_cache,
+                bypass_cache=bypass_cache,
+                client=self.llm_client
             )
             
-            return response.choices[0].message.content.strip()
+            return text.strip()
             
         except Exception as e:
             logger.error(f"Failed to generate technical approach: {e}")
             return self._get_fallback_technical_approach(opportunity)
     
     def _generate_past_performance(self, match_result: MatchResult, 
-                                 processed_docs: List[ProcessedDocument]) -> str:
+                                 processed_docs: List[ProcessedDocument],
+                                 company_profile: Optional[Dict[str, Any]] = None,
+                                 bypass_cache: bool = False) -> str:
         """Generate past performance section."""
         opportunity = match_result.opportunity
         
@@ -272,46 +296,37 @@ class ApplicationGenerator:
             if 'experience' in doc.sections:
                 experience_content += doc.sections['experience'] + "\n\n"
         
-        prompt = f"""
-        Write a past performance section for this government contracting opportunity.
-        
-        OPPORTUNITY DETAILS:
-        Title: {opportunity.title}
-        Description: {opportunity.description[:1000]}
-        
-        OUR EXPERIENCE:
-        {experience_content[:2000]}
-        
-        Write a past performance section that:
-        1. Highlights relevant past projects and experience
-        2. Shows successful delivery of similar services
-        3. Demonstrates client satisfaction and results
-        4. Includes specific metrics and outcomes
-        5. Relates experience to current opportunity requirements
-        
-        If specific experience is limited, focus on transferable skills and capabilities.
-        """
+        builder = PromptBuilder(settings.generation_prompt_tokens)
+        self._add_opportunity(builder, opportunity)
+        self._add_context(builder, 'OUR EXPERIENCE', opportunity, company_profile, processed_docs,
+                          sections=('experience',), fallback=experience_content)
+        prompt = builder.build()
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert in government contracting and past performance documentation."},
+            text = chat_completion(
+                [
+                    {"role": "system", "content": _PAST_PERFORMANCE_INSTRUCTIONS},
                     {"role": "user", "content": prompt}
                 ],
+                model="gpt-3.5-turbo",
                 max_tokens=1000,
                 temperature=0.6,
-                request_timeout=settings.openai_section_timeout_secs
+                request_timeout=settings.openai_section_timeout_secs,
+                cache=self.llm_cache,
+                bypass_cache=bypass_cache,
+                client=self.llm_client
             )
             
-            return response.choices[0].message.content.strip()
+            return text.strip()
             
         except Exception as e:
             logger.error(f"Failed to generate past performance: {e}")
             return self._get_fallback_past_performance()
     
     def _generate_team_qualifications(self, match_result: MatchResult, 
-                                    processed_docs: List[ProcessedDocument]) -> str:
+                                    processed_docs: List[ProcessedDocument],
+                                    company_profile: Optional[Dict[str, Any]] = None,
+                                    bypass_cache: bool = False) -> str:
         """Generate team qualifications section."""
         opportunity = match_result.opportunity
         
@@ -323,85 +338,91 @@ class ApplicationGenerator:
             if 'certifications' in doc.sections:
                 team_content += doc.sections['certifications'] + "\n\n"
         
-        prompt = f"""
-        Write a team qualifications section for this government contracting opportunity.
-        
-        OPPORTUNITY DETAILS:
-        Title: {opportunity.title}
-        Description: {opportunity.description[:1000]}
-        
-        OUR TEAM:
-        {team_content[:2000]}
-        
-        Write a team qualifications section that:
-        1. Highlights key personnel and their qualifications
-        2. Shows relevant certifications and credentials
-        3. Demonstrates expertise in required areas
-        4. Includes years of experience and specializations
-        5. Shows team's ability to deliver the required services
-        
-        Focus on qualifications most relevant to the opportunity.
-        """
+        builder = PromptBuilder(settings.generation_prompt_tokens)
+        self._add_opportunity(builder, opportunity)
+        self._add_context(builder, 'OUR TEAM', opportunity, company_profile, processed_docs,
+                          sections=('team', 'certifications'), fallback=team_content)
+        prompt = builder.build()
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert in team qualifications and personnel documentation."},
+            text = chat_completion(
+                [
+                    {"role": "system", "content": _TEAM_QUALIFICATIONS_INSTRUCTIONS},
                     {"role": "user", "content": prompt}
                 ],
+                model="gpt-3.5-turbo",
                 max_tokens=1000,
                 temperature=0.6,
-                request_timeout=settings.openai_section_timeout_secs
+                request_timeout=settings.openai_section_timeout_secs,
+                cache=self.llm_cache,
+                bypass_cache=bypass_cache,
+                client=self.llm_client
             )
             
-            return response.choices[0].message.content.strip()
+            return text.strip()
             
         except Exception as e:
             logger.error(f"Failed to generate team qualifications: {e}")
             return self._get_fallback_team_qualifications()
     
+    @staticmethod
+    def _description(opportunity: BidOpportunity) -> str:
+        return truncate_to_tokens(opportunity.description or '', DESCRIPTION_TOKENS, sentences=True)
+    
+    def _add_opportunity(self, builder: PromptBuilder, opportunity: BidOpportunity, agency: bool = False) -> None:
+        """Opportunity essentials, which get the prompt budget first."""
+        lines = [f"Title: {opportunity.title}"]
+        if agency:
+            lines.append(f"Agency: {opportunity.agency}")
+        lines.append(f"Description: {self._description(opportunity)}")
+        builder.add('OPPORTUNITY DETAILS', '\n'.join(lines), truncate=False)
+    
+    def _add_context(self, builder: PromptBuilder, label: str, opportunity: BidOpportunity,
+                     company_profile: Optional[Dict[str, Any]], processed_docs: Optional[List[ProcessedDocument]],
+                     sections: Optional[tuple] = None, fallback: str = '') -> None:
+        """Top retrieved chunks for the opportunity (fetched within settings.prompt_context_tokens),
+        as many as the prompt budget allows; the fallback text, cut to fit, when unavailable."""
+        if company_profile and processed_docs:
+            try:
+                index = index_for_profile(company_profile, processed_docs)
+                chunks = index.search(opportunity_query(opportunity), token_budget=settings.prompt_context_tokens,
+                                      sections=sections)
+                if chunks:
+                    builder.add_chunks(label, [chunk.text for chunk in chunks], PRIORITY_CONTEXT)
+                    return
+            except Exception as e:
+                logger.warning(f"Context retrieval failed, using truncated text: {e}")
+        builder.add(label, fallback, PRIORITY_EXTRA)
+    
     def _generate_executive_summary(self, match_result: MatchResult, 
-                                  company_profile: Dict[str, Any]) -> str:
+                                  company_profile: Dict[str, Any], bypass_cache: bool = False) -> str:
         """Generate executive summary."""
         opportunity = match_result.opportunity
         
-        prompt = f"""
-        Write an executive summary for this government contracting opportunity.
-        
-        OPPORTUNITY DETAILS:
-        Title: {opportunity.title}
-        Agency: {opportunity.agency}
-        Description: {opportunity.description[:1000]}
-        
-        OUR COMPANY:
-        Name: {company_profile.get('company_name', 'Our Company')}
-        Key Capabilities: {', '.join(company_profile.get('technical_keywords', [])[:8])}
-        
-        MATCH SCORE: {match_result.match_score:.2f}
-        MATCHING KEYWORDS: {', '.join(match_result.matching_keywords)}
-        
-        Write an executive summary that:
-        1. Clearly states our interest and qualifications
-        2. Highlights our key value proposition
-        3. Shows understanding of the opportunity
-        4. Demonstrates our competitive advantages
-        5. Is concise and compelling (1-2 paragraphs)
-        """
+        builder = PromptBuilder(settings.generation_prompt_tokens)
+        self._add_opportunity(builder, opportunity, agency=True)
+        builder.add('OUR COMPANY', f"Name: {company_profile.get('company_name', 'Our Company')}", truncate=False)
+        builder.add('Key Capabilities', ', '.join(company_profile.get('technical_keywords', [])[:8]), PRIORITY_EXTRA)
+        builder.add('MATCH SCORE', f"{match_result.match_score:.2f}", PRIORITY_EXTRA)
+        builder.add('MATCHING KEYWORDS', ', '.join(match_result.matching_keywords), PRIORITY_EXTRA)
+        prompt = builder.build()
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert in executive summaries for government contracting."},
+            text = chat_completion(
+                [
+                    {"role": "system", "content": _EXECUTIVE_SUMMARY_INSTRUCTIONS},
                     {"role": "user", "content": prompt}
                 ],
+                model="gpt-3.5-turbo",
                 max_tokens=600,
                 temperature=0.7,
-                request_timeout=settings.openai_section_timeout_secs
+                request_timeout=settings.openai_section_timeout_secs,
+                cache=self.llm_cache,
+                bypass_cache=bypass_cache,
+                client=self.llm_client
             )
             
-            return response.choices[0].message.content.strip()
+            return text.strip()
             
         except Exception as e:
             logger.error(f"Failed to generate executive summary: {e}")
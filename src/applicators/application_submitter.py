@@ -2,7 +2,6 @@
 Automated application submission system.
 """
 import time
-import json
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
@@ -15,8 +14,10 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 
+from config import settings
 from scrapers import BidOpportunity
 from ai import MatchResult
+from .submission_log import SubmissionLog
 
 class ApplicationSubmitter:
     """Handles automated submission of bid applications."""
@@ -25,6 +26,7 @@ class ApplicationSubmitter:
         self.headless = headless
         self.driver = None
         self.submission_log = []
+        self.submission_history = SubmissionLog(settings.submission_log_file)
         
     def _setup_driver(self):
         """Setup Chrome WebDriver with appropriate options."""
@@ -381,12 +383,8 @@ class ApplicationSubmitter:
         
         self.submission_log.append(log_entry)
         
-        # Save to file
-        log_file = Path("./logs/submissions.json")
-        log_file.parent.mkdir(exist_ok=True)
-        
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        # Save to the indexed submission history
+        self.submission_history.append(log_entry)
     
     def get_submission_log(self) -> List[Dict[str, Any]]:
         """Get submission log."""
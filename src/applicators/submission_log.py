@@ -0,0 +1,339 @@
+"""
+Append-only submission history with a sidecar offset index.
+"""
+import os
+import json
+import struct
+import hashlib
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+# One fixed-width record per log line:
+# byte offset, byte length, epoch timestamp, opportunity key, status key
+_RECORD = struct.Struct("<QIdQI")
+# The same layout as a NumPy record, for filtering blocks of the index at once
+_RECORD_DTYPE = np.dtype([('offset', '<u8'), ('length', '<u4'), ('timestamp', '<f8'),
+                          ('opportunity', '<u8'), ('status', '<u4')])
+# Index records checked per step while walking a page
+_PAGE_BLOCK = 1024
+
+
+def _opportunity_key(opportunity_id: Any) -> int:
+    digest = hashlib.blake2b(str(opportunity_id or '').encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _status_key(status: Any) -> int:
+    digest = hashlib.blake2b(str(status or '').strip().lower().encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _parse_timestamp(value: Any) -> float:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except Exception:
+        return 0.0
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    """(timestamp, position) of the last entry of the previous page, or None."""
+    if not cursor:
+        return None
+    try:
+        timestamp, position = str(cursor).split(':')
+        return float(timestamp), int(position)
+    except ValueError:
+        return None
+
+
+class SubmissionLog:
+    """Newline-delimited JSON submission log with reverse-chronological paging.
+
+    Entries are appended to ``log_path`` exactly as before; ``<log_path>.idx`` holds
+    one fixed-width record per entry (offset, length, timestamp and filter keys).
+    Pages are ordered by entry timestamp, newest first (append order among equal
+    timestamps), and only the entries returned are read from the log. Entries are
+    normally appended in timestamp order, so a page walks the index backwards from
+    the cursor and stops after ``limit`` matches; only an out-of-order index is
+    sorted, once, and that order is reused until new entries arrive. The index is
+    derived from the log, so entries appended by other processes are picked up on
+    the next read, and a truncated or replaced log is reindexed.
+    """
+
+    def __init__(self, log_path: str = "./logs/submissions.json"):
+        self.log_path = Path(log_path)
+        self.index_path = self.log_path.with_name(self.log_path.name + ".idx")
+        self._lock = threading.Lock()
+        # In-memory copy of the index, extended on each sync
+        self._records = np.zeros(0, dtype=_RECORD_DTYPE)
+        # Whether timestamps never decrease in append order; if not, the newest-first
+        # positions and their negated timestamps (built on first use)
+        self._in_order = True
+        self._order: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._log_identity: Optional[Tuple[int, int]] = None
+        # End of the scanned log (past malformed lines the index has no record for)
+        self._scanned_end = 0
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Append one entry to the log and index it."""
+        entry = dict(entry)
+        entry.setdefault('timestamp', datetime.now().isoformat())
+        line = (json.dumps(entry) + "\n").encode('utf-8')
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(self.log_path, 'ab') as f:
+                f.write(line)
+            self._sync_index()
+
+    def page(self, limit: int = 50, cursor: Optional[str] = None,
+             opportunity_id: Optional[str] = None, status: Optional[str] = None) -> Dict[str, Any]:
+        """Return up to ``limit`` entries, newest first.
+
+        cursor: value of ``next_cursor`` from the previous page (None for the first page).
+        opportunity_id/status: optional exact-match filters (status is case-insensitive).
+        """
+        limit = max(1, int(limit))
+        with self._lock:
+            total = self._sync_index()
+            records = self._records
+            order = None if self._in_order else self._sorted_order()
+        if total == 0:
+            return {'entries': [], 'next_cursor': None, 'total': total}
+
+        start = self._start_rank(records, order, _parse_cursor(cursor))
+        opportunity_key = _opportunity_key(opportunity_id) if opportunity_id else None
+        status_key = _status_key(status) if status else None
+        status_norm = (status or '').strip().lower()
+
+        entries: List[Dict[str, Any]] = []
+        next_cursor = None
+        with open(self.log_path, 'rb') as log:
+            rank = start
+            while rank < total and len(entries) < limit:
+                # Positions of the next block of ranks, newest first
+                stop = min(total, rank + _PAGE_BLOCK)
+                if order is None:
+                    positions = np.arange(total - 1 - rank, total - 1 - stop, -1)
+                else:
+                    positions = order[0][rank:stop]
+                block = records[positions]
+                mask = np.ones(len(block), dtype=bool)
+                if opportunity_key is not None:
+                    mask &= block['opportunity'] == opportunity_key
+                if status_key is not None:
+                    mask &= block['status'] == status_key
+                for i in np.flatnonzero(mask):
+                    record = block[i]
+                    log.seek(int(record['offset']))
+                    try:
+                        entry = json.loads(log.read(int(record['length'])))
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue
+                    # Keys are hashes; confirm the actual values to rule out collisions
+                    if opportunity_id and str(entry.get('opportunity_id')) != str(opportunity_id):
+                        continue
+                    if status and str(entry.get('status') or '').strip().lower() != status_norm:
+                        continue
+                    entries.append(entry)
+                    if len(entries) >= limit:
+                        if rank + int(i) + 1 < total:
+                            next_cursor = f"{float(record['timestamp'])!r}:{int(positions[i])}"
+                        break
+                rank = stop
+
+        return {
+            'entries': entries,
+            'next_cursor': next_cursor,
+            'total': total
+        }
+
+    @staticmethod
+    def _start_rank(records: np.ndarray, order: Optional[Tuple[np.ndarray, np.ndarray]],
+                    after: Optional[Tuple[float, int]]) -> int:
+        """Newest-first rank of the first entry older than the cursor (0 without one)."""
+        total = len(records)
+        if after is None:
+            return 0
+        timestamp, position = after
+        if order is None:
+            # In order: (timestamp, position) rises with position, so entries before the
+            # cursor are a prefix of the index, found by binary search
+            timestamps = records['timestamp']
+            low = int(np.searchsorted(timestamps, timestamp, side='left'))
+            high = int(np.searchsorted(timestamps, timestamp, side='right'))
+            return total - min(max(position, low), high)
+        positions, keys = order
+        # Ranks are sorted by (-timestamp, -position); count the entries not older than the cursor
+        low = int(np.searchsorted(keys, -timestamp, side='left'))
+        high = int(np.searchsorted(keys, -timestamp, side='right'))
+        tied = positions[low:high]
+        return low + int(np.count_nonzero(tied >= position))
+
+    def _sorted_order(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Newest-first positions of an out-of-order index and their negated timestamps,
+        cached until the index changes. Caller must hold ``self._lock``.
+        """
+        if self._order is None:
+            keys = -self._records['timestamp']
+            positions = np.lexsort((-np.arange(len(keys)), keys))
+            self._order = positions, keys[positions]
+        return self._order
+
+    def latest_statuses(self, opportunity_ids: Iterable[Any]) -> Dict[str, str]:
+        """Status of the newest entry for each of the given opportunity ids that has one."""
+        wanted = {str(o) for o in opportunity_ids if o}
+        with self._lock:
+            self._sync_index()
+            records = self._records
+        if not wanted or not len(records):
+            return {}
+        keys = np.array([_opportunity_key(o) for o in wanted], dtype=np.uint64)
+        positions = np.flatnonzero(np.isin(records['opportunity'], keys))
+        order = np.lexsort((-positions, -records['timestamp'][positions]))
+        statuses: Dict[str, str] = {}
+        with open(self.log_path, 'rb') as log:
+            for i in order:
+                record = records[positions[i]]
+                log.seek(int(record['offset']))
+                try:
+                    entry = json.loads(log.read(int(record['length'])))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                opportunity_id = str(entry.get('opportunity_id'))
+                if opportunity_id in wanted and opportunity_id not in statuses:
+                    statuses[opportunity_id] = str(entry.get('status') or '')
+                    if len(statuses) == len(wanted):
+                        break
+        return statuses
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._sync_index()
+
+    def _sync_index(self) -> int:
+        """Index any log lines not yet covered by the sidecar index; return the entry count.
+
+        Rebuilds from scratch when the index is missing or the log was truncated/replaced.
+        Caller must hold ``self._lock``.
+        """
+        if not self.log_path.exists():
+            self._records = self._records[:0]
+            return 0
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, 'a+b') as idx:
+            if fcntl is not None:
+                fcntl.flock(idx.fileno(), fcntl.LOCK_EX)
+            try:
+                stat = self.log_path.stat()
+                log_size = stat.st_size
+                identity = (stat.st_dev, stat.st_ino)
+                idx.seek(0, os.SEEK_END)
+                idx_size = idx.tell()
+                count = idx_size // _RECORD.size
+                if idx_size % _RECORD.size:
+                    # Torn write from a crashed process; drop the partial record
+                    idx.truncate(count * _RECORD.size)
+                indexed_end = 0
+                if count:
+                    idx.seek((count - 1) * _RECORD.size)
+                    offset, length, _, opp_key, _ = _RECORD.unpack(idx.read(_RECORD.size))
+                    indexed_end = offset + length
+                    reason = None
+                    if indexed_end > log_size:
+                        reason = "shrank"
+                    elif (self._log_identity not in (None, identity)
+                          or not self._record_matches(offset, length, opp_key)):
+                        reason = "was replaced"
+                    if reason:
+                        logger.warning(f"Submission log {self.log_path} {reason}; rebuilding index")
+                        idx.truncate(0)
+                        count, indexed_end = 0, 0
+                if self._log_identity != identity or self._scanned_end > log_size:
+                    self._scanned_end = 0
+                self._log_identity = identity
+                scan_from = max(indexed_end, self._scanned_end)
+                if scan_from < log_size:
+                    new_records, self._scanned_end = self._scan_log(scan_from)
+                    if new_records:
+                        idx.seek(0, os.SEEK_END)
+                        idx.write(b''.join(_RECORD.pack(*r) for r in new_records))
+                        count += len(new_records)
+                self._load_records(idx, count)
+                return count
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(idx.fileno(), fcntl.LOCK_UN)
+
+    def _record_matches(self, offset: int, length: int, opp_key: int) -> bool:
+        """Whether the log still holds the indexed entry at offset (detects a replaced log)."""
+        with open(self.log_path, 'rb') as log:
+            if offset:
+                log.seek(offset - 1)
+                if log.read(1) != b"\n":
+                    return False
+            raw = log.read(length)
+        try:
+            entry = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return False
+        return (raw.endswith(b"\n") and isinstance(entry, dict)
+                and _opportunity_key(entry.get('opportunity_id')) == opp_key)
+
+    def _load_records(self, idx, count: int) -> None:
+        """Bring the in-memory index up to ``count`` records, rereading it if another process rewrote it."""
+        cached = len(self._records)
+        if cached:
+            idx.seek((cached - 1) * _RECORD.size)
+            last = idx.read(_RECORD.size)
+            if cached > count or last != self._records[-1:].tobytes():
+                cached = 0
+        if cached == count:
+            if not count:
+                self._records = self._records[:0]
+                self._in_order, self._order = True, None
+            return
+        idx.seek(cached * _RECORD.size)
+        tail = np.frombuffer(idx.read((count - cached) * _RECORD.size), dtype=_RECORD_DTYPE)
+        self._records = np.concatenate([self._records[:cached], tail])
+        # Only the new records (and the one before them) need checking for order
+        timestamps = self._records['timestamp'][max(cached - 1, 0):]
+        tail_in_order = bool(np.all(timestamps[1:] >= timestamps[:-1]))
+        self._in_order = tail_in_order and (self._in_order or not cached)
+        self._order = None
+
+    def _scan_log(self, start: int) -> Tuple[List[Tuple[int, int, float, int, int]], int]:
+        """Index records for complete log lines from byte offset ``start``, and the offset
+        after the last complete line."""
+        records: List[Tuple[int, int, float, int, int]] = []
+        with open(self.log_path, 'rb') as log:
+            log.seek(start)
+            offset = start
+            for raw in log:
+                if not raw.endswith(b"\n"):
+                    # Line still being written; index it on a later sync
+                    break
+                length = len(raw)
+                stripped = raw.strip()
+                if stripped:
+                    try:
+                        entry = json.loads(stripped)
+                        if isinstance(entry, dict):
+                            records.append((
+                                offset, length,
+                                _parse_timestamp(entry.get('timestamp')),
+                                _opportunity_key(entry.get('opportunity_id')),
+                                _status_key(entry.get('status'))
+                            ))
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        logger.warning(f"Skipping malformed submission log line at byte {offset}")
+                offset += length
+        return records, offset
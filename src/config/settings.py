@@ -30,6 +30,41 @@ class Settings(BaseSettings):
     
     # File Paths
     documents_folder: str = Field("./documents", env="DOCUMENTS_FOLDER")
+    document_cache_file: str = Field("./cache/documents.json", env="DOCUMENT_CACHE_FILE")
+    document_workers: int = Field(0, env="DOCUMENT_WORKERS")  # 0 = one per CPU, 1 = extract inline
+    document_timeout_secs: float = Field(120, env="DOCUMENT_TIMEOUT_SECS")
+    document_memory_limit_mb: int = Field(1024, env="DOCUMENT_MEMORY_LIMIT_MB")
+    document_max_pages: int = Field(0, env="DOCUMENT_MAX_PAGES")  # 0 = unlimited
+    document_max_chars: int = Field(2_000_000, env="DOCUMENT_MAX_CHARS")  # 0 = unlimited
+    pdf_page_cache_folder: str = Field("./cache/pdf_pages", env="PDF_PAGE_CACHE_FOLDER")
+    spreadsheet_max_rows: int = Field(10000, env="SPREADSHEET_MAX_ROWS")  # per sheet; 0 = unlimited
+    spreadsheet_max_cols: int = Field(50, env="SPREADSHEET_MAX_COLS")  # 0 = unlimited
+    profile_snapshot_file: str = Field("./cache/profile_snapshot.pkl", env="PROFILE_SNAPSHOT_FILE")
+    match_cache_file: str = Field("./cache/match_cache.sqlite3", env="MATCH_CACHE_FILE")
+    match_cache_max_entries: int = Field(50000, env="MATCH_CACHE_MAX_ENTRIES")  # 0 = unlimited
+    section_similarity_aggregation: str = Field("topk", env="SECTION_SIMILARITY_AGGREGATION")  # max | topk
+    section_similarity_top_k: int = Field(3, env="SECTION_SIMILARITY_TOP_K")
+    tfidf_corpus_enabled: bool = Field(True, env="TFIDF_CORPUS_ENABLED")  # False = fit on the profile text only
+    tfidf_model_file: str = Field("./cache/tfidf_model.pkl", env="TFIDF_MODEL_FILE")
+    tfidf_max_documents: int = Field(20000, env="TFIDF_MAX_DOCUMENTS")  # newest opportunity texts kept
+    tfidf_max_features: int = Field(20000, env="TFIDF_MAX_FEATURES")
+    tfidf_min_documents: int = Field(50, env="TFIDF_MIN_DOCUMENTS")  # corpus size before the first fit
+    tfidf_refit_min_new_documents: int = Field(200, env="TFIDF_REFIT_MIN_NEW_DOCUMENTS")
+    tfidf_refit_interval_hours: float = Field(24, env="TFIDF_REFIT_INTERVAL_HOURS")
+    tfidf_check_interval_secs: float = Field(300, env="TFIDF_CHECK_INTERVAL_SECS")
+    llm_cache_enabled: bool = Field(True, env="LLM_CACHE_ENABLED")
+    llm_cache_file: str = Field("./cache/llm_responses.sqlite3", env="LLM_CACHE_FILE")
+    llm_cache_ttl_hours: float = Field(168, env="LLM_CACHE_TTL_HOURS")  # 0 = never expire
+    llm_cache_max_entries: int = Field(5000, env="LLM_CACHE_MAX_ENTRIES")  # 0 = unlimited
+    llm_backend: str = Field("openai", env="LLM_BACKEND")  # "openai", or "mock" for offline load tests
+    llm_mock_latency_secs: float = Field(0.5, env="LLM_MOCK_LATENCY_SECS")
+    llm_timeout_secs: float = Field(60, env="LLM_TIMEOUT_SECS")  # per call, including retries
+    llm_max_retries: int = Field(3, env="LLM_MAX_RETRIES")
+    llm_max_concurrency: int = Field(8, env="LLM_MAX_CONCURRENCY")  # requests in flight across all callers
+    max_upload_mb: int = Field(100, env="MAX_UPLOAD_MB")  # per file; 0 = unlimited
+    document_watch_enabled: bool = Field(True, env="DOCUMENT_WATCH_ENABLED")
+    document_watch_interval_secs: float = Field(5.0, env="DOCUMENT_WATCH_INTERVAL_SECS")
+    document_watch_debounce_secs: float = Field(3.0, env="DOCUMENT_WATCH_DEBOUNCE_SECS")
     templates_folder: str = Field("./templates", env="TEMPLATES_FOLDER")
     
     # Application Settings
@@ -41,12 +76,33 @@ class Settings(BaseSettings):
     fast_mode_default: bool = Field(False, env="FAST_MODE_DEFAULT")
     openai_section_timeout_secs: int = Field(45, env="OPENAI_SECTION_TIMEOUT_SECS")
     generation_parallelism: int = Field(5, env="GENERATION_PARALLELISM")
+    ai_max_concurrency: int = Field(4, env="AI_MAX_CONCURRENCY")  # AI analysis requests in flight at once
+    ai_batch_size: int = Field(5, env="AI_BATCH_SIZE")  # opportunities per AI analysis request; 1 = one each
+    match_cascade: bool = Field(False, env="MATCH_CASCADE")  # AI-analyse only the heuristic shortlist below
+    match_cascade_top_k: int = Field(25, env="MATCH_CASCADE_TOP_K")  # AI-analyse at most this many; 0 = no cap
+    match_cascade_quantile: float = Field(0.0, env="MATCH_CASCADE_QUANTILE")  # e.g. 0.75 = top quarter only
+    match_cascade_min_score: float = Field(0.0, env="MATCH_CASCADE_MIN_SCORE")
+    prompt_context_tokens: int = Field(400, env="PROMPT_CONTEXT_TOKENS")  # retrieved company text per prompt
+    generation_prompt_tokens: int = Field(700, env="GENERATION_PROMPT_TOKENS")  # per section prompt (user message)
     prewarm_on_startup: bool = Field(True, env="PREWARM_ON_STARTUP")
-    background_jobs_max: int = Field(100, env="BACKGROUND_JOBS_MAX")
+    background_jobs_max: int = Field(100, env="BACKGROUND_JOBS_MAX")  # pending/running jobs at once
+    background_jobs_ttl_secs: int = Field(3600, env="BACKGROUND_JOBS_TTL_SECS")  # keep finished jobs pollable this long
     
     # Logging
     log_level: str = Field("INFO", env="LOG_LEVEL")
     log_file: str = Field("./logs/bid_application.log", env="LOG_FILE")
+    submission_log_file: str = Field("./logs/submissions.json", env="SUBMISSION_LOG_FILE")
+
+    # Columnar (Parquet) exports of match results and outcomes
+    columnar_export_enabled: bool = Field(True, env="COLUMNAR_EXPORT_ENABLED")
+    columnar_export_folder: str = Field("./exports/columnar", env="COLUMNAR_EXPORT_FOLDER")
+
+    # Opportunity pool: expired notices are evicted (and archived) before matching/generation
+    expiry_grace_hours: float = Field(0, env="EXPIRY_GRACE_HOURS")
+    expired_archive_file: str = Field("./exports/expired_opportunities.json", env="EXPIRED_ARCHIVE_FILE")
+    # Caps for the server's pool, so notices without a due date do not accumulate forever
+    opportunity_pool_max_size: int = Field(20000, env="OPPORTUNITY_POOL_MAX_SIZE")  # 0 = unlimited
+    opportunity_pool_max_age_days: float = Field(30, env="OPPORTUNITY_POOL_MAX_AGE_DAYS")  # since last seen; 0 = unlimited
 
     # SMTP / Email Settings (Gmail by default)
     smtp_host: str = Field("smtp.gmail.com", env="SMTP_HOST")
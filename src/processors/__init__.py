@@ -2,6 +2,10 @@
 Document processors package for handling company documents and bid materials.
 """
 from .document_processor import DocumentProcessor, ProcessedDocument
+from .document_cache import DocumentCache
+from .document_store import DocumentStore
+from .document_watcher import DocumentWatcher
+from .extraction_pool import ExtractionPool
+from .text_extraction import TextBuilder, PdfPageCache
 
-__all__ = ["DocumentProcessor", "ProcessedDocument"]
-
+__all__ = ["DocumentProcessor", "ProcessedDocument", "DocumentCache", "DocumentStore", "DocumentWatcher", "ExtractionPool", "TextBuilder", "PdfPageCache"]
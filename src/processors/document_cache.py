@@ -0,0 +1,149 @@
+"""
+Persistent cache of processed documents keyed by file fingerprint.
+"""
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, Any, Optional, Iterable, Tuple, Type
+from dataclasses import asdict
+from pathlib import Path
+from loguru import logger
+
+CACHE_VERSION = 2
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path: Path) -> str:
+    """Hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DocumentCache:
+    """JSON-backed map of document path -> (size, mtime, sha256, ProcessedDocument).
+
+    A lookup whose size and mtime match is served without touching file contents. When
+    they differ the file is hashed, and an unchanged hash still counts as a hit (e.g. a
+    copy or touch). Failed extractions are cached too, so an unreadable file is not
+    retried until it changes.
+
+    document_type: dataclass used to rebuild cached documents (ProcessedDocument).
+    signature: describes the extraction settings; a cache written under a different
+    signature is discarded, since its documents would no longer match.
+    """
+
+    def __init__(self, cache_file: str, document_type: Type, signature: str = ""):
+        self.cache_file = Path(cache_file)
+        self.document_type = document_type
+        self.signature = signature
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def lookup(self, key: str, file_path: Path, stat: Optional[os.stat_result] = None) -> Tuple[bool, Optional[Any]]:
+        """Return (hit, document). document may be None on a hit for files that yielded no content."""
+        stat = stat or file_path.stat()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.get('hash_only'):
+            return False, None
+        if entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            try:
+                sha = file_sha256(file_path)
+            except OSError:
+                return False, None
+            if sha != entry['sha256']:
+                return False, None
+            with self._lock:
+                entry['size'] = stat.st_size
+                entry['mtime_ns'] = stat.st_mtime_ns
+                self._dirty = True
+        return True, self._to_document(entry.get('document'))
+
+    def get_sha256(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry['sha256'] if entry else None
+
+    def known_sha256(self, key: str, stat: os.stat_result) -> Optional[str]:
+        """SHA-256 recorded for key if the file is unchanged (same size and mtime), else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            return None
+        return entry['sha256']
+
+    def put_hash(self, key: str, stat: os.stat_result, sha256: str) -> None:
+        """Remember only a file's hash (e.g. a duplicate that is never extracted); lookup() misses on it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['sha256'] == sha256 and entry['size'] == stat.st_size \
+                    and entry['mtime_ns'] == stat.st_mtime_ns:
+                return
+            self._entries[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                  'sha256': sha256, 'document': None, 'hash_only': True}
+            self._dirty = True
+
+    def put(self, key: str, file_path: Path, document: Optional[Any],
+            stat: Optional[os.stat_result] = None, sha256: Optional[str] = None) -> None:
+        stat = stat or file_path.stat()
+        sha256 = sha256 or file_sha256(file_path)
+        with self._lock:
+            self._entries[key] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': sha256,
+                'document': asdict(document) if document is not None else None,
+            }
+            self._dirty = True
+
+    def prune(self, live_keys: Iterable[str]) -> int:
+        """Drop entries for files that no longer exist; return how many were removed."""
+        live = set(live_keys)
+        with self._lock:
+            stale = [k for k in self._entries if k not in live]
+            for k in stale:
+                del self._entries[k]
+            if stale:
+                self._dirty = True
+        return len(stale)
+
+    def save(self) -> None:
+        """Persist atomically if anything changed since the last load/save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({'version': CACHE_VERSION, 'signature': self.signature,
+                                  'entries': self._entries}, ensure_ascii=False)
+            self._dirty = False
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_file.with_name(self.cache_file.name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp, self.cache_file)
+        except Exception as e:
+            logger.warning(f"Failed to save document cache {self.cache_file}: {e}")
+
+    def _load(self) -> None:
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION and data.get('signature', '') == self.signature:
+                self._entries = data.get('entries', {})
+            else:
+                logger.info("Document cache version or extraction settings changed; starting fresh")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable document cache {self.cache_file}: {e}")
+
+    def _to_document(self, data: Optional[Dict[str, Any]]) -> Optional[Any]:
+        if data is None:
+            return None
+        return self.document_type(**data)
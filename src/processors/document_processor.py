@@ -3,7 +3,8 @@ Document processing system for handling company documents and bid materials.
 """
 import os
 import re
-from typing import List, Dict, Any, Optional, Union
+import hashlib
+from typing import List, Dict, Any, Optional, Union, Iterator, Iterable, Tuple, Callable
 from pathlib import Path
 from dataclasses import dataclass
 from loguru import logger
@@ -13,6 +14,14 @@ from docx import Document
 import pandas as pd
 from openpyxl import load_workbook
 
+from .document_cache import DocumentCache, CACHE_VERSION, file_sha256
+from .extraction_pool import ExtractionPool
+from .text_extraction import TextBuilder, PdfPageCache
+from .sections import segment_sections
+
+SUPPORTED_EXTENSIONS = frozenset({'.pdf', '.docx', '.doc', '.txt', '.xlsx', '.xls', '.csv'})
+CSV_CHUNK_ROWS = 5000
+
 @dataclass
 class ProcessedDocument:
     """Data class representing a processed document."""
@@ -26,10 +35,31 @@ class ProcessedDocument:
 class DocumentProcessor:
     """Processes various document types for bid applications."""
     
-    def __init__(self, documents_folder: str = "./documents"):
+    def __init__(self, documents_folder: str = "./documents", cache_file: Optional[str] = None,
+                 workers: int = 1, timeout_secs: float = 120, memory_limit_mb: int = 1024,
+                 max_pages: int = 0, max_chars: int = 0, pdf_page_cache_folder: Optional[str] = None,
+                 max_sheet_rows: int = 0, max_sheet_cols: int = 0):
         self.documents_folder = Path(documents_folder)
         self.documents_folder.mkdir(exist_ok=True)
         
+        # workers == 1 extracts inline; otherwise files go to an ExtractionPool (0 = one per CPU)
+        self.workers = workers
+        self.timeout_secs = timeout_secs
+        self.memory_limit_mb = memory_limit_mb
+        
+        # Per-document extraction budgets (0 = unlimited) and per-page PDF text cache
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.pdf_page_cache_folder = pdf_page_cache_folder
+        self.max_sheet_rows = max_sheet_rows
+        self.max_sheet_cols = max_sheet_cols
+        self.pdf_page_cache = PdfPageCache(pdf_page_cache_folder) if pdf_page_cache_folder else None
+        
+        # Optional persistent cache so unchanged files are not re-extracted
+        self.extraction_signature = ";".join(
+            f"{k}={v}" for k, v in self._extraction_options().items() if k.startswith('max_'))
+        self.cache = DocumentCache(cache_file, ProcessedDocument, self.extraction_signature) if cache_file else None
+        
         # Common keywords to extract from documents
         self.technical_keywords = [
             "cybersecurity", "information security", "IT services", "software development",
@@ -49,27 +79,165 @@ class DocumentProcessor:
             "architected", "deployed", "maintained", "supported", "delivered"
         ]
     
-    def process_all_documents(self) -> List[ProcessedDocument]:
-        """Process all documents in the documents folder."""
-        processed_docs = []
-        
+    def process_all_documents(self, progress: Optional[Callable[[int, int], None]] = None) -> List[ProcessedDocument]:
+        """Process all documents in the documents folder.
+        With a cache configured, only new or changed files are extracted; cached results
+        are reused for the rest and entries for deleted files are dropped.
+        progress: called as progress(done, total) while the new/changed files are extracted.
+        """
         if not self.documents_folder.exists():
             logger.warning(f"Documents folder {self.documents_folder} does not exist")
-            return processed_docs
+            return []
+        
+        files = self._list_supported_files()
+        order = {path: i for i, path in enumerate(files)}
+        results = sorted(self._iter_processed(files, progress), key=lambda item: order[item[0]])
+        processed_docs = [doc for _, doc in results]
+        logger.info(f"Processed {len(processed_docs)} documents")
+        return processed_docs
+    
+    def iter_documents(self) -> Iterator[ProcessedDocument]:
+        """Yield processed documents as each one becomes available (cache hits first)."""
+        if not self.documents_folder.exists():
+            return
+        for _, doc in self._iter_processed(self._list_supported_files()):
+            yield doc
+    
+    def _iter_processed(self, files: List[Path],
+                        progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Tuple[Path, ProcessedDocument]]:
+        """Serve cache hits, extract the misses (inline or across the pool) and keep the cache in sync.
+        Files with identical content are processed once; a cached path represents them when there
+        is one (else the first in order), and the other names are listed in its
+        metadata['duplicate_names'].
+        """
+        hits: Dict[Path, Optional[ProcessedDocument]] = {}
+        stats = {}
+        hashes = {}
+        for file_path in files:
+            try:
+                key = self._cache_key(file_path)
+                stats[file_path] = file_path.stat()
+                known = None
+                if self.cache is not None:
+                    hit, doc = self.cache.lookup(key, file_path, stats[file_path])
+                    if hit:
+                        hits[file_path] = doc
+                        hashes[file_path] = self.cache.get_sha256(key)
+                        continue
+                    # Duplicates are cached by hash only, so unchanged ones are not re-read
+                    known = self.cache.known_sha256(key, stats[file_path])
+                hashes[file_path] = known or file_sha256(file_path)
+            except Exception as e:
+                logger.error(f"Failed to process {file_path}: {e}")
+        
+        # Group identical content under a cached path, so a new copy never causes re-extraction
+        canonical: Dict[str, Path] = {}
+        for file_path, sha in hashes.items():
+            first = canonical.get(sha)
+            if first is None or (file_path in hits and first not in hits):
+                canonical[sha] = file_path
+        duplicates: Dict[Path, List[str]] = {}
+        for file_path, sha in hashes.items():
+            if canonical[sha] != file_path:
+                duplicates.setdefault(canonical[sha], []).append(file_path.name)
+        unique = set(canonical.values())
+        if len(unique) < len(hashes):
+            logger.info(f"Skipping {len(hashes) - len(unique)} duplicate documents (same content as another file)")
+        if self.cache is not None:
+            for file_path, sha in hashes.items():
+                if file_path not in unique and file_path not in hits:
+                    self.cache.put_hash(self._cache_key(file_path), stats[file_path], sha)
+        
+        def tagged(file_path: Path, doc: ProcessedDocument) -> ProcessedDocument:
+            # Fresh metadata, so names from an earlier build never linger on this one
+            metadata = {k: v for k, v in doc.metadata.items() if k != 'duplicate_names'}
+            if file_path in duplicates:
+                metadata['duplicate_names'] = duplicates[file_path]
+            doc.metadata = metadata
+            return doc
+        
+        for file_path, doc in hits.items():
+            if doc and file_path in unique:
+                yield file_path, tagged(file_path, doc)
         
-        # Process all supported file types
-        for file_path in self.documents_folder.rglob("*"):
-            if file_path.is_file() and self._is_supported_file(file_path):
+        misses = [p for p in hashes if p not in hits and p in unique]
+        if misses:
+            logger.info(f"Extracting {len(misses)} documents ({len(hits)} unchanged, served from cache)")
+        if progress:
+            progress(0, len(misses))
+        
+        for done, (file_path, doc, error) in enumerate(self._extract_many(misses), start=1):
+            if progress:
+                progress(done, len(misses))
+            if error:
+                # Not cached: a timeout or crash may be transient, so retry on the next build
+                logger.error(f"Failed to process {file_path}: {error}")
+                continue
+            if self.cache is not None:
                 try:
-                    doc = self.process_document(file_path)
-                    if doc:
-                        processed_docs.append(doc)
-                        logger.info(f"Processed document: {file_path.name}")
+                    self.cache.put(self._cache_key(file_path), file_path, doc,
+                                   stat=stats[file_path], sha256=hashes[file_path])
+                except OSError as e:
+                    logger.warning(f"Could not cache {file_path}: {e}")
+            if doc:
+                logger.info(f"Processed document: {file_path.name}")
+                yield file_path, tagged(file_path, doc)
+        
+        if self.cache is not None:
+            self.cache.prune(self._cache_key(p) for p in files)
+            self.cache.save()
+    
+    def _extract_many(self, files: List[Path]) -> Iterator[Tuple[Path, Optional[ProcessedDocument], Optional[str]]]:
+        """Yield (path, document, error) for each file in completion order."""
+        if self.workers == 1 or not files:
+            for file_path in files:
+                try:
+                    yield file_path, self.process_document(file_path), None
                 except Exception as e:
-                    logger.error(f"Failed to process {file_path}: {e}")
+                    yield file_path, None, str(e)
+            return
         
-        logger.info(f"Processed {len(processed_docs)} documents")
-        return processed_docs
+        workers = self.workers if self.workers > 0 else (os.cpu_count() or 2)
+        pool = ExtractionPool(str(self.documents_folder), workers=min(workers, len(files)),
+                              timeout_secs=self.timeout_secs, memory_limit_mb=self.memory_limit_mb,
+                              processor_options=self._extraction_options())
+        yield from pool.imap_unordered(files)
+    
+    def document_fingerprint(self) -> str:
+        """Digest of the supported file set (paths, sizes, mtimes) and extraction settings.
+        Cheap to compute (stat only); changes whenever processing could give a different result.
+        """
+        digest = hashlib.sha256(f"{CACHE_VERSION};{self.extraction_signature}".encode())
+        if self.documents_folder.exists():
+            for file_path in self._list_supported_files():
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    continue
+                digest.update(f"\0{self._cache_key(file_path)}\0{stat.st_size}\0{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+    
+    def _extraction_options(self) -> Dict[str, Any]:
+        """Settings a worker-side DocumentProcessor needs to extract the same way."""
+        return {
+            'max_pages': self.max_pages,
+            'max_chars': self.max_chars,
+            'pdf_page_cache_folder': self.pdf_page_cache_folder,
+            'max_sheet_rows': self.max_sheet_rows,
+            'max_sheet_cols': self.max_sheet_cols,
+        }
+    
+    def _list_supported_files(self) -> List[Path]:
+        """Supported files under the documents folder, in a stable order (dotfiles excluded, as in DocumentStore)."""
+        return sorted(p for p in self.documents_folder.rglob("*")
+                      if p.is_file() and self._is_supported_file(p)
+                      and not any(part.startswith('.') for part in p.relative_to(self.documents_folder).parts))
+    
+    def _cache_key(self, file_path: Path) -> str:
+        try:
+            return file_path.relative_to(self.documents_folder).as_posix()
+        except ValueError:
+            return str(file_path)
     
     def process_document(self, file_path: Union[str, Path]) -> Optional[ProcessedDocument]:
         """Process a single document."""
@@ -102,8 +270,7 @@ class DocumentProcessor:
     
     def _is_supported_file(self, file_path: Path) -> bool:
         """Check if file type is supported."""
-        supported_extensions = {'.pdf', '.docx', '.doc', '.txt', '.xlsx', '.xls', '.csv'}
-        return file_path.suffix.lower() in supported_extensions
+        return file_path.suffix.lower() in SUPPORTED_EXTENSIONS
     
     def _get_file_type(self, file_path: Path) -> str:
         """Get file type from extension."""
@@ -129,68 +296,114 @@ class DocumentProcessor:
             logger.error(f"Failed to extract content from {file_path}: {e}")
             return ""
     
+    def _new_builder(self) -> TextBuilder:
+        return TextBuilder(max_pages=self.max_pages, max_chars=self.max_chars)
+    
+    def _finish(self, builder: TextBuilder, file_path: Path) -> str:
+        if builder.truncated:
+            logger.warning(f"Truncated {file_path.name} to extraction budget "
+                           f"({builder.pages} pages, {builder.chars} characters)")
+        return builder.build()
+    
     def _extract_pdf_content(self, file_path: Path) -> str:
-        """Extract text content from PDF."""
-        content = ""
+        """Extract text content from PDF, one page at a time."""
+        builder = self._new_builder()
         try:
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 for page in pdf_reader.pages:
-                    content += page.extract_text() + "\n"
+                    if builder.full:
+                        builder.truncated = True
+                        break
+                    if self.pdf_page_cache is not None:
+                        text = self.pdf_page_cache.page_text(page)
+                    else:
+                        text = page.extract_text() or ""
+                    builder.add(text)
+                    builder.end_page()
         except Exception as e:
             logger.error(f"Failed to extract PDF content: {e}")
-        return content
+        return self._finish(builder, file_path)
     
     def _extract_docx_content(self, file_path: Path) -> str:
         """Extract text content from DOCX."""
-        content = ""
+        builder = self._new_builder()
         try:
             doc = Document(file_path)
             for paragraph in doc.paragraphs:
-                content += paragraph.text + "\n"
+                if not builder.add(paragraph.text):
+                    break
         except Exception as e:
             logger.error(f"Failed to extract DOCX content: {e}")
-        return content
+        return self._finish(builder, file_path)
     
     def _extract_txt_content(self, file_path: Path) -> str:
         """Extract text content from TXT."""
+        limit = self.max_chars or -1
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
+                return file.read(limit)
         except UnicodeDecodeError:
             # Try with different encoding
             try:
                 with open(file_path, 'r', encoding='latin-1') as file:
-                    return file.read()
+                    return file.read(limit)
             except Exception as e:
                 logger.error(f"Failed to extract TXT content: {e}")
                 return ""
     
     def _extract_excel_content(self, file_path: Path) -> str:
-        """Extract text content from Excel files."""
-        content = ""
+        """Extract text content from Excel files, streaming rows in read-only mode."""
+        builder = self._new_builder()
+        workbook = None
         try:
-            workbook = load_workbook(file_path, data_only=True)
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
             for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                content += f"Sheet: {sheet_name}\n"
-                for row in sheet.iter_rows(values_only=True):
-                    row_text = " ".join(str(cell) for cell in row if cell is not None)
-                    if row_text.strip():
-                        content += row_text + "\n"
+                if not builder.add(f"Sheet: {sheet_name}"):
+                    break
+                rows = workbook[sheet_name].iter_rows(max_col=self.max_sheet_cols or None, values_only=True)
+                self._add_rows(builder, rows, file_path, sheet_name)
+                if builder.full:
+                    break
         except Exception as e:
             logger.error(f"Failed to extract Excel content: {e}")
-        return content
+        finally:
+            if workbook is not None:
+                workbook.close()
+        return self._finish(builder, file_path)
     
     def _extract_csv_content(self, file_path: Path) -> str:
-        """Extract text content from CSV files."""
-        content = ""
+        """Extract text content from CSV files, reading in chunks."""
+        builder = self._new_builder()
         try:
-            df = pd.read_csv(file_path)
-            content = df.to_string()
+            reader = pd.read_csv(file_path, dtype=str, keep_default_na=False, chunksize=CSV_CHUNK_ROWS,
+                                 nrows=self.max_sheet_rows + 1 if self.max_sheet_rows else None)
+            with reader:
+                self._add_rows(builder, self._iter_csv_rows(reader), file_path, file_path.name, header_rows=1)
         except Exception as e:
             logger.error(f"Failed to extract CSV content: {e}")
-        return content
+        return self._finish(builder, file_path)
+    
+    def _iter_csv_rows(self, reader) -> Iterator[tuple]:
+        """Header row, then data rows, one chunk at a time (columns capped)."""
+        for index, chunk in enumerate(reader):
+            if self.max_sheet_cols:
+                chunk = chunk.iloc[:, :self.max_sheet_cols]
+            if index == 0:
+                yield tuple(chunk.columns)
+            yield from chunk.itertuples(index=False, name=None)
+    
+    def _add_rows(self, builder: TextBuilder, rows: Iterable[tuple], file_path: Path, sheet_name: str,
+                  header_rows: int = 0) -> None:
+        """Append non-empty rows as space-joined cells, up to max_sheet_rows data rows."""
+        limit = self.max_sheet_rows + header_rows if self.max_sheet_rows else 0
+        for count, row in enumerate(rows):
+            if limit and count >= limit:
+                logger.info(f"{file_path.name} [{sheet_name}]: kept the first {self.max_sheet_rows} rows")
+                break
+            row_text = " ".join(str(cell) for cell in row if cell is not None and cell != "")
+            if row_text.strip() and not builder.add(row_text):
+                break
     
     def _extract_metadata(self, file_path: Path, content: str) -> Dict[str, Any]:
         """Extract metadata from document."""
@@ -257,50 +470,7 @@ class DocumentProcessor:
     
     def _extract_sections(self, content: str) -> Dict[str, str]:
         """Extract document sections based on common headings."""
-        sections = {}
-        
-        # Common section patterns
-        section_patterns = {
-            'executive_summary': r'(?i)(executive\s+summary|summary)',
-            'company_overview': r'(?i)(company\s+overview|about\s+us|organization)',
-            'technical_capabilities': r'(?i)(technical\s+capabilities|capabilities|services)',
-            'experience': r'(?i)(experience|past\s+performance|project\s+history)',
-            'certifications': r'(?i)(certifications|certificates|credentials)',
-            'team': r'(?i)(team|personnel|staff|key\s+personnel)',
-            'methodology': r'(?i)(methodology|approach|process)'
-        }
-        
-        lines = content.split('\n')
-        current_section = None
-        current_content = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check if line matches a section header
-            section_found = False
-            for section_name, pattern in section_patterns.items():
-                if re.search(pattern, line):
-                    # Save previous section
-                    if current_section and current_content:
-                        sections[current_section] = '\n'.join(current_content)
-                    
-                    # Start new section
-                    current_section = section_name
-                    current_content = [line]
-                    section_found = True
-                    break
-            
-            if not section_found and current_section:
-                current_content.append(line)
-        
-        # Save last section
-        if current_section and current_content:
-            sections[current_section] = '\n'.join(current_content)
-        
-        return sections
+        return segment_sections(content)
     
     def get_company_profile(self, processed_docs: List[ProcessedDocument]) -> Dict[str, Any]:
         """Create a comprehensive company profile from processed documents."""
@@ -315,9 +485,10 @@ class DocumentProcessor:
             'all_content': ''
         }
         
+        # Combine all content
+        profile['all_content'] = ''.join(doc.content + '\n' for doc in processed_docs)
+        
         for doc in processed_docs:
-            # Combine all content
-            profile['all_content'] += doc.content + '\n'
             
             # Extract company name
             if 'company_name' in doc.metadata:
@@ -353,5 +524,8 @@ class DocumentProcessor:
         # Convert set to list
         profile['technical_keywords'] = list(profile['technical_keywords'])
         
+        # Identifies this document set, e.g. for indexes derived from the profile
+        profile['version'] = hashlib.sha256(profile['all_content'].encode('utf-8', 'ignore')).hexdigest()[:16]
+        
         return profile
 
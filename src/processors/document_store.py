@@ -0,0 +1,186 @@
+"""
+Content-addressed index over the company documents folder.
+"""
+import os
+import json
+import asyncio
+import hashlib
+import threading
+from uuid import uuid4
+from datetime import datetime
+from typing import Dict, Any, List, Optional, AsyncIterator, Iterator, Tuple
+from pathlib import Path
+from loguru import logger
+
+from .document_cache import file_sha256
+
+MANIFEST_NAME = ".manifest.json"
+
+
+class DocumentStore:
+    """Maps SHA-256 of document content -> one stored file plus every name it was uploaded as.
+
+    Uploads are hashed while they stream to disk; content that is already stored is
+    discarded and only recorded as another display name, so the folder holds each
+    document once. reconcile() indexes files that were copied in by hand, including
+    subfolders (duplicates already on disk are left in place; processing skips them by hash).
+    """
+
+    def __init__(self, documents_folder: str, manifest_file: Optional[str] = None):
+        self.root = Path(documents_folder)
+        self.manifest_file = Path(manifest_file) if manifest_file else self.root / MANIFEST_NAME
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._files: Dict[str, Dict[str, Any]] = {}  # relative path -> size, mtime_ns, sha256
+        self._lock = threading.Lock()
+        self._load()
+
+    async def add_stream(self, chunks: AsyncIterator[bytes], filename: str,
+                         stored_name: Optional[str] = None, max_bytes: int = 0) -> Dict[str, Any]:
+        """Write an upload while hashing it; return {'sha256', 'stored_as', 'size', 'duplicate'}.
+
+        Disk writes and hashing run in a worker thread so the event loop keeps serving requests.
+        stored_name: file name to use if the content is new (defaults to filename).
+        max_bytes: reject (ValueError) uploads larger than this; 0 = no limit.
+        """
+        await asyncio.to_thread(self.root.mkdir, parents=True, exist_ok=True)
+        tmp = self.root / f".upload-{uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
+
+        def write(out, chunk: bytes) -> None:
+            digest.update(chunk)
+            out.write(chunk)
+
+        try:
+            out = await asyncio.to_thread(open, tmp, 'wb')
+            try:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes and size > max_bytes:
+                        raise ValueError(f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+                    await asyncio.to_thread(write, out, chunk)
+            finally:
+                await asyncio.to_thread(out.close)
+            sha = digest.hexdigest()
+            entry, duplicate = await asyncio.to_thread(self._commit_upload, tmp, sha, size, filename, stored_name)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        if duplicate:
+            logger.info(f"{filename} has the same content as {entry['stored_as']}; not stored again")
+        return {'sha256': sha, 'stored_as': entry['stored_as'], 'size': size, 'duplicate': duplicate}
+
+    def _commit_upload(self, tmp: Path, sha: str, size: int, filename: str,
+                       stored_name: Optional[str]) -> Tuple[Dict[str, Any], bool]:
+        """Move a hashed upload into place (or drop it as a duplicate) and save the manifest."""
+        with self._lock:
+            entry = self._entries.get(sha)
+            if entry and (self.root / entry['stored_as']).exists():
+                if filename not in entry['names']:
+                    entry['names'].append(filename)
+                duplicate = True
+            else:
+                target = self._free_name(stored_name or filename)
+                os.replace(tmp, target)
+                entry = self._entries[sha] = {
+                    'stored_as': target.name,
+                    'names': [filename],
+                    'size': size,
+                    'added_at': datetime.now().isoformat(),
+                }
+                self._remember_file(target.name, target.stat(), sha)
+                duplicate = False
+            self._save()
+        return entry, duplicate
+
+    def reconcile(self) -> int:
+        """Index files present on disk and drop entries whose file is gone; return duplicates found.
+
+        Walks subfolders like the document processor does. Each file's size, mtime and hash are
+        kept in the manifest (duplicates included), so unchanged files are not re-hashed.
+        """
+        duplicates = 0
+        if not self.root.exists():
+            return duplicates
+        with self._lock:
+            seen: Dict[str, str] = {}
+            files: Dict[str, Dict[str, Any]] = {}
+            for path in sorted(self._stored_files()):
+                rel = path.relative_to(self.root).as_posix()
+                try:
+                    stat = path.stat()
+                    known = self._files.get(rel)
+                    if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+                        sha = known['sha256']
+                    else:
+                        sha = file_sha256(path)
+                except OSError:
+                    continue
+                files[rel] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha}
+                entry = self._entries.get(sha)
+                if sha in seen:
+                    duplicates += 1
+                elif entry is None or not (self.root / entry['stored_as']).exists():
+                    entry = self._entries[sha] = {
+                        'stored_as': rel,
+                        'names': (entry or {}).get('names', []),
+                        'size': stat.st_size,
+                        'added_at': datetime.now().isoformat(),
+                    }
+                if path.name not in entry['names']:
+                    entry['names'].append(path.name)
+                seen.setdefault(sha, entry['stored_as'])
+            for sha in [s for s in self._entries if s not in seen]:
+                del self._entries[sha]
+            self._files = files
+            self._save()
+        if duplicates:
+            logger.info(f"Documents folder holds {duplicates} duplicate file(s); they are processed once")
+        return duplicates
+
+    def documents(self) -> List[Dict[str, Any]]:
+        """One record per unique document: sha256, stored_as, names, size, added_at."""
+        with self._lock:
+            return [dict(entry, sha256=sha, names=list(entry['names'])) for sha, entry in self._entries.items()]
+
+    def _stored_files(self) -> Iterator[Path]:
+        """Document files under the root, skipping hidden files/folders (manifest, partial uploads)."""
+        for path in self.root.rglob('*'):
+            rel = path.relative_to(self.root)
+            if path.is_file() and not any(part.startswith('.') for part in rel.parts):
+                yield path
+
+    def _remember_file(self, rel: str, stat: os.stat_result, sha: str) -> None:
+        self._files[rel] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha}
+
+    def _free_name(self, filename: str) -> Path:
+        """Path for filename in the store, with a timestamp prefix only if the name is taken."""
+        name = Path(filename).name
+        target = self.root / name
+        counter = 0
+        while target.exists():
+            counter += 1
+            suffix = f"_{counter}" if counter > 1 else ""
+            target = self.root / f"{datetime.now():%Y%m%d_%H%M%S}{suffix}_{name}"
+        return target
+
+    def _load(self) -> None:
+        if not self.manifest_file.exists():
+            return
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._entries = data.get('documents', {})
+            self._files = data.get('files', {})
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable document manifest {self.manifest_file}: {e}")
+
+    def _save(self) -> None:
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.manifest_file.with_name(self.manifest_file.name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'documents': self._entries, 'files': self._files}, f, indent=2)
+            os.replace(tmp, self.manifest_file)
+        except Exception as e:
+            logger.warning(f"Failed to save document manifest {self.manifest_file}: {e}")
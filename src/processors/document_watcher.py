@@ -0,0 +1,142 @@
+"""
+Background watcher for the company documents folder.
+"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from loguru import logger
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # Linux-only optional dependency; polling works everywhere
+    INotify = None
+    inotify_flags = None
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+class DocumentWatcher:
+    """Notices files added, changed or removed under a folder and reports them in batches.
+
+    The folder is polled every interval_secs by comparing (size, mtime_ns) per file;
+    where inotify_simple is installed, filesystem events wake the poller early. A batch
+    is reported only after debounce_secs with no further changes, so a burst of copies
+    (or a file still being written) triggers one on_change(paths) call. Dotfiles and
+    dot-directories are ignored, which keeps partial uploads and the manifest out.
+    """
+
+    def __init__(self, folder: str, on_change: Callable[[List[str]], None],
+                 interval_secs: float = 5.0, debounce_secs: float = 3.0,
+                 is_supported: Optional[Callable[[Path], bool]] = None):
+        self.folder = Path(folder)
+        self.on_change = on_change
+        self.interval_secs = max(0.1, interval_secs)
+        self.debounce_secs = max(0.0, debounce_secs)
+        self.is_supported = is_supported or (lambda path: True)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._inotify = self._open_inotify()
+        self._thread = threading.Thread(target=self._run, name="document-watcher", daemon=True)
+        self._thread.start()
+        mode = "inotify + polling" if self._inotify else "polling"
+        logger.info(f"Watching {self.folder} for document changes ({mode}, every {self.interval_secs:g}s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._inotify is not None:
+            try:
+                self._inotify.close()
+            except OSError:
+                pass
+            self._inotify = None
+
+    def snapshot(self) -> Snapshot:
+        """{relative path: (size, mtime_ns)} for the watched files."""
+        result: Snapshot = {}
+        if not self.folder.exists():
+            return result
+        for path in self.folder.rglob("*"):
+            try:
+                rel = path.relative_to(self.folder)
+                if any(part.startswith('.') for part in rel.parts) or not self.is_supported(path):
+                    continue
+                stat = path.stat()
+                if path.is_file():
+                    result[rel.as_posix()] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue  # Removed while scanning
+        return result
+
+    @staticmethod
+    def diff(before: Snapshot, after: Snapshot) -> List[str]:
+        """Paths added, removed or modified between two snapshots."""
+        return sorted(path for path in before.keys() | after.keys() if before.get(path) != after.get(path))
+
+    def _run(self) -> None:
+        known = self.snapshot()
+        pending: set = set()
+        last_change = 0.0
+        while not self._stop.is_set():
+            self._wait(self.debounce_secs if pending else self.interval_secs)
+            if self._stop.is_set():
+                break
+            current = self.snapshot()
+            changed = self.diff(known, current)
+            known = current
+            if changed:
+                pending.update(changed)
+                last_change = time.monotonic()
+                continue
+            if pending and time.monotonic() - last_change >= self.debounce_secs:
+                batch = sorted(pending)
+                pending.clear()
+                self._notify(batch)
+
+    def _notify(self, paths: Iterable[str]) -> None:
+        paths = list(paths)
+        logger.info(f"Documents changed: {', '.join(paths[:5])}{' ...' if len(paths) > 5 else ''}")
+        try:
+            self.on_change(paths)
+        except Exception as e:
+            logger.error(f"Document change handler failed: {e}")
+
+    def _wait(self, seconds: float) -> None:
+        """Sleep up to seconds; returns early on stop() or an inotify event."""
+        if self._inotify is None:
+            self._stop.wait(seconds)
+            return
+        deadline = time.monotonic() + seconds
+        while not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # Short reads keep stop() responsive while blocked on the inotify fd
+            try:
+                if self._inotify.read(timeout=int(min(remaining, 1.0) * 1000)):
+                    return
+            except OSError:
+                self._stop.wait(remaining)
+                return
+
+    def _open_inotify(self):
+        if INotify is None or not self.folder.exists():
+            return None
+        try:
+            inotify = INotify()
+            mask = (inotify_flags.CREATE | inotify_flags.MODIFY | inotify_flags.CLOSE_WRITE |
+                    inotify_flags.DELETE | inotify_flags.MOVED_FROM | inotify_flags.MOVED_TO)
+            inotify.add_watch(str(self.folder), mask)
+            return inotify
+        except OSError as e:
+            logger.warning(f"inotify unavailable for {self.folder}, polling only: {e}")
+            return None
@@ -0,0 +1,149 @@
+"""
+Process pool for document extraction with per-file timeouts and a memory ceiling.
+"""
+import os
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Iterable, Iterator, Optional, Tuple, Any, Dict
+from pathlib import Path
+from loguru import logger
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, workers run unbounded
+    resource = None
+
+
+def _limit_memory(memory_limit_mb: int) -> None:
+    if not resource or not memory_limit_mb:
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    try:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not set worker memory limit: {e}")
+
+
+def _worker_main(conn, documents_folder: str, memory_limit_mb: int, processor_options: Dict[str, Any]) -> None:
+    """Worker loop: receive a path, send back ('ok', ProcessedDocument|None) or ('error', message)."""
+    from .document_processor import DocumentProcessor
+
+    _limit_memory(memory_limit_mb)
+    processor = DocumentProcessor(documents_folder, **processor_options)
+    while True:
+        try:
+            path = conn.recv()
+        except (EOFError, OSError, KeyboardInterrupt):
+            break
+        if path is None:
+            break
+        try:
+            conn.send(('ok', processor.process_document(path)))
+        except MemoryError:
+            conn.send(('error', f"memory limit of {memory_limit_mb} MB exceeded"))
+        except Exception as e:
+            conn.send(('error', str(e)))
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, ctx, documents_folder: str, memory_limit_mb: int, processor_options: Dict[str, Any]):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main,
+                                   args=(child_conn, documents_folder, memory_limit_mb, processor_options),
+                                   daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+        self.conn.close()
+
+
+class ExtractionPool:
+    """Runs DocumentProcessor.process_document across worker processes.
+
+    Each worker handles one file at a time. A file that runs past `timeout_secs`, or a
+    worker that dies (segfault, OOM kill), only costs that file: the worker is killed
+    and a fresh one takes its place. Workers run under an address-space limit of
+    `memory_limit_mb` where the platform supports it, so a runaway parse fails with
+    MemoryError inside the worker instead of exhausting the host. processor_options are
+    passed to the worker-side DocumentProcessor (extraction budgets, page cache).
+    """
+
+    def __init__(self, documents_folder: str, workers: int = 0, timeout_secs: float = 120,
+                 memory_limit_mb: int = 1024, processor_options: Optional[Dict[str, Any]] = None):
+        self.documents_folder = str(documents_folder)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 2)
+        self.timeout_secs = timeout_secs
+        self.memory_limit_mb = memory_limit_mb
+        self.processor_options = processor_options or {}
+        # Not fork: the server is multi-threaded, and a forked child inherits locks other
+        # threads held at fork time (logging handlers, SQLite connections) still locked
+        methods = multiprocessing.get_all_start_methods()
+        self._ctx = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+    def imap_unordered(self, paths: Iterable[Path]) -> Iterator[Tuple[Path, Optional[Any], Optional[str]]]:
+        """Yield (path, document, error) as each file finishes, in completion order."""
+        pending = deque(Path(p) for p in paths)
+        idle = []
+        busy: Dict[Any, Tuple[_Worker, Path, float]] = {}
+        try:
+            while pending or busy:
+                while pending and (idle or len(busy) < self.workers):
+                    worker = idle.pop() if idle else self._spawn()
+                    path = pending.popleft()
+                    try:
+                        worker.conn.send(str(path))
+                    except (BrokenPipeError, OSError):
+                        worker.stop(kill=True)
+                        yield path, None, "worker unavailable"
+                        continue
+                    busy[worker.conn] = (worker, path, time.monotonic() + self.timeout_secs)
+                if not busy:
+                    continue
+
+                next_deadline = min(deadline for _, _, deadline in busy.values())
+                for conn in wait(list(busy), timeout=max(0.0, next_deadline - time.monotonic())):
+                    worker, path, _ = busy.pop(conn)
+                    try:
+                        status, payload = conn.recv()
+                    except (EOFError, OSError):
+                        worker.stop(kill=True)
+                        yield path, None, f"worker exited with code {worker.process.exitcode}"
+                        continue
+                    idle.append(worker)
+                    if status == 'ok':
+                        yield path, payload, None
+                    else:
+                        yield path, None, payload
+
+                now = time.monotonic()
+                for conn, (worker, path, deadline) in list(busy.items()):
+                    if deadline <= now:
+                        del busy[conn]
+                        worker.stop(kill=True)
+                        yield path, None, f"timed out after {self.timeout_secs}s"
+        finally:
+            for worker in idle:
+                worker.stop()
+            for worker, _, _ in busy.values():
+                worker.stop(kill=True)
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.documents_folder, self.memory_limit_mb, self.processor_options)
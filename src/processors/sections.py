@@ -0,0 +1,69 @@
+"""
+Single-pass section segmentation for company documents.
+"""
+import re
+from typing import Dict, List, Optional
+
+# Section name -> header vocabulary. Order matters only when two sections match at the
+# same position of a header line.
+SECTION_PATTERNS = {
+    'executive_summary': r'executive\s+summary|summary',
+    'company_overview': r'company\s+overview|about\s+us|organization',
+    'technical_capabilities': r'technical\s+capabilities|capabilities|services',
+    'experience': r'experience|past\s+performance|project\s+history',
+    'certifications': r'certifications|certificates|credentials',
+    'team': r'key\s+personnel|personnel|staff|team',
+    'methodology': r'methodology|approach|process',
+}
+
+# One pattern for every header: each section is a named group, matched on whole words
+HEADER_PATTERN = re.compile(
+    '|'.join(rf'\b(?P<{name}>{pattern})\b' for name, pattern in SECTION_PATTERNS.items()),
+    re.IGNORECASE,
+)
+
+# Numbering in front of a heading: "1.", "2)", "IV.", "Section 3:", "3.1 "
+NUMBERING_PATTERN = re.compile(r'^(?:section\s+)?(?:\d+(?:\.\d+)*[.):\-\s]|[ivxlc]+[.)])\s*', re.IGNORECASE)
+
+MAX_HEADER_CHARS = 80
+MAX_HEADER_WORDS = 8
+BULLETS = ('-', '*', '•', '·', '–', '—', '>')
+
+
+def header_section(line: str) -> Optional[str]:
+    """Section name if the (stripped) line looks like a heading for one, else None.
+
+    A heading is short, is not a bullet, and does not end like a sentence; this keeps
+    body text that merely mentions "services" or "team" from opening a new section.
+    """
+    if len(line) > MAX_HEADER_CHARS or line.startswith(BULLETS) or line.endswith(('.', ',', ';')):
+        return None
+    title = NUMBERING_PATTERN.sub('', line, count=1)
+    if len(title.split()) > MAX_HEADER_WORDS:
+        return None
+    match = HEADER_PATTERN.search(title)
+    return match.lastgroup if match else None
+
+
+def segment_sections(content: str) -> Dict[str, str]:
+    """Split content into known sections in one pass over its lines.
+
+    Each section's text starts with its heading line. A section heading that appears
+    more than once (e.g. "Cybersecurity Services:" and "IT Services:") has its parts
+    joined in document order. Text before the first heading is ignored.
+    """
+    parts: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+
+    for raw in content.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        section = header_section(line)
+        if section is not None:
+            current = parts.setdefault(section, [])
+            current.append(line)
+        elif current is not None:
+            current.append(line)
+
+    return {name: '\n'.join(lines) for name, lines in parts.items()}
@@ -0,0 +1,159 @@
+"""
+Streaming text extraction helpers: a linear-time text builder with size budgets and a
+per-page PDF text cache.
+"""
+import os
+import hashlib
+from typing import List, Optional
+from pathlib import Path
+from loguru import logger
+
+
+def _resolve(obj):
+    """Dereference a PyPDF2 indirect object (plain values pass through)."""
+    return obj.get_object() if hasattr(obj, 'get_object') else obj
+
+
+# Streams that cannot change extracted text: hashing their dictionary is enough
+_OPAQUE_STREAM_KEYS = ('/FontFile', '/FontFile2', '/FontFile3')
+
+
+def _hash_pdf_object(digest, obj, seen: set, opaque: bool = False) -> None:
+    """Feed a PDF object graph into digest: dictionaries, arrays, scalars and stream data.
+
+    Indirect objects are followed once (seen holds their ids), so shared resources and
+    reference cycles are hashed as a back-reference. Image data and embedded font
+    programs are skipped (opaque), as text extraction never reads them.
+    """
+    idnum = getattr(obj, 'idnum', None)
+    if idnum is not None:
+        ref = (idnum, getattr(obj, 'generation', 0))
+        if ref in seen:
+            digest.update(f"@{ref}".encode())
+            return
+        seen.add(ref)
+        obj = _resolve(obj)
+    if isinstance(obj, dict):
+        digest.update(b"<<")
+        for key in sorted(obj):
+            digest.update(str(key).encode('utf-8', 'replace'))
+            _hash_pdf_object(digest, obj[key], seen, key in _OPAQUE_STREAM_KEYS)
+        digest.update(b">>")
+        if hasattr(obj, 'get_data') and not opaque and obj.get('/Subtype') != '/Image':
+            digest.update(obj.get_data())
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"[")
+        for item in obj:
+            _hash_pdf_object(digest, item, seen)
+        digest.update(b"]")
+    else:
+        digest.update(repr(obj).encode('utf-8', 'replace'))
+
+
+class TextBuilder:
+    """Accumulates text pieces in a list and joins once, so building is O(total size).
+
+    max_pages/max_chars of 0 mean unlimited. Once a budget is exhausted add() returns
+    False and callers should stop reading; `truncated` records that it happened.
+    """
+
+    def __init__(self, max_pages: int = 0, max_chars: int = 0):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.pages = 0
+        self.chars = 0
+        self.truncated = False
+        self._parts: List[str] = []
+
+    def add(self, text: str) -> bool:
+        """Append one line/row/paragraph followed by a newline."""
+        if self.full:
+            self.truncated = True  # more input arrived after the budget ran out
+            return False
+        if self.max_chars and self.chars + len(text) + 1 > self.max_chars:
+            text = text[:max(0, self.max_chars - self.chars - 1)]
+            self.truncated = True
+        self._parts.append(text)
+        self._parts.append("\n")
+        self.chars += len(text) + 1
+        return not self.truncated
+
+    def end_page(self) -> bool:
+        """Count a finished page; return False when the page budget is used up."""
+        self.pages += 1
+        return not self.full
+
+    @property
+    def full(self) -> bool:
+        return (self.truncated
+                or bool(self.max_pages and self.pages >= self.max_pages)
+                or bool(self.max_chars and self.chars >= self.max_chars))
+
+    def build(self) -> str:
+        return "".join(self._parts)
+
+
+PAGE_KEY_VERSION = b"page-key-2\n"
+
+
+class PdfPageCache:
+    """Extracted text per PDF page, stored on disk under a hash of the page's content
+    stream and resources.
+
+    Keying by page content rather than by file means an edited PDF only re-extracts
+    the pages that actually changed, and identical pages shared across files (cover
+    sheets, boilerplate) are extracted once.
+    """
+
+    def __init__(self, cache_folder: str):
+        self.root = Path(cache_folder)
+
+    def page_text(self, page) -> str:
+        """Text of a PyPDF2 page, from the cache when its content stream was seen before."""
+        key = self.page_key(page)
+        text = self.get(key) if key else None
+        if text is None:
+            text = page.extract_text() or ""
+            if key:
+                self.put(key, text)
+        return text
+
+    def page_key(self, page) -> Optional[str]:
+        """Hash of the content stream plus the whole resources dictionary it draws with:
+        fonts with their encodings and ToUnicode maps, and Form XObject streams (text
+        mapping depends on all of them)."""
+        try:
+            digest = hashlib.sha256(PAGE_KEY_VERSION)
+            seen: set = set()
+            # A single stream or an array of them
+            _hash_pdf_object(digest, page.get('/Contents'), seen)
+            _hash_pdf_object(digest, page.get('/Resources'), seen)
+            # Rotation changes the order extract_text() emits text in
+            digest.update(repr(page.get('/Rotate')).encode())
+        except Exception:
+            return None
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Unreadable PDF page cache entry {path}: {e}")
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.debug(f"Failed to cache PDF page text {path}: {e}")
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.txt"
+
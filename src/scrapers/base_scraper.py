@@ -1,35 +1,57 @@
 """
 Base scraper class for government bid opportunities.
 """
+import sys
 import time
 import random
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from loguru import logger
 import requests
 from fake_useragent import UserAgent
 
-@dataclass
+# Slotted dataclasses need Python 3.10+; older interpreters keep a regular __dict__
+SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Shared immutable default for empty sequence fields
+EMPTY: Sequence[str] = ()
+
+def intern_strings(values: Optional[Sequence[str]]) -> Sequence[str]:
+    """Return an interned tuple of strings, or the shared empty tuple.
+    A single string is treated as a one-element sequence, not as its characters.
+    """
+    if not values:
+        return EMPTY
+    if isinstance(values, str):
+        return (sys.intern(values),)
+    return tuple(sys.intern(v) if isinstance(v, str) else v for v in values)
+
+@dataclass(**SLOTS)
 class BidOpportunity:
-    """Data class representing a bid opportunity."""
+    """Data class representing a bid opportunity.
+    Categorical strings (agency, source, NAICS codes, keywords) are interned so a large
+    pool shares one copy of each distinct value.
+    """
     title: str
     description: str
     agency: str
     opportunity_id: str
     due_date: datetime
     estimated_value: Optional[float] = None
-    naics_codes: List[str] = None
-    keywords: List[str] = None
+    naics_codes: Sequence[str] = None
+    keywords: Sequence[str] = None
     url: str = ""
     source: str = ""
     
     def __post_init__(self):
-        if self.naics_codes is None:
-            self.naics_codes = []
-        if self.keywords is None:
-            self.keywords = []
+        if isinstance(self.agency, str):
+            self.agency = sys.intern(self.agency)
+        if isinstance(self.source, str):
+            self.source = sys.intern(self.source)
+        self.naics_codes = intern_strings(self.naics_codes)
+        self.keywords = intern_strings(self.keywords)
 
 class BaseScraper(ABC):
     """Base class for all bid scrapers."""
@@ -95,8 +117,8 @@ class BaseScraper(ABC):
             
             # Consider opportunity relevant if it matches at least one keyword
             if keyword_matches > 0:
-                opp.keywords = [kw for kw in target_keywords 
-                              if kw.lower() in text_to_search]
+                opp.keywords = intern_strings([kw for kw in target_keywords 
+                                               if kw.lower() in text_to_search])
                 relevant_opportunities.append(opp)
                 
         logger.info(f"Filtered {len(opportunities)} opportunities to {len(relevant_opportunities)} relevant ones")
@@ -0,0 +1,11 @@
+"""
+Storage package for exported and indexed opportunity data.
+"""
+from .columnar_export import ColumnarExporter, ColumnarLoader
+from .opportunity_pool import OpportunityPool, deadline_key, is_expired
+from .facets import FacetCounter
+from .profile_snapshot import ProfileSnapshotStore
+from .match_cache import MatchCache, opportunity_digest
+
+__all__ = ["ColumnarExporter", "ColumnarLoader", "OpportunityPool", "deadline_key", "is_expired", "FacetCounter",
+           "ProfileSnapshotStore", "MatchCache", "opportunity_digest"]
@@ -0,0 +1,231 @@
+"""
+Columnar (Parquet) export of opportunities, match results and submission outcomes.
+"""
+import os
+from typing import List, Dict, Any, Optional, Iterable
+from urllib.parse import quote
+from datetime import datetime, date
+from pathlib import Path
+from uuid import uuid4
+from loguru import logger
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from scrapers import BidOpportunity
+from ai import MatchResult
+
+MATCHES_DATASET = "matches"
+OUTCOMES_DATASET = "outcomes"
+PARTITIONING = ds.partitioning(pa.schema([("source", pa.string()), ("date", pa.string())]), flavor="hive")
+COMPACT_MIN_FILES = 16  # a partition with more files than this is rewritten as one
+
+MATCH_SCHEMA = pa.schema([
+    ("opportunity_id", pa.string()),
+    ("title", pa.string()),
+    ("agency", pa.dictionary(pa.int32(), pa.string())),
+    ("url", pa.string()),
+    ("due_date", pa.timestamp("us")),
+    ("estimated_value", pa.float64()),
+    ("naics_codes", pa.list_(pa.string())),
+    ("match_score", pa.float64()),
+    ("confidence", pa.dictionary(pa.int8(), pa.string())),
+    ("should_apply", pa.bool_()),
+    ("matching_keywords", pa.list_(pa.string())),
+    ("keyword_hits", pa.int32()),
+    ("outcome", pa.string()),
+    ("exported_at", pa.timestamp("us")),
+    ("source", pa.string()),
+    ("date", pa.string()),
+])
+
+OUTCOME_SCHEMA = pa.schema([
+    ("opportunity_id", pa.string()),
+    ("method", pa.string()),
+    ("status", pa.string()),
+    ("timestamp", pa.timestamp("us")),
+    ("source", pa.string()),
+    ("date", pa.string()),
+])
+
+
+def _naive(value: Any) -> Optional[datetime]:
+    """Drop tz info so mixed naive/aware scraper dates fit one timestamp column."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return _naive(value)
+    try:
+        return _naive(datetime.fromisoformat(value))
+    except Exception:
+        return None
+
+
+class ColumnarExporter:
+    """Appends opportunities, match results and outcomes to hive-partitioned Parquet datasets.
+
+    Layout: <root>/<dataset>/source=<source>/date=<YYYY-MM-DD>/part-<batch>-<n>.parquet
+    Every call writes new files under a unique batch name, so appends never rewrite existing
+    data. Once a partition written to holds more than compact_min_files files they are merged
+    into one (see compact), so scans keep reading a few large files. Writes block: call them
+    from a worker thread in async code.
+    """
+
+    def __init__(self, export_folder: str = "./exports/columnar", compact_min_files: int = COMPACT_MIN_FILES):
+        self.root = Path(export_folder)
+        self.compact_min_files = compact_min_files
+
+    def append_match_results(self, match_results: List[MatchResult],
+                             outcomes: Optional[Dict[str, str]] = None,
+                             exported_at: Optional[datetime] = None) -> int:
+        """Append one row per match result; return the number of rows written.
+        outcomes: latest submission status by opportunity id, stored in the outcome column.
+        """
+        outcomes = outcomes or {}
+        rows = [self._match_row(r.opportunity, r, outcomes, exported_at) for r in match_results]
+        return self._write(MATCHES_DATASET, MATCH_SCHEMA, rows)
+
+    def append_opportunities(self, opportunities: Iterable[BidOpportunity],
+                             exported_at: Optional[datetime] = None) -> int:
+        """Append unscored opportunities (match columns left null)."""
+        rows = [self._match_row(opp, None, {}, exported_at) for opp in opportunities]
+        return self._write(MATCHES_DATASET, MATCH_SCHEMA, rows)
+
+    def append_outcomes(self, entries: Iterable[Dict[str, Any]], source: str = "") -> int:
+        """Append submission log entries (see applicators.SubmissionLog) as outcome rows."""
+        rows = []
+        for entry in entries:
+            ts = _parse_timestamp(entry.get('timestamp')) or datetime.now()
+            rows.append({
+                'opportunity_id': str(entry.get('opportunity_id') or ''),
+                'method': entry.get('method') or 'portal',
+                'status': entry.get('status'),
+                'timestamp': ts,
+                'source': entry.get('source') or source or 'unknown',
+                'date': ts.date().isoformat(),
+            })
+        return self._write(OUTCOMES_DATASET, OUTCOME_SCHEMA, rows)
+
+    def _match_row(self, opp: BidOpportunity, result: Optional[MatchResult],
+                   outcomes: Dict[str, str], exported_at: Optional[datetime]) -> Dict[str, Any]:
+        exported_at = exported_at or datetime.now()
+        keywords = list(result.matching_keywords) if result is not None else []
+        return {
+            'opportunity_id': opp.opportunity_id,
+            'title': opp.title,
+            'agency': opp.agency,
+            'url': opp.url,
+            'due_date': _naive(opp.due_date),
+            'estimated_value': opp.estimated_value,
+            'naics_codes': list(opp.naics_codes),
+            'match_score': result.match_score if result is not None else None,
+            'confidence': result.confidence if result is not None else None,
+            'should_apply': result.should_apply if result is not None else None,
+            'matching_keywords': keywords,
+            'keyword_hits': len(keywords),
+            'outcome': outcomes.get(opp.opportunity_id),
+            'exported_at': exported_at,
+            'source': opp.source or 'unknown',
+            'date': exported_at.date().isoformat(),
+        }
+
+    def _write(self, dataset: str, schema: pa.Schema, rows: List[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+        table = pa.Table.from_pylist(rows, schema=schema)
+        ds.write_dataset(
+            table,
+            self.root / dataset,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"part-{datetime.now():%Y%m%d%H%M%S}-{uuid4().hex[:8]}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        logger.info(f"Exported {len(rows)} rows to {self.root / dataset}")
+        if self.compact_min_files > 0:
+            for source, day in {(row['source'], row['date']) for row in rows}:
+                self._compact_partition(dataset, schema, self._partition_path(dataset, source, day))
+        return len(rows)
+
+    def compact(self, dataset: str = MATCHES_DATASET, min_files: int = 2) -> int:
+        """Merge the files of every partition holding at least min_files into one file.
+        Returns the number of partitions rewritten.
+        """
+        path = self.root / dataset
+        if not path.exists():
+            return 0
+        schema = MATCH_SCHEMA if dataset == MATCHES_DATASET else OUTCOME_SCHEMA
+        return sum(self._compact_partition(dataset, schema, partition, min_files)
+                   for partition in sorted(path.glob("source=*/date=*")))
+
+    def _partition_path(self, dataset: str, source: str, day: str) -> Path:
+        # Same directory names write_dataset uses for hive partitioning
+        return self.root / dataset / f"source={quote(source, safe='')}" / f"date={quote(day, safe='')}"
+
+    def _compact_partition(self, dataset: str, schema: pa.Schema, partition: Path,
+                           min_files: Optional[int] = None) -> bool:
+        """Rewrite a partition's files as one. Files appended meanwhile are left alone;
+        readers may see rows twice for the moment between the rename and the deletes.
+        """
+        files = sorted(partition.glob("*.parquet"))
+        if len(files) < (min_files or self.compact_min_files + 1):
+            return False
+        # Partition columns live in the directory names, not in the files
+        file_schema = pa.schema([field for field in schema if field.name not in ('source', 'date')])
+        try:
+            table = ds.dataset([str(f) for f in files], schema=file_schema, format="parquet").to_table()
+            # Leading underscore: dataset discovery skips the file until it is renamed
+            tmp = partition / f"_compact-{uuid4().hex[:8]}.parquet"
+            pq.write_table(table, tmp)
+            os.replace(tmp, partition / f"part-{datetime.now():%Y%m%d%H%M%S}-{uuid4().hex[:8]}-compact.parquet")
+        except Exception as e:
+            logger.warning(f"Compacting {partition} failed: {e}")
+            return False
+        for f in files:
+            f.unlink(missing_ok=True)
+        logger.info(f"Compacted {len(files)} files in {partition.relative_to(self.root)} ({table.num_rows} rows)")
+        return True
+
+
+class ColumnarLoader:
+    """Reads exported datasets, touching only the requested columns and partitions."""
+
+    def __init__(self, export_folder: str = "./exports/columnar"):
+        self.root = Path(export_folder)
+
+    def load(self, dataset: str = MATCHES_DATASET, columns: Optional[List[str]] = None,
+             sources: Optional[List[str]] = None, since: Optional[date] = None,
+             until: Optional[date] = None) -> pa.Table:
+        """Scan a dataset into an Arrow table.
+
+        columns: subset of columns to read (None reads all).
+        sources/since/until: partition filters; non-matching files are never opened.
+        """
+        path = self.root / dataset
+        if not path.exists():
+            schema = MATCH_SCHEMA if dataset == MATCHES_DATASET else OUTCOME_SCHEMA
+            if columns:
+                schema = pa.schema([schema.field(c) for c in columns])
+            return schema.empty_table()
+
+        dataset_obj = ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+        expr = None
+        if sources:
+            expr = ds.field("source").isin(list(sources))
+        if since is not None:
+            cond = ds.field("date") >= since.isoformat()
+            expr = cond if expr is None else expr & cond
+        if until is not None:
+            cond = ds.field("date") <= until.isoformat()
+            expr = cond if expr is None else expr & cond
+        return dataset_obj.to_table(columns=columns, filter=expr)
+
+    def load_frame(self, dataset: str = MATCHES_DATASET, columns: Optional[List[str]] = None, **filters):
+        """Same as load() but returns a pandas DataFrame."""
+        return self.load(dataset, columns=columns, **filters).to_pandas()
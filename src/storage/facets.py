@@ -0,0 +1,76 @@
+"""
+Incrementally maintained facet counts over the opportunity pool.
+"""
+import time
+import threading
+from collections import Counter
+from typing import Dict, Any, Callable, Optional, Tuple, List
+
+from scrapers import BidOpportunity
+from .opportunity_pool import OpportunityPool, SECONDS_PER_DAY
+
+FACETS = ("source", "type", "agency", "location", "remote")
+
+# (label, start offset in days, end offset in days) relative to now
+DUE_DATE_BUCKETS: List[Tuple[str, float, float]] = [
+    ("overdue", float("-inf"), 0),
+    ("0-7 days", 0, 7),
+    ("8-30 days", 7, 30),
+    ("31-90 days", 30, 90),
+    ("90+ days", 90, float("inf")),
+]
+
+
+class FacetCounter:
+    """Per-facet counts kept in sync with an OpportunityPool through its listener hooks.
+
+    classify(opp) returns the facet values for one opportunity as a dict with the keys
+    in FACETS. Values are remembered per opportunity so removals decrement exactly what
+    was counted. Due-date buckets are not stored (they shift with time); they are
+    answered from the pool's sorted deadline index with a few bisections instead.
+    """
+
+    def __init__(self, pool: OpportunityPool, classify: Callable[[BidOpportunity], Dict[str, Any]]):
+        self.pool = pool
+        self.classify = classify
+        self._counts: Dict[str, Counter] = {name: Counter() for name in FACETS}
+        self._values: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+        pool.add_listener(self)
+
+    def on_add(self, opportunity: BidOpportunity) -> None:
+        facets = dict(self.classify(opportunity))
+        facets['remote'] = 'true' if facets.get('remote') else 'false'
+        values = tuple(str(facets.get(name) or 'Unknown') for name in FACETS)
+        with self._lock:
+            self._values[opportunity.opportunity_id] = values
+            for name, value in zip(FACETS, values):
+                self._counts[name][value] += 1
+
+    def on_remove(self, opportunity: BidOpportunity) -> None:
+        with self._lock:
+            values = self._values.pop(opportunity.opportunity_id, None)
+            if values is None:
+                return
+            for name, value in zip(FACETS, values):
+                counter = self._counts[name]
+                counter[value] -= 1
+                if counter[value] <= 0:
+                    del counter[value]
+
+    def snapshot(self, now: Optional[float] = None, top: Optional[int] = None) -> Dict[str, Any]:
+        """Return {'total': n, 'facets': {facet: {value: count}}} including due-date buckets.
+
+        top: limit each facet to its N most common values.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            facets = {name: dict(counter.most_common(top)) for name, counter in self._counts.items()}
+            total = len(self._values)
+        buckets: Dict[str, int] = {}
+        for label, start_days, end_days in DUE_DATE_BUCKETS:
+            buckets[label] = self.pool.count_between(now + start_days * SECONDS_PER_DAY,
+                                                     now + end_days * SECONDS_PER_DAY)
+        buckets["no due date"] = total - sum(buckets.values())
+        facets["due_date"] = buckets
+        return {'total': total, 'facets': facets}
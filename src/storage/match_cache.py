@@ -0,0 +1,130 @@
+"""
+Persistent cache of AI match analyses, keyed by opportunity content and profile version.
+"""
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from pathlib import Path
+from loguru import logger
+
+from scrapers import BidOpportunity
+
+
+def opportunity_digest(opportunity: BidOpportunity) -> str:
+    """SHA-256 of the opportunity fields that feed matching (not the ID or URL)."""
+    due = opportunity.due_date.isoformat() if opportunity.due_date else ''
+    parts = [opportunity.title or '', opportunity.description or '', opportunity.agency or '', due,
+             '\x1f'.join(opportunity.naics_codes or ()), '\x1f'.join(opportunity.keywords or ())]
+    return hashlib.sha256('\x1e'.join(parts).encode('utf-8', 'ignore')).hexdigest()
+
+
+class MatchCache:
+    """SQLite store of AI analyses for (opportunity digest, profile version, matcher config).
+
+    The matcher looks analyses up before calling the LLM and stores new ones after,
+    so re-matching an unchanged pool against an unchanged profile makes no AI calls.
+    Editing an opportunity, rebuilding the profile or changing the analysis prompt or
+    model changes the key, so stale analyses are never returned. The least recently
+    used entries beyond max_entries are pruned.
+    """
+
+    def __init__(self, db_file: str, max_entries: int = 50000):
+        self.db_file = Path(db_file)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " key TEXT PRIMARY KEY, opportunity_id TEXT, analysis TEXT NOT NULL,"
+            " created_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS analyses_used_at ON analyses (used_at)")
+        self._db.commit()
+        self.prune()
+
+    @staticmethod
+    def key(opportunity: BidOpportunity, profile_version: str, config: str) -> str:
+        return hashlib.sha256(f"{opportunity_digest(opportunity)}:{profile_version}:{config}".encode()).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored analyses for the keys that have one; counts hits and misses."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Dict[str, Any]] = {}
+        if not keys:
+            return found
+        with self._lock:
+            try:
+                for start in range(0, len(keys), 500):
+                    batch = keys[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, analysis FROM analyses WHERE key IN ({','.join('?' * len(batch))})", batch
+                    ).fetchall()
+                    for key, analysis in rows:
+                        found[key] = json.loads(analysis)
+                if found:
+                    now = time.time()
+                    self._db.executemany("UPDATE analyses SET used_at = ? WHERE key = ?",
+                                         [(now, key) for key in found])
+                    self._db.commit()
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"Match cache lookup failed: {e}")
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Store (key, opportunity_id, analysis) entries."""
+        now = time.time()
+        rows = [(key, opportunity_id, json.dumps(analysis, default=list), now, now)
+                for key, opportunity_id, analysis in entries]
+        if not rows:
+            return
+        with self._lock:
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?)", rows)
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Match cache write failed: {e}")
+
+    def prune(self) -> int:
+        """Drop the least recently used entries beyond max_entries; return how many."""
+        if self.max_entries <= 0:
+            return 0
+        with self._lock:
+            try:
+                removed = self._db.execute(
+                    "DELETE FROM analyses WHERE key IN (SELECT key FROM analyses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                ).rowcount
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Match cache prune failed: {e}")
+                return 0
+        if removed:
+            logger.info(f"Pruned {removed} old match analyses")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            try:
+                entries = self._db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            except sqlite3.Error:
+                entries = None
+            return {
+                'entries': entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,207 @@
+"""
+In-memory opportunity pool with a due-date index.
+"""
+import json
+import math
+import time
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+from datetime import datetime
+from pathlib import Path
+from loguru import logger
+
+from scrapers import BidOpportunity
+
+SECONDS_PER_DAY = 86400.0
+
+
+def deadline_key(opportunity: BidOpportunity) -> float:
+    """Epoch seconds of the opportunity's due date; +inf when unknown so it sorts last and never expires."""
+    due = getattr(opportunity, 'due_date', None)
+    if not isinstance(due, datetime):
+        return math.inf
+    try:
+        return due.timestamp()
+    except (OverflowError, OSError, ValueError):
+        return math.inf
+
+
+def is_expired(opportunity: BidOpportunity, now: Optional[float] = None, grace_secs: float = 0.0) -> bool:
+    """True when the due date (plus grace) has already passed."""
+    now = time.time() if now is None else now
+    return deadline_key(opportunity) + grace_secs < now
+
+
+class OpportunityPool:
+    """Opportunities keyed by ID with a sorted (deadline, ID) index.
+
+    Supports "closing within N days" range queries, deadline-ordered iteration and
+    eviction of expired notices (optionally archived as newline-delimited JSON).
+    Notices without a due date never expire, so evict_expired() also drops entries not
+    seen (added) for max_age_secs and, past max_size entries, the least recently seen.
+    Listeners (objects with on_add(opp) / on_remove(opp)) are notified of every change,
+    which lets aggregates such as FacetCounter stay in sync incrementally.
+    """
+
+    def __init__(self, archive_path: Optional[str] = None, grace_secs: float = 0.0,
+                 max_size: int = 0, max_age_secs: float = 0.0):
+        self.archive_path = Path(archive_path) if archive_path else None
+        self.grace_secs = grace_secs
+        self.max_size = max_size  # 0 = unlimited
+        self.max_age_secs = max_age_secs  # 0 = unlimited
+        self._by_id: Dict[str, BidOpportunity] = {}
+        self._deadlines: List[Tuple[float, str]] = []
+        # Last time each opportunity was added, least recently seen first
+        self._seen: 'OrderedDict[str, float]' = OrderedDict()
+        self._listeners: List[Any] = []
+        self._lock = threading.RLock()
+
+    def add_listener(self, listener: Any) -> None:
+        """Register a listener and replay the current contents to it."""
+        with self._lock:
+            self._listeners.append(listener)
+            for opp in self._by_id.values():
+                listener.on_add(opp)
+
+    def add(self, opportunity: BidOpportunity) -> None:
+        """Insert or replace an opportunity."""
+        with self._lock:
+            opp_id = opportunity.opportunity_id
+            previous = self._by_id.get(opp_id)
+            if previous is not None:
+                self._unindex(opp_id)
+                self._notify('on_remove', previous)
+            self._by_id[opp_id] = opportunity
+            insort(self._deadlines, (deadline_key(opportunity), opp_id))
+            self._seen[opp_id] = time.time()
+            self._seen.move_to_end(opp_id)
+            self._notify('on_add', opportunity)
+
+    def add_many(self, opportunities: Iterable[BidOpportunity]) -> None:
+        with self._lock:
+            for opp in opportunities:
+                self.add(opp)
+
+    def replace_all(self, opportunities: Iterable[BidOpportunity]) -> None:
+        """Make the pool hold exactly these opportunities. Entries that are already present
+        (the same object) are left alone, so listeners only see what changed."""
+        with self._lock:
+            wanted = {opp.opportunity_id: opp for opp in opportunities}
+            for opp_id in [opp_id for opp_id in self._by_id if opp_id not in wanted]:
+                self.remove(opp_id)
+            for opp_id, opp in wanted.items():
+                if self._by_id.get(opp_id) is not opp:
+                    self.add(opp)
+
+    def remove(self, opportunity_id: str) -> Optional[BidOpportunity]:
+        with self._lock:
+            if opportunity_id not in self._by_id:
+                return None
+            self._unindex(opportunity_id)
+            self._seen.pop(opportunity_id, None)
+            removed = self._by_id.pop(opportunity_id)
+            self._notify('on_remove', removed)
+            return removed
+
+    def get(self, opportunity_id: str) -> Optional[BidOpportunity]:
+        return self._by_id.get(opportunity_id)
+
+    def __contains__(self, opportunity_id: str) -> bool:
+        return opportunity_id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def closing_within(self, days: float, now: Optional[float] = None) -> List[BidOpportunity]:
+        """Open opportunities due between now and now + days, soonest first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            lo = bisect_left(self._deadlines, (now - self.grace_secs,))
+            hi = bisect_right(self._deadlines, (now + days * SECONDS_PER_DAY, chr(0x10FFFF)))
+            return [self._by_id[opp_id] for _, opp_id in self._deadlines[lo:hi]]
+
+    def count_between(self, start: float, end: float) -> int:
+        """Number of opportunities with start <= deadline < end (epoch seconds)."""
+        with self._lock:
+            return bisect_left(self._deadlines, (end,)) - bisect_left(self._deadlines, (start,))
+
+    def iter_by_deadline(self, include_expired: bool = False, now: Optional[float] = None) -> Iterator[BidOpportunity]:
+        """Iterate opportunities soonest-deadline first (undated ones last)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            start = 0 if include_expired else bisect_left(self._deadlines, (now - self.grace_secs,))
+            snapshot = [opp_id for _, opp_id in self._deadlines[start:]]
+        for opp_id in snapshot:
+            opp = self._by_id.get(opp_id)
+            if opp is not None:
+                yield opp
+
+    def evict_expired(self, now: Optional[float] = None) -> List[BidOpportunity]:
+        """Remove (and archive) every opportunity whose deadline has passed, then apply the
+        age and size caps; return the expired ones."""
+        now = time.time() if now is None else now
+        with self._lock:
+            cut = bisect_left(self._deadlines, (now - self.grace_secs,))
+            expired_ids = [opp_id for _, opp_id in self._deadlines[:cut]]
+            del self._deadlines[:cut]
+            expired = []
+            for opp_id in expired_ids:
+                self._seen.pop(opp_id, None)
+                expired.append(self._by_id.pop(opp_id))
+            for opp in expired:
+                self._notify('on_remove', opp)
+            stale = self._evict_stale(now)
+        if expired:
+            self._archive(expired)
+            logger.info(f"Evicted {len(expired)} expired opportunities ({len(self._by_id)} remain)")
+        if stale:
+            logger.info(f"Dropped {stale} opportunities past the pool's age or size limit ({len(self._by_id)} remain)")
+        return expired
+
+    def _evict_stale(self, now: float) -> int:
+        """Drop the least recently seen entries older than max_age_secs or beyond max_size."""
+        dropped = 0
+        while self._seen:
+            opp_id, seen_at = next(iter(self._seen.items()))
+            too_old = self.max_age_secs > 0 and now - seen_at > self.max_age_secs
+            too_many = self.max_size > 0 and len(self._by_id) > self.max_size
+            if not (too_old or too_many):
+                break
+            self.remove(opp_id)
+            dropped += 1
+        return dropped
+
+    def _notify(self, event: str, opportunity: BidOpportunity) -> None:
+        for listener in self._listeners:
+            try:
+                getattr(listener, event)(opportunity)
+            except Exception as e:
+                logger.warning(f"Opportunity pool listener {event} failed: {e}")
+
+    def _unindex(self, opportunity_id: str) -> None:
+        key = (deadline_key(self._by_id[opportunity_id]), opportunity_id)
+        pos = bisect_left(self._deadlines, key)
+        if pos < len(self._deadlines) and self._deadlines[pos] == key:
+            del self._deadlines[pos]
+
+    def _archive(self, expired: List[BidOpportunity]) -> None:
+        if not self.archive_path or not expired:
+            return
+        try:
+            self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+            archived_at = datetime.now().isoformat()
+            with open(self.archive_path, 'a', encoding='utf-8') as f:
+                for opp in expired:
+                    f.write(json.dumps({
+                        'opportunity_id': opp.opportunity_id,
+                        'title': opp.title,
+                        'agency': opp.agency,
+                        'due_date': opp.due_date.isoformat() if opp.due_date else None,
+                        'url': opp.url,
+                        'source': opp.source,
+                        'archived_at': archived_at,
+                    }) + "\n")
+        except Exception as e:
+            logger.warning(f"Failed to archive expired opportunities: {e}")
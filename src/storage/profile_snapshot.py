@@ -0,0 +1,61 @@
+"""
+Versioned on-disk snapshot of the company profile and fitted matcher state.
+"""
+import os
+import pickle
+import time
+from typing import Dict, Any, List, Optional
+from pathlib import Path
+from loguru import logger
+
+SNAPSHOT_VERSION = 1
+
+
+class ProfileSnapshotStore:
+    """Saves and loads {profile, processed documents, matcher state} as one pickle.
+
+    Each snapshot records the document-set fingerprint it was built from
+    (DocumentProcessor.document_fingerprint()), so callers can serve it immediately
+    and rebuild in the background only when the documents have changed. The file is
+    written by this application only; it is never loaded from untrusted input.
+    """
+
+    def __init__(self, snapshot_file: str):
+        self.snapshot_file = Path(snapshot_file)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return the stored snapshot, or None if missing, unreadable or from another version."""
+        if not self.snapshot_file.exists():
+            return None
+        try:
+            start = time.perf_counter()
+            with open(self.snapshot_file, 'rb') as f:
+                snapshot = pickle.load(f)
+            if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+                logger.info("Profile snapshot version changed; ignoring it")
+                return None
+            logger.info(f"Loaded profile snapshot in {(time.perf_counter() - start) * 1000:.1f} ms")
+            return snapshot
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable profile snapshot {self.snapshot_file}: {e}")
+            return None
+
+    def save(self, fingerprint: str, company_profile: Dict[str, Any], processed_docs: List[Any],
+             matcher_state: Optional[Dict[str, Any]]) -> None:
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'fingerprint': fingerprint,
+            'created_at': time.time(),
+            'company_profile': company_profile,
+            'processed_docs': processed_docs,
+            'matcher_state': matcher_state,
+        }
+        try:
+            self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.snapshot_file.with_name(self.snapshot_file.name + '.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.snapshot_file)
+            logger.info(f"Saved profile snapshot ({len(processed_docs)} documents)")
+        except Exception as e:
+            logger.warning(f"Failed to save profile snapshot {self.snapshot_file}: {e}")
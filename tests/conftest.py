@@ -0,0 +1,7 @@
+"""
+Shared test setup: modules are imported from src/ the same way main.py imports them.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
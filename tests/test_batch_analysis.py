@@ -0,0 +1,62 @@
+"""
+Batched AI analysis: JSON response parsing and how omitted or failed batches are retried.
+"""
+import json
+
+from ai import LLMClient, MockLLMBackend, OpportunityMatcher
+from ai.llm_client import mock_response
+from test_opportunity_matcher import matcher, opportunity
+
+ENTRY = {'missing_requirements': ['ISO 27001'], 'recommendations': 'Partner locally, Add CVs',
+         'required_documents': [], 'required_attachments': None, 'assessment': 'high'}
+
+
+def test_parses_wrapped_bare_and_keyed_responses():
+    expected = {0: {'missing_requirements': ['ISO 27001'], 'recommendations': ['Partner locally', 'Add CVs'],
+                    'required_documents': [], 'required_attachments': [], 'assessment': 'High'}}
+    wrapped = "```json\n" + json.dumps({'results': [dict(ENTRY, id=1)]}) + "\n```"
+    assert OpportunityMatcher._parse_batch_analysis(wrapped, 2) == expected
+    assert OpportunityMatcher._parse_batch_analysis(json.dumps([dict(ENTRY, id="1")]), 2) == expected
+    assert OpportunityMatcher._parse_batch_analysis(json.dumps({"[1]": ENTRY}), 2) == expected
+
+
+def test_recovers_complete_entries_from_a_cut_off_response():
+    text = json.dumps({'results': [dict(ENTRY, id=1), dict(ENTRY, id=2)]})[:-40]
+    analyses = OpportunityMatcher._parse_batch_analysis(text, 2)
+    assert list(analyses) == [0]
+
+
+def test_ignores_out_of_range_and_repeated_ids():
+    text = json.dumps({'results': [dict(ENTRY, id=3), dict(ENTRY, id=1), dict(ENTRY, id=1, assessment='Low')]})
+    analyses = OpportunityMatcher._parse_batch_analysis(text, 2)
+    assert list(analyses) == [0] and analyses[0]['assessment'] == 'High'
+
+
+def omit_last(messages, max_tokens):
+    """Batch responses drop their last entry; single prompts are answered normally."""
+    text = mock_response(messages, max_tokens)
+    if text.startswith('{'):
+        data = json.loads(text)
+        data['results'] = data['results'][:-1]
+        text = json.dumps(data)
+    return text
+
+
+def test_omitted_entries_are_retried_in_smaller_requests():
+    backend = MockLLMBackend(responder=omit_last)
+    m = matcher(llm_client=LLMClient(backend), batch_size=4, max_concurrency=1)
+    m.match_opportunities([opportunity(f"OPP-{i}") for i in range(4)])
+    assert m.last_match_stats['ai_analyses'] == 4
+    # [4 -> 3 answered], then the one left out on its own
+    assert backend.calls == 2
+
+
+def test_a_failing_batch_is_retried_once_not_split():
+    def broken(messages, max_tokens):
+        raise ValueError("bad request")
+
+    backend = MockLLMBackend(responder=broken)
+    m = matcher(llm_client=LLMClient(backend), batch_size=4, max_concurrency=1)
+    m.match_opportunities([opportunity(f"OPP-{i}") for i in range(4)])
+    assert backend.calls == 2
+    assert m.last_match_stats['ai_analyses'] == 0
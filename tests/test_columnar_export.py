@@ -0,0 +1,58 @@
+"""
+ColumnarExporter: partitioned appends, outcome column and partition compaction.
+"""
+from datetime import datetime
+
+from scrapers import BidOpportunity
+from ai import MatchResult
+from storage.columnar_export import ColumnarExporter, ColumnarLoader, MATCHES_DATASET, OUTCOMES_DATASET
+
+EXPORTED_AT = datetime(2026, 3, 1, 12, 0)
+
+
+def result(i, source="Sample Portal"):
+    opportunity = BidOpportunity(title=f"t{i}", description="d", agency="Agency", opportunity_id=f"o{i}",
+                                 due_date=datetime(2026, 4, 1), source=source)
+    return MatchResult(opportunity, 0.5, "Medium", ["network"], [], [], should_apply=True)
+
+
+def partition_files(root, dataset, source):
+    return list((root / dataset).glob(f"source={source}/date=*/*.parquet"))
+
+
+def test_outcome_column_is_filled_from_outcomes(tmp_path):
+    exporter = ColumnarExporter(str(tmp_path))
+    exporter.append_match_results([result(1), result(2)], {'o1': 'submitted'}, exported_at=EXPORTED_AT)
+    table = ColumnarLoader(str(tmp_path)).load(columns=['opportunity_id', 'outcome'])
+    assert dict(zip(*table.to_pydict().values())) == {'o1': 'submitted', 'o2': None}
+
+
+def test_partition_is_compacted_past_the_file_limit(tmp_path):
+    exporter = ColumnarExporter(str(tmp_path), compact_min_files=3)
+    for i in range(4):
+        exporter.append_match_results([result(i)], exported_at=EXPORTED_AT)
+    assert len(partition_files(tmp_path, MATCHES_DATASET, "Sample%20Portal")) == 1
+    table = ColumnarLoader(str(tmp_path)).load(columns=['opportunity_id', 'agency', 'source'])
+    assert sorted(table.column('opportunity_id').to_pylist()) == ['o0', 'o1', 'o2', 'o3']
+    assert set(table.column('source').to_pylist()) == {"Sample Portal"}
+
+
+def test_other_partitions_are_left_alone(tmp_path):
+    exporter = ColumnarExporter(str(tmp_path), compact_min_files=2)
+    exporter.append_match_results([result(0, "Other")], exported_at=EXPORTED_AT)
+    for i in range(3):
+        exporter.append_match_results([result(i)], exported_at=EXPORTED_AT)
+    assert len(partition_files(tmp_path, MATCHES_DATASET, "Other")) == 1
+    assert len(partition_files(tmp_path, MATCHES_DATASET, "Sample%20Portal")) == 1
+    assert ColumnarLoader(str(tmp_path)).load(columns=['opportunity_id']).num_rows == 4
+
+
+def test_manual_compaction(tmp_path):
+    exporter = ColumnarExporter(str(tmp_path), compact_min_files=0)
+    for i in range(3):
+        exporter.append_outcomes([{'opportunity_id': f"o{i}", 'status': 'submitted',
+                                   'timestamp': '2026-03-01T10:00:00', 'source': 'Portal'}])
+    assert len(partition_files(tmp_path, OUTCOMES_DATASET, "Portal")) == 3
+    assert exporter.compact(OUTCOMES_DATASET) == 1
+    assert len(partition_files(tmp_path, OUTCOMES_DATASET, "Portal")) == 1
+    assert ColumnarLoader(str(tmp_path)).load(OUTCOMES_DATASET).num_rows == 3
@@ -0,0 +1,32 @@
+"""
+CorpusTfidfModel: recorded corpus text survives a restart between refits.
+"""
+from ai import CorpusTfidfModel
+
+
+def test_recorded_texts_are_saved_only_when_changed(tmp_path):
+    model_file = str(tmp_path / "tfidf.pkl")
+    model = CorpusTfidfModel(model_file, min_documents=50)
+    assert model.save_if_changed() is False
+
+    assert model.add_texts(["road works tender", "school furniture supply"]) == 2
+    model.set_company_texts(["We build roads."])
+    assert model.save_if_changed() is True
+    assert model.save_if_changed() is False
+
+    model.add_texts(["road works tender"])  # already recorded
+    model.set_company_texts(["We build roads."])  # unchanged
+    assert model.save_if_changed() is False
+
+    reloaded = CorpusTfidfModel(model_file, min_documents=50)
+    assert reloaded.stats()['opportunity_documents'] == 2
+    assert reloaded.stats()['company_documents'] == 1
+    assert reloaded.vectorizer is None
+
+
+def test_refit_saves_and_clears_pending_changes(tmp_path):
+    model = CorpusTfidfModel(str(tmp_path / "tfidf.pkl"), min_documents=3)
+    model.add_texts(["road works tender", "school furniture supply", "hospital equipment lot"])
+    assert model.refit()
+    assert model.save_if_changed() is False
+    assert CorpusTfidfModel(str(tmp_path / "tfidf.pkl")).version == model.version
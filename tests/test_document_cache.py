@@ -0,0 +1,71 @@
+"""
+DocumentCache: fingerprint hits, content-hash fallback and invalidation.
+"""
+import os
+
+from processors import DocumentCache, ProcessedDocument
+
+
+def doc(name="a.txt", content="Experience\nRoads."):
+    return ProcessedDocument(name, ".txt", content, {}, [], {})
+
+
+def cached(tmp_path, signature="max_pages=0"):
+    return DocumentCache(str(tmp_path / "cache.json"), ProcessedDocument, signature)
+
+
+def test_hit_survives_a_reload_and_a_touch(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("Experience\nRoads.")
+    cache = cached(tmp_path)
+    assert cache.lookup("a.txt", path) == (False, None)
+    cache.put("a.txt", path, doc())
+    cache.save()
+
+    reloaded = cached(tmp_path)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))  # same bytes, new mtime
+    hit, document = reloaded.lookup("a.txt", path)
+    assert hit and document == doc()
+
+
+def test_changed_content_misses(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("Experience\nRoads.")
+    cache = cached(tmp_path)
+    cache.put("a.txt", path, doc())
+    path.write_text("Experience\nBridges and roads.")
+    assert cache.lookup("a.txt", path) == (False, None)
+
+
+def test_failed_extraction_is_a_hit_without_a_document(tmp_path):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"not a pdf")
+    cache = cached(tmp_path)
+    cache.put("broken.pdf", path, None)
+    assert cache.lookup("broken.pdf", path) == (True, None)
+
+
+def test_hash_only_entries_never_hit_but_give_their_hash(tmp_path):
+    path = tmp_path / "copy.txt"
+    path.write_text("Experience\nRoads.")
+    cache = cached(tmp_path)
+    cache.put_hash("copy.txt", path.stat(), "abc")
+    assert cache.lookup("copy.txt", path) == (False, None)
+    assert cache.known_sha256("copy.txt", path.stat()) == "abc"
+    path.write_text("Experience\nRoads, longer.")
+    assert cache.known_sha256("copy.txt", path.stat()) is None
+
+
+def test_other_signature_or_pruned_entries_start_fresh(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("Experience\nRoads.")
+    cache = cached(tmp_path)
+    cache.put("a.txt", path, doc())
+    cache.put("gone.txt", path, doc("gone.txt"))
+    assert cache.prune(["a.txt"]) == 1
+    cache.save()
+
+    assert cached(tmp_path).lookup("a.txt", path)[0]
+    assert cached(tmp_path).lookup("gone.txt", path) == (False, None)
+    assert cached(tmp_path, signature="max_pages=10").lookup("a.txt", path) == (False, None)
@@ -0,0 +1,123 @@
+"""
+DocumentStore and duplicate handling: streamed uploads, nested folders and hash reuse.
+"""
+import asyncio
+import hashlib
+
+import processors.document_processor as document_processor
+import processors.document_store as document_store
+from processors import DocumentProcessor, DocumentStore
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def upload(store, data, name):
+    return asyncio.run(store.add_stream(chunks(data[:3], data[3:]), name))
+
+
+def counting_sha256(monkeypatch, module):
+    calls = []
+    original = module.file_sha256
+
+    def counted(path):
+        calls.append(path.name)
+        return original(path)
+
+    monkeypatch.setattr(module, 'file_sha256', counted)
+    return calls
+
+
+def test_upload_is_hashed_while_streamed_and_stored_once(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    first = upload(store, b"company profile", "profile.txt")
+    again = upload(store, b"company profile", "profile copy.txt")
+
+    assert first == {'sha256': hashlib.sha256(b"company profile").hexdigest(), 'stored_as': 'profile.txt',
+                     'size': 15, 'duplicate': False}
+    assert again['duplicate'] and again['stored_as'] == 'profile.txt'
+    assert [p.name for p in tmp_path.iterdir() if not p.name.startswith('.')] == ['profile.txt']
+    assert store.documents()[0]['names'] == ['profile.txt', 'profile copy.txt']
+
+
+def test_oversized_upload_leaves_nothing_behind(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    try:
+        asyncio.run(store.add_stream(chunks(b"x" * 10), "big.txt", max_bytes=5))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("upload over the limit was accepted")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_reconcile_walks_subfolders_and_reuses_recorded_hashes(tmp_path, monkeypatch):
+    (tmp_path / "projects").mkdir()
+    (tmp_path / "projects" / "bridge.txt").write_text("bridge")
+    (tmp_path / "bridge copy.txt").write_text("bridge")
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / ".hidden" / "skip.txt").write_text("skip")
+    store = DocumentStore(str(tmp_path))
+
+    assert store.reconcile() == 1
+    assert [d['stored_as'] for d in store.documents()] == ['bridge copy.txt']
+
+    calls = counting_sha256(monkeypatch, document_store)
+    reopened = DocumentStore(str(tmp_path))
+    assert reopened.reconcile() == 1
+    assert calls == []
+
+    (tmp_path / "bridge copy.txt").unlink()
+    assert reopened.reconcile() == 0
+    assert [d['stored_as'] for d in reopened.documents()] == ['projects/bridge.txt']
+
+
+def test_duplicate_documents_are_not_rehashed_on_the_next_build(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("Experience\nRoad construction for the ministry.")
+    (docs / "b.txt").write_text("Experience\nRoad construction for the ministry.")
+    cache_file = str(tmp_path / "cache.json")
+
+    processed = DocumentProcessor(str(docs), cache_file=cache_file).process_all_documents()
+    assert [d.metadata.get('duplicate_names') for d in processed] == [['b.txt']]
+
+    calls = counting_sha256(monkeypatch, document_processor)
+    processed = DocumentProcessor(str(docs), cache_file=cache_file).process_all_documents()
+    assert [d.filename for d in processed] == ['a.txt']
+    assert calls == []
+
+    # Once the original is gone, the former duplicate is extracted in its place
+    (docs / "a.txt").unlink()
+    processed = DocumentProcessor(str(docs), cache_file=cache_file).process_all_documents()
+    assert [d.filename for d in processed] == ['b.txt']
+
+
+def test_cached_document_stays_canonical_when_a_new_copy_sorts_first(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    content = "Experience\nRoad construction for the ministry."
+    (docs / "Keith-docs (3).txt").write_text(content)
+    cache_file = str(tmp_path / "cache.json")
+    DocumentProcessor(str(docs), cache_file=cache_file).process_all_documents()
+
+    (docs / "20250903_Keith-docs (3).txt").write_text(content)
+    extracted = []
+    original = DocumentProcessor._extract_many
+
+    def recording(self, paths):
+        extracted.extend(p.name for p in paths)
+        return original(self, paths)
+
+    monkeypatch.setattr(DocumentProcessor, '_extract_many', recording)
+    processed = DocumentProcessor(str(docs), cache_file=cache_file).process_all_documents()
+    assert extracted == []
+    assert [(d.filename, d.metadata.get('duplicate_names')) for d in processed] == \
+        [("Keith-docs (3).txt", ["20250903_Keith-docs (3).txt"])]
+
+    # Once the copy is deleted, the names from the earlier build are gone too
+    (docs / "20250903_Keith-docs (3).txt").unlink()
+    processed = DocumentProcessor(str(docs), cache_file=cache_file).process_all_documents()
+    assert [('duplicate_names' in d.metadata) for d in processed] == [False]
@@ -0,0 +1,20 @@
+"""
+ExtractionPool: workers are started without fork and return processed documents.
+"""
+from processors.extraction_pool import ExtractionPool
+
+
+def test_workers_do_not_fork_the_parent(tmp_path):
+    pool = ExtractionPool(str(tmp_path), workers=1)
+    assert pool._ctx.get_start_method() in ('forkserver', 'spawn')
+
+
+def test_processes_files_in_worker_processes(tmp_path):
+    for i in range(2):
+        (tmp_path / f"doc{i}.txt").write_text(f"Experience\nNetwork project {i}.\n")
+    pool = ExtractionPool(str(tmp_path), workers=2, timeout_secs=60)
+    results = {path.name: (doc, error) for path, doc, error in pool.imap_unordered(sorted(tmp_path.glob("*.txt")))}
+    assert set(results) == {"doc0.txt", "doc1.txt"}
+    for name, (doc, error) in results.items():
+        assert error is None
+        assert "Network project" in doc.content
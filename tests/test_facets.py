@@ -0,0 +1,53 @@
+"""
+FacetCounter kept in sync with an OpportunityPool, including replace_all listings.
+"""
+import time
+from datetime import datetime, timedelta
+
+from scrapers import BidOpportunity
+from storage import OpportunityPool, FacetCounter
+
+NOW = time.time()
+
+
+def opportunity(opp_id, source="Portal", days=3):
+    return BidOpportunity(title=opp_id, description="d", agency="Agency", opportunity_id=opp_id,
+                          due_date=datetime.fromtimestamp(NOW) + timedelta(days=days), source=source)
+
+
+def classify(opp):
+    return {'source': opp.source, 'type': 'job', 'agency': opp.agency, 'location': 'Uganda', 'remote': False}
+
+
+def test_counts_follow_adds_and_removes():
+    pool = OpportunityPool()
+    facets = FacetCounter(pool, classify)
+    pool.add_many([opportunity('a'), opportunity('b', "Other", days=40)])
+    pool.remove('a')
+    snapshot = facets.snapshot(now=NOW)
+    assert snapshot['total'] == 1
+    assert snapshot['facets']['source'] == {'Other': 1}
+    assert snapshot['facets']['due_date']['31-90 days'] == 1
+
+
+def test_replace_all_only_recounts_changed_entries():
+    pool = OpportunityPool()
+    seen = []
+    facets = FacetCounter(pool, lambda opp: seen.append(opp.opportunity_id) or classify(opp))
+    kept = opportunity('kept')
+    pool.replace_all([kept, opportunity('dropped')])
+    seen.clear()
+    pool.replace_all([kept, opportunity('new', "Other")])
+    assert seen == ['new']
+    assert facets.snapshot(now=NOW)['facets']['source'] == {'Portal': 1, 'Other': 1}
+    assert 'dropped' not in pool
+
+
+def test_counts_match_the_listing_after_replacement():
+    pool = OpportunityPool()
+    facets = FacetCounter(pool, classify)
+    listing = [opportunity(f"o{i}", "A" if i % 2 else "B") for i in range(5)]
+    pool.replace_all(listing)
+    pool.replace_all(listing[:2])
+    assert facets.snapshot(now=NOW)['total'] == 2
+    assert facets.snapshot(now=NOW)['facets']['source'] == {'A': 1, 'B': 1}
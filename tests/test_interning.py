@@ -0,0 +1,29 @@
+"""
+intern_strings and the interned sequence fields of BidOpportunity / MatchResult.
+"""
+from datetime import datetime
+
+from scrapers import BidOpportunity
+from scrapers.base_scraper import EMPTY, intern_strings
+
+
+def test_empty_values_share_the_empty_tuple():
+    assert intern_strings(None) is EMPTY
+    assert intern_strings([]) is EMPTY
+    assert intern_strings('') is EMPTY
+
+
+def test_bare_string_becomes_a_single_element():
+    assert intern_strings("541512") == ("541512",)
+
+
+def test_strings_are_interned():
+    first = intern_strings(["".join(["net", "work"])])
+    second = intern_strings(["".join(["netw", "ork"])])
+    assert first[0] is second[0]
+
+
+def test_opportunity_fields_accept_a_single_string():
+    opportunity = BidOpportunity(title="t", description="d", agency="a", opportunity_id="1",
+                                 due_date=datetime(2026, 1, 1), source="s", naics_codes="541512")
+    assert tuple(opportunity.naics_codes) == ("541512",)
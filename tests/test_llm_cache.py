@@ -0,0 +1,46 @@
+"""
+LLMResponseCache: key contents, TTL expiry, pruning and serving chat_completion.
+"""
+from ai import LLMClient, LLMResponseCache, MockLLMBackend, chat_completion
+
+MESSAGES = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Summarise the tender."}]
+
+
+def test_key_covers_model_messages_temperature_and_max_tokens():
+    key = LLMResponseCache.key("gpt", MESSAGES, 0.2, 100)
+    assert LLMResponseCache.key("gpt", [dict(m) for m in MESSAGES], 0.2, 100) == key
+    assert LLMResponseCache.key("other", MESSAGES, 0.2, 100) != key
+    assert LLMResponseCache.key("gpt", MESSAGES[:1], 0.2, 100) != key
+    assert LLMResponseCache.key("gpt", MESSAGES, 0.7, 100) != key
+    assert LLMResponseCache.key("gpt", MESSAGES, 0.2, 200) != key
+
+
+def test_expired_entries_miss_and_are_deleted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm.db"), ttl_secs=60)
+    cache.put("k", "gpt", "answer")
+    assert cache.get("k") == "answer"
+    cache._db.execute("UPDATE responses SET created_at = created_at - 120")
+    assert cache.get("k") is None
+    assert cache.stats()['expired'] == 1 and cache.stats()['entries'] == 0
+
+
+def test_prune_keeps_the_most_recently_used(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm.db"), max_entries=2)
+    for i in range(3):
+        cache.put(f"k{i}", "gpt", f"answer {i}")
+        cache._db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (i, f"k{i}"))
+    cache._db.execute("UPDATE responses SET used_at = 10 WHERE key = 'k0'")
+    assert cache.prune() == 1
+    assert [cache.get(k) for k in ("k0", "k1", "k2")] == ["answer 0", None, "answer 2"]
+
+
+def test_chat_completion_is_served_from_the_cache(tmp_path):
+    backend = MockLLMBackend()
+    client = LLMClient(backend)
+    cache = LLMResponseCache(str(tmp_path / "llm.db"))
+    first = chat_completion(MESSAGES, "gpt", 50, 0.2, cache=cache, client=client)
+    assert chat_completion(MESSAGES, "gpt", 50, 0.2, cache=cache, client=client) == first
+    assert backend.calls == 1
+    chat_completion(MESSAGES, "gpt", 50, 0.2, cache=cache, client=client, bypass_cache=True)
+    chat_completion(MESSAGES, "gpt", 80, 0.2, cache=cache, client=client)
+    assert backend.calls == 3
@@ -0,0 +1,79 @@
+"""
+LLMClient cancellation, explicit deadlines and the matcher's AI time budget.
+"""
+import threading
+import time
+
+import pytest
+
+from ai import LLMCancelled, LLMClient, MockLLMBackend, TransientLLMError
+from test_opportunity_matcher import matcher, opportunity
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+class FailingBackend(MockLLMBackend):
+    """Fails every call; sets cancel on the first one, as a caller's deadline would."""
+
+    def __init__(self, cancel):
+        super().__init__()
+        self.cancel = cancel
+
+    def complete(self, messages, model, max_tokens, temperature, timeout):
+        self.calls += 1
+        self.cancel.set()
+        raise TransientLLMError("boom")
+
+
+def test_cancelled_request_is_never_sent():
+    backend = MockLLMBackend()
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(LLMCancelled):
+        LLMClient(backend).complete(MESSAGES, "model", 10, 0.0, cancel=cancel)
+    assert backend.calls == 0
+
+
+def test_cancel_stops_further_retries():
+    cancel = threading.Event()
+    backend = FailingBackend(cancel)
+    client = LLMClient(backend, max_retries=5, backoff_base_secs=0.01, backoff_max_secs=0.01)
+    with pytest.raises(LLMCancelled):
+        client.complete(MESSAGES, "model", 10, 0.0, cancel=cancel)
+    assert backend.calls == 1
+
+
+def test_explicit_timeout_is_not_raised_to_a_minimum():
+    backend = MockLLMBackend(latency_secs=2.0)
+    client = LLMClient(backend, max_retries=3, backoff_base_secs=0.01, backoff_max_secs=0.01)
+    start = time.monotonic()
+    with pytest.raises((TransientLLMError, TimeoutError)):
+        client.complete(MESSAGES, "model", 10, 0.0, timeout=0.3)
+    assert time.monotonic() - start < 1.0
+
+
+def test_no_time_left_sends_nothing():
+    backend = MockLLMBackend()
+    with pytest.raises(TimeoutError):
+        LLMClient(backend).complete(MESSAGES, "model", 10, 0.0, timeout=0)
+    assert backend.calls == 0
+
+
+def test_match_threads_end_with_the_deadline():
+    backend = MockLLMBackend(latency_secs=3.0)
+    m = matcher(llm_client=LLMClient(backend, max_retries=3), max_concurrency=2)
+    start = time.monotonic()
+    m.match_opportunities([opportunity(f"OPP-{i}") for i in range(4)], max_ai_duration_secs=0.3)
+    time.sleep(0.5)
+    assert time.monotonic() - start < 1.5
+    assert not [t for t in threading.enumerate() if t.name.startswith("ai-match")]
+
+
+def test_requests_running_past_the_deadline_are_not_counted_or_retried():
+    backend = MockLLMBackend(latency_secs=0.5)
+    m = matcher(llm_client=LLMClient(backend, max_retries=3), max_concurrency=1)
+    m.match_opportunities([opportunity(f"OPP-{i}") for i in range(3)], max_ai_duration_secs=0.1)
+    time.sleep(0.6)  # let the abandoned request finish
+    assert m.last_match_stats['ai_analyses'] == 0
+    assert m.last_match_stats['ai_requests'] == 0
+    assert backend.calls == 1
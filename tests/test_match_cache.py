@@ -0,0 +1,51 @@
+"""
+MatchCache: what the key covers, persistence, LRU pruning and reuse by the matcher.
+"""
+import time
+from dataclasses import replace
+
+from ai import LLMClient, MockLLMBackend
+from storage import MatchCache
+from test_opportunity_matcher import matcher, opportunity
+
+
+def test_key_follows_matching_content_profile_and_config():
+    opp = opportunity()
+    key = MatchCache.key(opp, "profile-1", "config-1")
+    assert MatchCache.key(replace(opp, opportunity_id="OTHER", url="http://x"), "profile-1", "config-1") == key
+    assert MatchCache.key(replace(opp, description="Changed."), "profile-1", "config-1") != key
+    assert MatchCache.key(opp, "profile-2", "config-1") != key
+    assert MatchCache.key(opp, "profile-1", "config-2") != key
+
+
+def test_entries_persist_and_least_recently_used_are_pruned(tmp_path):
+    db = str(tmp_path / "matches.db")
+    cache = MatchCache(db)
+    cache.put_many([(f"k{i}", f"OPP-{i}", {'assessment': 'High', 'recommendations': ('a',)}) for i in range(3)])
+    time.sleep(0.01)
+    assert cache.get_many(["k0", "k2", "missing"]) == {'k0': {'assessment': 'High', 'recommendations': ['a']},
+                                                       'k2': {'assessment': 'High', 'recommendations': ['a']}}
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 1
+    cache.close()
+
+    reopened = MatchCache(db, max_entries=2)  # prunes k1, the least recently used
+    assert set(reopened.get_many(["k0", "k1", "k2"])) == {"k0", "k2"}
+    reopened.close()
+
+
+def test_matcher_reuses_analyses_until_its_config_changes(tmp_path):
+    db = str(tmp_path / "matches.db")
+    opportunities = [opportunity(f"OPP-{i}", f"Firewall upgrade lot {i}.") for i in range(3)]
+    backend = MockLLMBackend()
+
+    first = matcher(llm_client=LLMClient(backend), match_cache=MatchCache(db))
+    first.match_opportunities(opportunities)
+    assert backend.calls == 3
+
+    again = matcher(llm_client=LLMClient(backend), match_cache=MatchCache(db))
+    again.match_opportunities(opportunities)
+    assert backend.calls == 3 and again.last_match_stats['cache_hits'] == 3
+
+    resized = matcher(llm_client=LLMClient(backend), match_cache=MatchCache(db), context_tokens=200)
+    resized.match_opportunities(opportunities)
+    assert backend.calls == 6
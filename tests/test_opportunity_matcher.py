@@ -0,0 +1,38 @@
+"""
+OpportunityMatcher prompts: the company-context budget follows context_tokens.
+"""
+from datetime import datetime, timedelta
+
+from ai import OpportunityMatcher
+from ai.tokens import count_tokens
+from processors import ProcessedDocument
+from scrapers import BidOpportunity
+
+CAPABILITIES = "\n\n".join(f"We delivered network security project {i} for a ministry client." for i in range(200))
+
+
+def opportunity(opp_id="OPP-1", description="Firewall and network security upgrade."):
+    return BidOpportunity(title="Network security", description=description, agency="Ministry",
+                          opportunity_id=opp_id, due_date=datetime.now() + timedelta(days=30), source="Test")
+
+
+def matcher(**kwargs):
+    m = OpportunityMatcher("", **kwargs)
+    doc = ProcessedDocument("profile.txt", ".txt", CAPABILITIES, {}, [], {'experience': CAPABILITIES})
+    m.set_company_profile({'company_name': 'Acme', 'technical_keywords': [], 'all_content': CAPABILITIES}, [doc])
+    return m
+
+
+def test_context_tokens_sizes_the_prompt_and_keys_the_cache():
+    small, large = matcher(context_tokens=100), matcher(context_tokens=800)
+    assert count_tokens(small._create_analysis_prompt(opportunity())) < \
+        count_tokens(large._create_analysis_prompt(opportunity()))
+    assert count_tokens(large._create_analysis_prompt(opportunity())) <= large.analysis_prompt_tokens
+    assert small.analysis_config != large.analysis_config
+
+
+def test_batch_prompt_context_scales_with_context_tokens():
+    small, large = matcher(context_tokens=100, batch_size=3), matcher(context_tokens=800, batch_size=3)
+    batch = [opportunity(f"OPP-{i}") for i in range(3)]
+    assert count_tokens(small._create_batch_prompt(batch)) < count_tokens(large._create_batch_prompt(batch))
+    assert 'batch_context=1600' in large.analysis_config
@@ -0,0 +1,63 @@
+"""
+OpportunityPool: deadline index, expiry and the size / age caps.
+"""
+import json
+import time
+from datetime import datetime, timedelta
+
+from scrapers import BidOpportunity
+from storage import OpportunityPool
+
+NOW = time.time()
+
+
+def opportunity(opp_id, days=None):
+    due = datetime.fromtimestamp(NOW) + timedelta(days=days) if days is not None else None
+    return BidOpportunity(title=opp_id, description="d", agency="a", opportunity_id=opp_id, due_date=due, source="s")
+
+
+def test_iterates_soonest_deadline_first_with_undated_last():
+    pool = OpportunityPool()
+    pool.add_many([opportunity('late', 9), opportunity('undated'), opportunity('soon', 1), opportunity('mid', 4)])
+    assert [o.opportunity_id for o in pool.iter_by_deadline(now=NOW)] == ['soon', 'mid', 'late', 'undated']
+
+
+def test_closing_within_and_replacing_an_entry():
+    pool = OpportunityPool()
+    pool.add_many([opportunity('a', 2), opportunity('b', 10)])
+    pool.add(opportunity('b', 3))
+    assert [o.opportunity_id for o in pool.closing_within(5, now=NOW)] == ['a', 'b']
+    assert len(pool) == 2
+
+
+def test_expired_notices_are_evicted_and_archived(tmp_path):
+    archive = tmp_path / "expired.json"
+    pool = OpportunityPool(archive_path=str(archive))
+    pool.add_many([opportunity('gone', -1), opportunity('open', 1)])
+    assert [o.opportunity_id for o in pool.evict_expired(now=NOW)] == ['gone']
+    assert 'gone' not in pool and 'open' in pool
+    assert json.loads(archive.read_text())['opportunity_id'] == 'gone'
+
+
+def test_grace_period_keeps_recently_closed_notices():
+    pool = OpportunityPool(grace_secs=2 * 86400)
+    pool.add(opportunity('closed-yesterday', -1))
+    assert pool.evict_expired(now=NOW) == []
+    assert 'closed-yesterday' in pool
+
+
+def test_size_cap_drops_least_recently_seen_including_undated():
+    pool = OpportunityPool(max_size=2)
+    pool.add_many([opportunity('u1'), opportunity('u2'), opportunity('u3')])
+    pool.add(opportunity('u1'))  # seen again
+    pool.evict_expired()
+    assert sorted(o.opportunity_id for o in pool.iter_by_deadline()) == ['u1', 'u3']
+
+
+def test_age_cap_drops_notices_not_seen_recently():
+    pool = OpportunityPool(max_age_secs=60)
+    pool.add(opportunity('undated'))
+    pool.evict_expired(now=time.time() + 30)
+    assert 'undated' in pool
+    pool.evict_expired(now=time.time() + 120)
+    assert len(pool) == 0
@@ -0,0 +1,67 @@
+"""
+PdfPageCache page keys: everything that changes extracted text changes the key.
+"""
+from PyPDF2 import PageObject
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+from processors.text_extraction import PdfPageCache
+
+
+def stream(data: bytes, **entries) -> DecodedStreamObject:
+    obj = DecodedStreamObject()
+    obj.set_data(data)
+    for key, value in entries.items():
+        obj[NameObject(f"/{key}")] = value
+    return obj
+
+
+def page(content=b"BT /F1 12 Tf (Hello) Tj ET", form=b"BT (Form text) Tj ET",
+         to_unicode=b"beginbfchar <01> <0041> endbfchar", image=b"\x00" * 16):
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+        NameObject("/ToUnicode"): stream(to_unicode),
+        NameObject("/FontDescriptor"): DictionaryObject({NameObject("/FontFile2"): stream(b"glyphs")}),
+    })
+    resources = DictionaryObject({
+        NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        NameObject("/XObject"): DictionaryObject({
+            NameObject("/Fm1"): stream(form, Subtype=NameObject("/Form")),
+            NameObject("/Im1"): stream(image, Subtype=NameObject("/Image"), Width=NumberObject(4)),
+        }),
+    })
+    pdf_page = PageObject.create_blank_page(width=100, height=100)
+    pdf_page[NameObject("/Resources")] = resources
+    pdf_page[NameObject("/Contents")] = stream(content)
+    return pdf_page
+
+
+def key(pdf_page):
+    return PdfPageCache("unused").page_key(pdf_page)
+
+
+def test_identical_pages_share_a_key():
+    assert key(page()) == key(page())
+
+
+def test_content_stream_changes_the_key():
+    assert key(page(content=b"BT /F1 12 Tf (Bye) Tj ET")) != key(page())
+
+
+def test_form_xobject_changes_the_key():
+    assert key(page(form=b"BT (Other form text) Tj ET")) != key(page())
+
+
+def test_to_unicode_map_changes_the_key():
+    assert key(page(to_unicode=b"beginbfchar <01> <0042> endbfchar")) != key(page())
+
+
+def test_image_data_does_not_change_the_key():
+    assert key(page(image=b"\xff" * 16)) == key(page())
+
+
+def test_cached_text_round_trip(tmp_path):
+    cache = PdfPageCache(str(tmp_path))
+    cache.put("ab" * 32, "page text")
+    assert cache.get("ab" * 32) == "page text"
+    assert cache.get("cd" * 32) is None
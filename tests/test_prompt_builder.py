@@ -0,0 +1,63 @@
+"""
+PromptBuilder budget filling and truncate_to_tokens.
+"""
+from ai.prompt_builder import PRIORITY_CONTEXT, PRIORITY_ESSENTIAL, PRIORITY_EXTRA, PromptBuilder
+from ai.tokens import count_tokens, estimate_tokens, truncate_to_tokens
+
+SENTENCES = " ".join(f"Sentence number {i} describes the required road works." for i in range(40))
+
+
+def test_truncate_keeps_short_text_and_honours_the_budget():
+    assert truncate_to_tokens("Short text.", 50) == "Short text."
+    assert truncate_to_tokens("anything", 0) == ""
+    cut = truncate_to_tokens(SENTENCES, 30)
+    assert estimate_tokens(cut) <= 30 and SENTENCES.startswith(cut)
+    assert not cut.endswith(" ")
+
+
+def test_truncate_prefers_a_sentence_boundary():
+    cut = truncate_to_tokens(SENTENCES, 40, sentences=True)
+    assert cut.endswith("works.")
+    assert count_tokens(cut) <= 40
+
+
+def test_truncate_handles_dense_text_without_spaces():
+    dense = "a.b," * 200
+    assert count_tokens(truncate_to_tokens(dense, 20, sentences=True)) <= 20
+
+
+def test_everything_fits_in_insertion_order():
+    builder = PromptBuilder(200)
+    builder.add('EXTRA', "Keywords: roads", PRIORITY_EXTRA).add('OPPORTUNITY', "Build a bridge.")
+    assert builder.build() == "EXTRA: Keywords: roads\nOPPORTUNITY: Build a bridge."
+    assert builder.dropped == [] and builder.truncated == []
+    assert builder.tokens == count_tokens(builder.build())
+
+
+def test_lower_priority_parts_give_way_first():
+    builder = PromptBuilder(60)
+    builder.add('EXTRA', SENTENCES, PRIORITY_EXTRA, truncate=False)
+    builder.add('OPPORTUNITY', "Build a bridge over the river.", PRIORITY_ESSENTIAL)
+    prompt = builder.build()
+    assert prompt == "OPPORTUNITY: Build a bridge over the river."
+    assert builder.dropped == ['EXTRA']
+
+
+def test_long_part_is_truncated_to_the_remaining_budget():
+    builder = PromptBuilder(80)
+    builder.add('OPPORTUNITY', "Build a bridge.").add('DETAILS', SENTENCES, PRIORITY_EXTRA)
+    prompt = builder.build()
+    assert builder.truncated == ['DETAILS']
+    assert builder.tokens <= 80 and prompt.endswith("works.")
+
+
+def test_chunks_keep_those_that_fit_best_first():
+    chunks = ["Bridges: " + "steel " * 30, "Roads: paving and drainage.", "Schools: furniture."]
+    builder = PromptBuilder(30)
+    builder.add_chunks('CAPABILITIES', chunks, PRIORITY_CONTEXT)
+    assert builder.build() == "CAPABILITIES:\nRoads: paving and drainage.\n\nSchools: furniture."
+    assert builder.truncated == ['CAPABILITIES']
+
+    empty = PromptBuilder(3)
+    empty.add_chunks('CAPABILITIES', chunks)
+    assert empty.build() == "" and empty.dropped == ['CAPABILITIES']
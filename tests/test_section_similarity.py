@@ -0,0 +1,55 @@
+"""
+aggregate_section_similarity and the per-section text similarity it feeds.
+"""
+import numpy as np
+
+from ai.opportunity_matcher import aggregate_section_similarity
+from processors import ProcessedDocument
+from test_opportunity_matcher import matcher, opportunity
+
+SIMILARITY = np.array([[0.1, 0.9, 0.3, 0.5],
+                       [0.4, 0.4, 0.0, 0.2]])
+
+
+def test_max_takes_the_best_section():
+    scores, top, values = aggregate_section_similarity(SIMILARITY, 'max', top_k=2)
+    assert scores.tolist() == [0.9, 0.4]
+    assert top.tolist() == [[1, 3], [0, 1]]
+    assert values.tolist() == [[0.9, 0.5], [0.4, 0.4]]
+
+
+def test_topk_averages_the_best_k_sections():
+    scores, top, _ = aggregate_section_similarity(SIMILARITY, 'topk', top_k=2)
+    assert np.allclose(scores, [0.7, 0.4])
+    assert top.tolist() == [[1, 3], [0, 1]]
+
+
+def test_k_is_clamped_to_the_section_count():
+    scores, top, _ = aggregate_section_similarity(SIMILARITY, 'topk', top_k=10)
+    assert np.allclose(scores, SIMILARITY.mean(axis=1))
+    assert top.tolist() == [[1, 3, 2, 0], [0, 1, 3, 2]]
+    assert aggregate_section_similarity(SIMILARITY, 'max', top_k=0)[0].tolist() == [0.9, 0.4]
+
+
+def test_no_sections_scores_zero():
+    scores, top, values = aggregate_section_similarity(np.zeros((2, 0)))
+    assert scores.tolist() == [0.0, 0.0] and top.shape == (2, 0) and values.shape == (2, 0)
+
+
+def test_one_matching_section_is_not_diluted_by_the_rest():
+    security = "firewall penetration testing SOC monitoring SIEM incident response"
+    sections = {'experience': security, 'team': "catering lunch meals beverages kitchen staff",
+                'methodology': "school classroom furniture textbooks teacher training"}
+    content = "\n".join(f"{name.title()}\n{text}" for name, text in sections.items())
+    doc = ProcessedDocument("profile.docx", ".docx", content, {}, [], sections)
+    profile = {'company_name': 'Acme', 'technical_keywords': [], 'all_content': content}
+    target = [opportunity(description="SOC monitoring, SIEM and incident response services.")]
+
+    by_section, whole = matcher(section_aggregation='max'), matcher()
+    by_section.set_company_profile(profile, [doc])
+    whole.set_company_profile(profile, None)
+    section_score, contributing = by_section._text_similarity(
+        [f"{o.title} {o.description}" for o in target], by_section.state)
+    whole_score, _ = whole._text_similarity([f"{o.title} {o.description}" for o in target], whole.state)
+    assert section_score[0] > whole_score[0]
+    assert contributing[0][0].endswith('experience')
@@ -0,0 +1,28 @@
+"""
+select_shortlist: which opportunities the cascade sends for AI analysis.
+"""
+import numpy as np
+
+from ai.opportunity_matcher import select_shortlist
+
+SCORES = np.array([0.2, 0.9, 0.5, 0.9, 0.1, 0.7])
+
+
+def test_defaults_keep_everything_best_first_with_stable_ties():
+    assert select_shortlist(SCORES).tolist() == [1, 3, 5, 2, 0, 4]
+
+
+def test_top_k_caps_the_shortlist():
+    assert select_shortlist(SCORES, top_k=3).tolist() == [1, 3, 5]
+    assert select_shortlist(SCORES, top_k=0).tolist() == [1, 3, 5, 2, 0, 4]
+
+
+def test_quantile_and_min_score_take_the_stricter_cut():
+    assert select_shortlist(SCORES, quantile=0.5).tolist() == [1, 3, 5]
+    assert select_shortlist(SCORES, min_score=0.5).tolist() == [1, 3, 5, 2]
+    assert select_shortlist(SCORES, quantile=0.5, min_score=0.8).tolist() == [1, 3]
+
+
+def test_empty_and_all_filtered():
+    assert select_shortlist(np.array([])).tolist() == []
+    assert select_shortlist(SCORES, min_score=1.0).tolist() == []
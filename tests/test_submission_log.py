@@ -0,0 +1,173 @@
+"""
+SubmissionLog: timestamp-ordered cursor paging over the offset index.
+"""
+import json
+import os
+
+from loguru import logger
+
+from applicators.submission_log import SubmissionLog
+
+
+def entry(opportunity_id, hour, status='submitted'):
+    return {'opportunity_id': opportunity_id, 'status': status, 'timestamp': f"2026-01-01T{hour:02d}:00:00"}
+
+
+def all_pages(log, limit, **filters):
+    seen, cursor = [], None
+    while True:
+        page = log.page(limit=limit, cursor=cursor, **filters)
+        seen.extend(page['entries'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return seen
+
+
+def test_pages_newest_first_by_timestamp_not_append_order(tmp_path):
+    log = SubmissionLog(str(tmp_path / "submissions.json"))
+    for opportunity_id, hour in (('a', 5), ('b', 1), ('c', 9), ('d', 3), ('e', 7)):
+        log.append(entry(opportunity_id, hour))
+    ids = [e['opportunity_id'] for e in all_pages(log, limit=2)]
+    assert ids == ['c', 'e', 'a', 'd', 'b']
+
+
+def test_equal_timestamps_keep_reverse_append_order(tmp_path):
+    log = SubmissionLog(str(tmp_path / "submissions.json"))
+    for opportunity_id in 'abc':
+        log.append(entry(opportunity_id, 4))
+    assert [e['opportunity_id'] for e in all_pages(log, limit=1)] == ['c', 'b', 'a']
+
+
+def test_cursor_is_stable_when_entries_are_appended_between_pages(tmp_path):
+    log = SubmissionLog(str(tmp_path / "submissions.json"))
+    for hour in range(1, 5):
+        log.append(entry(f"old{hour}", hour))
+    first = log.page(limit=2)
+    log.append(entry('new', 23))
+    second = log.page(limit=2, cursor=first['next_cursor'])
+    assert [e['opportunity_id'] for e in first['entries']] == ['old4', 'old3']
+    assert [e['opportunity_id'] for e in second['entries']] == ['old2', 'old1']
+    assert second['next_cursor'] is None
+    assert second['total'] == 5
+
+
+def test_filters_by_opportunity_and_case_insensitive_status(tmp_path):
+    log = SubmissionLog(str(tmp_path / "submissions.json"))
+    log.append(entry('x', 1, 'Submitted'))
+    log.append(entry('y', 2, 'failed'))
+    log.append(entry('x', 3, 'failed'))
+    assert [e['timestamp'][11:13] for e in all_pages(log, 1, opportunity_id='x')] == ['03', '01']
+    assert [e['opportunity_id'] for e in log.page(status='FAILED')['entries']] == ['x', 'y']
+    assert log.page(opportunity_id='missing')['entries'] == []
+
+
+def test_invalid_cursor_starts_from_the_newest_entry(tmp_path):
+    log = SubmissionLog(str(tmp_path / "submissions.json"))
+    log.append(entry('a', 1))
+    log.append(entry('b', 2))
+    assert log.page(limit=1, cursor='not-a-cursor')['entries'][0]['opportunity_id'] == 'b'
+
+
+def test_malformed_line_is_skipped_and_warned_once(tmp_path):
+    path = tmp_path / "submissions.json"
+    log = SubmissionLog(str(path))
+    log.append(entry('a', 1))
+    with open(path, 'a') as f:
+        f.write("{not json\n")
+    warnings = []
+    sink = logger.add(lambda message: warnings.append(message), level="WARNING")
+    try:
+        assert len(log) == 1
+        assert len(log) == 1
+        log.append(entry('b', 2))
+        assert len(log) == 2
+    finally:
+        logger.remove(sink)
+    assert sum('malformed' in w for w in warnings) == 1
+    assert [e['opportunity_id'] for e in log.page()['entries']] == ['b', 'a']
+
+
+def test_partial_last_line_is_indexed_once_complete(tmp_path):
+    path = tmp_path / "submissions.json"
+    log = SubmissionLog(str(path))
+    log.append(entry('a', 1))
+    line = json.dumps(entry('b', 2))
+    with open(path, 'a') as f:
+        f.write(line[:10])
+    assert len(log) == 1
+    with open(path, 'a') as f:
+        f.write(line[10:] + "\n")
+    assert len(log) == 2
+
+
+def test_replaced_log_is_reindexed_even_when_larger(tmp_path):
+    path = tmp_path / "submissions.json"
+    log = SubmissionLog(str(path))
+    log.append(entry('a', 1))
+    assert len(log) == 1
+    replacement = tmp_path / "replacement.json"
+    replacement.write_text("".join(json.dumps(entry(f"r{i}", i)) + "\n" for i in range(1, 4)))
+    os.replace(replacement, path)
+    assert [e['opportunity_id'] for e in log.page()['entries']] == ['r3', 'r2', 'r1']
+
+
+def test_replaced_log_is_detected_by_a_fresh_instance(tmp_path):
+    path = tmp_path / "submissions.json"
+    SubmissionLog(str(path)).append(entry('a', 1))
+    path.write_text("".join(json.dumps(entry(f"r{i}", i)) + "\n" for i in range(1, 4)))
+    assert len(SubmissionLog(str(path))) == 3
+
+
+def test_index_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "submissions.json")
+    writer, reader = SubmissionLog(path), SubmissionLog(path)
+    writer.append(entry('a', 1))
+    assert len(reader) == 1
+    writer.append(entry('b', 2))
+    assert [e['opportunity_id'] for e in reader.page()['entries']] == ['b', 'a']
+
+
+def test_latest_statuses_take_the_newest_entry_per_opportunity(tmp_path):
+    log = SubmissionLog(str(tmp_path / "submissions.json"))
+    log.append(entry('a', 5, 'submitted'))
+    log.append(entry('a', 2, 'failed'))
+    log.append(entry('b', 1, 'failed'))
+    assert log.latest_statuses(['a', 'b', 'c']) == {'a': 'submitted', 'b': 'failed'}
+    assert log.latest_statuses([]) == {}
+
+
+def brute_force(entries, **filters):
+    """Newest first by timestamp, then reverse append order."""
+    kept = [(e['timestamp'], i, e) for i, e in enumerate(entries)
+            if all(e[k] == v for k, v in filters.items())]
+    return [e for _, _, e in sorted(kept, key=lambda t: (t[0], t[1]), reverse=True)]
+
+
+def test_in_order_log_pages_by_walking_back_from_the_cursor(tmp_path):
+    log = SubmissionLog(str(tmp_path / "submissions.json"))
+    entries = [entry(f"o{i % 7}", i // 3 % 24, 'failed' if i % 5 else 'submitted') for i in range(60)]
+    for e in sorted(entries, key=lambda e: e['timestamp']):
+        log.append(e)
+    appended = sorted(entries, key=lambda e: e['timestamp'])
+    assert log._in_order and log._order is None
+    for limit in (1, 4, 50):
+        assert all_pages(log, limit) == brute_force(appended)
+        assert all_pages(log, limit, opportunity_id='o3') == brute_force(appended, opportunity_id='o3')
+    assert log._order is None  # never sorted
+
+
+def test_out_of_order_log_is_sorted_once_and_reused(tmp_path):
+    log = SubmissionLog(str(tmp_path / "submissions.json"))
+    entries = [entry(f"o{i % 4}", (i * 7) % 24) for i in range(30)]
+    for e in entries:
+        log.append(e)
+    assert not log._in_order
+    first = log.page(limit=3)
+    order = log._order
+    assert all_pages(log, 3) == brute_force(entries)
+    assert all_pages(log, 2, opportunity_id='o1') == brute_force(entries, opportunity_id='o1')
+    assert log._order is order
+    log.append(entry('late', 23))
+    assert log.page(limit=3)['entries'][0]['opportunity_id'] == 'late'
+    assert log._order is not order
+    assert first['entries'] == brute_force(entries)[:3]